@@ -0,0 +1,66 @@
+"""sessions summary table
+
+Revision ID: 2f6d8a4c9e17
+Revises: 7b3e9c1d5a62
+Create Date: 2026-10-18 16:10:03.551872
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f6d8a4c9e17'
+down_revision: Union[str, Sequence[str], None] = '7b3e9c1d5a62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _audit_user_id(dialect: str) -> str:
+    if dialect == "postgresql":
+        return "(a.input_json ->> 'user_id')"
+    return "json_extract(a.input_json, '$.user_id')"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('sessions',
+    sa.Column('session_id', sa.String(length=64), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=True),
+    sa.Column('turns', sa.Integer(), nullable=False),
+    sa.Column('last_user_message', sa.Text(), nullable=True),
+    sa.Column('last_activity', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.PrimaryKeyConstraint('session_id')
+    )
+    op.create_index('ix_sessions_last_activity', 'sessions', ['last_activity'], unique=False)
+    op.create_index('ix_sessions_user_last_activity', 'sessions', ['user_id', 'last_activity'], unique=False)
+
+    # same as app.services.sessions.backfill()
+    user_id = _audit_user_id(op.get_bind().dialect.name)
+    op.execute(
+        f"""
+        INSERT INTO sessions (session_id, user_id, turns, last_user_message, last_activity, created_at)
+        SELECT
+            t.session_id,
+            (SELECT {user_id} FROM audit_logs a JOIN traces t2 ON t2.id = a.trace_id
+             WHERE t2.session_id = t.session_id AND {user_id} IS NOT NULL
+             ORDER BY a.created_at DESC LIMIT 1),
+            COUNT(*),
+            SUBSTR((SELECT t3.user_message FROM traces t3 WHERE t3.session_id = t.session_id
+                    ORDER BY t3.created_at DESC LIMIT 1), 1, 280),
+            MAX(t.created_at),
+            MIN(t.created_at)
+        FROM traces t
+        GROUP BY t.session_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_sessions_user_last_activity', table_name='sessions')
+    op.drop_index('ix_sessions_last_activity', table_name='sessions')
+    op.drop_table('sessions')
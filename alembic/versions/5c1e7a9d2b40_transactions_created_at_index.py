@@ -0,0 +1,28 @@
+"""transactions created_at index
+
+Revision ID: 5c1e7a9d2b40
+Revises: 1434a238b39b
+Create Date: 2026-10-18 09:12:04.118302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e7a9d2b40'
+down_revision: Union[str, Sequence[str], None] = '1434a238b39b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # velocity counters are rebuilt from the last 24h of transactions on startup
+    op.create_index('ix_transactions_created_at', 'transactions', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transactions_created_at', table_name='transactions')
@@ -0,0 +1,94 @@
+"""composite indexes for hot read paths
+
+Revision ID: 7b3e9c1d5a62
+Revises: c4a7e2d9f318
+Create Date: 2026-10-18 15:22:41.907113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b3e9c1d5a62'
+down_revision: Union[str, Sequence[str], None] = 'c4a7e2d9f318'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _user_id_expr(dialect: str) -> str:
+    # must render exactly like app.db.types.json_text(AuditLog.input_json, "user_id")
+    if dialect == "postgresql":
+        return "(input_json ->> 'user_id')"
+    return "json_extract(input_json, '$.user_id')"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    op.create_index('ix_users_created_at', 'users', ['created_at'], unique=False)
+
+    # low-cardinality; made the planner sort the velocity rebuild instead of using created_at
+    op.drop_index('ix_transactions_status', table_name='transactions')
+
+    op.drop_index('ix_traces_session_id', table_name='traces')
+    op.create_index('ix_traces_session_created', 'traces', ['session_id', 'created_at'], unique=False)
+    op.create_index('ix_traces_created_at', 'traces', ['created_at'], unique=False)
+
+    op.drop_index('ix_audit_logs_trace_id', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_tool_name', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_status', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_input_user_id', table_name='audit_logs')
+    op.create_index('ix_audit_logs_trace_created', 'audit_logs', ['trace_id', 'created_at'], unique=False)
+    op.create_index('ix_audit_logs_tool_created', 'audit_logs', ['tool_name', 'created_at'], unique=False)
+    op.create_index('ix_audit_logs_status_created', 'audit_logs', ['status', 'created_at'], unique=False)
+    op.create_index('ix_audit_logs_created_at', 'audit_logs', ['created_at'], unique=False)
+    op.create_index(
+        'ix_audit_logs_input_user_id', 'audit_logs', [sa.text(_user_id_expr(dialect)), sa.text('created_at')]
+    )
+
+    # one memory row per session: keep the most recently updated duplicate
+    op.execute(
+        """
+        DELETE FROM session_memory
+        WHERE EXISTS (
+            SELECT 1 FROM session_memory newer
+            WHERE newer.session_id = session_memory.session_id
+              AND (newer.updated_at > session_memory.updated_at
+                   OR (newer.updated_at = session_memory.updated_at AND newer.id > session_memory.id))
+        )
+        """
+    )
+    op.drop_index('ix_session_memory_session_id', table_name='session_memory')
+    op.create_index('uq_session_memory_session_id', 'session_memory', ['session_id'], unique=True)
+    op.create_index('ix_session_memory_updated_at', 'session_memory', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    op.drop_index('ix_session_memory_updated_at', table_name='session_memory')
+    op.drop_index('uq_session_memory_session_id', table_name='session_memory')
+    op.create_index('ix_session_memory_session_id', 'session_memory', ['session_id'], unique=False)
+
+    op.drop_index('ix_audit_logs_input_user_id', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_created_at', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_status_created', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_tool_created', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_trace_created', table_name='audit_logs')
+    op.create_index('ix_audit_logs_input_user_id', 'audit_logs', [sa.text(_user_id_expr(dialect))])
+    op.create_index('ix_audit_logs_status', 'audit_logs', ['status'], unique=False)
+    op.create_index('ix_audit_logs_tool_name', 'audit_logs', ['tool_name'], unique=False)
+    op.create_index('ix_audit_logs_trace_id', 'audit_logs', ['trace_id'], unique=False)
+
+    op.drop_index('ix_traces_created_at', table_name='traces')
+    op.drop_index('ix_traces_session_created', table_name='traces')
+    op.create_index('ix_traces_session_id', 'traces', ['session_id'], unique=False)
+
+    op.create_index('ix_transactions_status', 'transactions', ['status'], unique=False)
+
+    op.drop_index('ix_users_created_at', table_name='users')
@@ -0,0 +1,61 @@
+"""money as integer minor units
+
+Revision ID: 9e2f4b7c1a83
+Revises: 5c1e7a9d2b40
+Create Date: 2026-10-18 11:40:27.503119
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.money import CURRENCY_EXPONENTS, DEFAULT_EXPONENT
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e2f4b7c1a83'
+down_revision: Union[str, Sequence[str], None] = '5c1e7a9d2b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, old Numeric column, new minor-unit column)
+_MONEY_COLUMNS = [
+    ("accounts", "balance", "balance_minor"),
+    ("products", "price", "price_minor"),
+    ("transactions", "unit_price", "unit_price_minor"),
+    ("transactions", "total_amount", "total_amount_minor"),
+]
+
+
+def _scale_expr(currency_col: str) -> str:
+    # 10 ** exponent, per row currency
+    cases = " ".join(
+        f"WHEN '{cur}' THEN {10 ** exp}" for cur, exp in CURRENCY_EXPONENTS.items() if exp != DEFAULT_EXPONENT
+    )
+    default = 10 ** DEFAULT_EXPONENT
+    return f"(CASE UPPER({currency_col}) {cases} ELSE {default} END)" if cases else str(default)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, old, new in _MONEY_COLUMNS:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column(new, sa.BigInteger(), nullable=False, server_default="0"))
+        # ROUND before CAST: SQLite keeps Numeric as REAL, so 19.99 * 100 may be 1998.9999...
+        op.execute(f"UPDATE {table} SET {new} = CAST(ROUND({old} * {_scale_expr('currency')}) AS BIGINT)")
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(new, server_default=None)
+            batch_op.drop_column(old)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, old, new in reversed(_MONEY_COLUMNS):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column(old, sa.Numeric(precision=12, scale=2), nullable=False, server_default="0"))
+        op.execute(f"UPDATE {table} SET {old} = {new} * 1.0 / {_scale_expr('currency')}")
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(old, server_default=None)
+            batch_op.drop_column(new)
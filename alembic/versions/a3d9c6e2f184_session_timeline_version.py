@@ -0,0 +1,30 @@
+"""session timeline version
+
+Revision ID: a3d9c6e2f184
+Revises: e8c1f5a3b7d4
+Create Date: 2026-10-18 18:11:47.620193
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d9c6e2f184'
+down_revision: Union[str, Sequence[str], None] = 'e8c1f5a3b7d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('sessions') as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('sessions') as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,131 @@
+"""content addressed payloads
+
+Revision ID: b7e4d1c9a6f2
+Revises: a3d9c6e2f184
+Create Date: 2026-10-18 19:02:36.118430
+
+"""
+import hashlib
+import json
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e4d1c9a6f2'
+down_revision: Union[str, Sequence[str], None] = 'a3d9c6e2f184'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, inline JSON column, reference column)
+_MOVED = [
+    ("traces", "plan_json", "plan_ref"),
+    ("audit_logs", "output_json", "output_ref"),
+]
+
+_JSON = sa.JSON().with_variant(postgresql.JSONB(), "postgresql")
+_BATCH = 1000
+
+
+def _user_id_expr(dialect: str) -> str:
+    # must render exactly like app.db.types.json_text(AuditLog.input_json, "user_id")
+    if dialect == "postgresql":
+        return "(input_json ->> 'user_id')"
+    return "json_extract(input_json, '$.user_id')"
+
+
+def _drop_user_id_index() -> None:
+    # SQLite's batch mode rebuilds audit_logs by copying it, and the copy silently loses this
+    # expression index; take it off first and put it back once the table is final
+    if op.get_bind().dialect.name == 'sqlite':
+        op.drop_index('ix_audit_logs_input_user_id', table_name='audit_logs')
+
+
+def _create_user_id_index() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.create_index(
+            'ix_audit_logs_input_user_id',
+            'audit_logs',
+            [sa.text(_user_id_expr(dialect)), sa.text('created_at'), sa.text('id')],
+        )
+
+
+def _text(value) -> str:
+    # same text as app.utils.jsoncodec.dumps, so existing payloads dedupe with new ones
+    if isinstance(value, str):
+        value = json.loads(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('payloads',
+    sa.Column('hash', sa.String(length=32), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.PrimaryKeyConstraint('hash')
+    )
+    _drop_user_id_index()
+    for table, _, ref in _MOVED:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column(ref, sa.String(length=32), nullable=True))
+            batch_op.create_foreign_key(f'fk_{table}_{ref}', 'payloads', [ref], ['hash'])
+            batch_op.create_index(f'ix_{table}_{ref}', [ref], unique=False)
+
+    # same as app.db.payloads.store()
+    bind = op.get_bind()
+    payloads = sa.table('payloads', sa.column('hash'), sa.column('data'), sa.column('size'))
+    seen: set[str] = set()
+    for table, column, ref in _MOVED:
+        t = sa.table(table, sa.column('id'), sa.column(column, _JSON), sa.column(ref))
+        rows = bind.execute(sa.select(t.c.id, sa.type_coerce(t.c[column], sa.Text)).where(t.c[column].is_not(None))).all()
+        for i in range(0, len(rows), _BATCH):
+            new, refs = [], []
+            for row_id, value in rows[i : i + _BATCH]:
+                text = _text(value).encode('utf-8')
+                h = hashlib.blake2b(text, digest_size=16).hexdigest()
+                if h not in seen:
+                    seen.add(h)
+                    new.append({'hash': h, 'data': zlib.compress(text, 6), 'size': len(text)})
+                refs.append({'row_id': row_id, 'h': h})
+            if new:
+                bind.execute(payloads.insert(), new)
+            bind.execute(t.update().where(t.c.id == sa.bindparam('row_id')).values({ref: sa.bindparam('h')}), refs)
+
+    for table, column, _ in _MOVED:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column(column)
+    _create_user_id_index()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    payloads = sa.table('payloads', sa.column('hash'), sa.column('data'))
+    _drop_user_id_index()
+    for table, column, ref in _MOVED:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column(column, _JSON, nullable=True))
+        t = sa.table(table, sa.column('id'), sa.column(column, sa.Text), sa.column(ref))
+        rows = bind.execute(
+            sa.select(t.c.id, payloads.c.data).join(payloads, payloads.c.hash == t.c[ref])
+        ).all()
+        for i in range(0, len(rows), _BATCH):
+            values = [{'row_id': row_id, 'v': zlib.decompress(data).decode('utf-8')} for row_id, data in rows[i : i + _BATCH]]
+            value = sa.bindparam('v')
+            if bind.dialect.name == 'postgresql':
+                value = sa.cast(value, postgresql.JSONB)
+            bind.execute(t.update().where(t.c.id == sa.bindparam('row_id')).values({column: value}), values)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_index(f'ix_{table}_{ref}')
+            batch_op.drop_constraint(f'fk_{table}_{ref}', type_='foreignkey')
+            batch_op.drop_column(ref)
+    _create_user_id_index()
+    op.drop_table('payloads')
@@ -0,0 +1,70 @@
+"""native json payload columns
+
+Revision ID: c4a7e2d9f318
+Revises: 9e2f4b7c1a83
+Create Date: 2026-10-18 14:05:12.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a7e2d9f318'
+down_revision: Union[str, Sequence[str], None] = '9e2f4b7c1a83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, column, nullable)
+_PAYLOAD_COLUMNS = [
+    ("traces", "plan_json", True),
+    ("audit_logs", "input_json", True),
+    ("audit_logs", "output_json", True),
+    ("session_memory", "memory_json", False),
+    ("transactions", "metadata_json", True),
+]
+
+_JSON = sa.JSON().with_variant(postgresql.JSONB(), "postgresql")
+
+
+def _user_id_expr(dialect: str) -> str:
+    # must render exactly like app.db.types.json_text(AuditLog.input_json, "user_id")
+    if dialect == "postgresql":
+        return "(input_json ->> 'user_id')"
+    return "json_extract(input_json, '$.user_id')"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    for table, column, nullable in _PAYLOAD_COLUMNS:
+        if dialect == "postgresql":
+            op.alter_column(
+                table, column, type_=postgresql.JSONB(), existing_nullable=nullable,
+                postgresql_using=f"NULLIF({column}, '')::jsonb",
+            )
+            continue
+        # keep any legacy non-JSON text readable by storing it as a JSON string
+        op.execute(f"UPDATE {table} SET {column} = json_quote({column}) WHERE {column} IS NOT NULL AND json_valid({column}) = 0")
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(column, type_=_JSON, existing_type=sa.Text(), existing_nullable=nullable)
+
+    op.create_index("ix_audit_logs_input_user_id", "audit_logs", [sa.text(_user_id_expr(dialect))])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    op.drop_index("ix_audit_logs_input_user_id", table_name="audit_logs")
+    for table, column, nullable in reversed(_PAYLOAD_COLUMNS):
+        if dialect == "postgresql":
+            op.alter_column(
+                table, column, type_=sa.Text(), existing_nullable=nullable, postgresql_using=f"{column}::text"
+            )
+            continue
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(column, type_=sa.Text(), existing_type=_JSON, existing_nullable=nullable)
@@ -0,0 +1,59 @@
+"""turn stage timings
+
+Revision ID: d5b8f3a1c742
+Revises: b7e4d1c9a6f2
+Create Date: 2026-10-19 09:14:22.507316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5b8f3a1c742'
+down_revision: Union[str, Sequence[str], None] = 'b7e4d1c9a6f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_TRACE_TIMINGS = ('duration_ms', 'memory_ms', 'plan_ms', 'policy_ms', 'tools_ms')
+
+
+def _user_id_expr(dialect: str) -> str:
+    # must render exactly like app.db.types.json_text(AuditLog.input_json, "user_id")
+    if dialect == "postgresql":
+        return "(input_json ->> 'user_id')"
+    return "json_extract(input_json, '$.user_id')"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('traces') as batch_op:
+        batch_op.add_column(sa.Column('intent', sa.String(length=32), nullable=True))
+        batch_op.add_column(sa.Column('planner', sa.String(length=16), nullable=True))
+        for name in _TRACE_TIMINGS:
+            batch_op.add_column(sa.Column(name, sa.Float(), nullable=True))
+    with op.batch_alter_table('audit_logs') as batch_op:
+        batch_op.add_column(sa.Column('duration_ms', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    # on SQLite dropping a column rebuilds audit_logs, and the copy loses this expression index
+    if dialect == 'sqlite':
+        op.drop_index('ix_audit_logs_input_user_id', table_name='audit_logs')
+    with op.batch_alter_table('audit_logs') as batch_op:
+        batch_op.drop_column('duration_ms')
+    if dialect == 'sqlite':
+        op.create_index(
+            'ix_audit_logs_input_user_id',
+            'audit_logs',
+            [sa.text(_user_id_expr(dialect)), sa.text('created_at'), sa.text('id')],
+        )
+    with op.batch_alter_table('traces') as batch_op:
+        for name in reversed(_TRACE_TIMINGS):
+            batch_op.drop_column(name)
+        batch_op.drop_column('planner')
+        batch_op.drop_column('intent')
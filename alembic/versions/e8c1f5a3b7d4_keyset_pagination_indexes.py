@@ -0,0 +1,72 @@
+"""keyset pagination indexes
+
+Revision ID: e8c1f5a3b7d4
+Revises: 2f6d8a4c9e17
+Create Date: 2026-10-18 17:02:15.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8c1f5a3b7d4'
+down_revision: Union[str, Sequence[str], None] = '2f6d8a4c9e17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _user_id_expr(dialect: str) -> str:
+    # must render exactly like app.db.types.json_text(AuditLog.input_json, "user_id")
+    if dialect == "postgresql":
+        return "(input_json ->> 'user_id')"
+    return "json_extract(input_json, '$.user_id')"
+
+
+# (index, table, columns before the keyset tail, keyset tail)
+_INDEXES = [
+    ('ix_users_created_at', 'users', [], ['created_at', 'id']),
+    ('ix_traces_session_created', 'traces', ['session_id'], ['created_at', 'id']),
+    ('ix_sessions_last_activity', 'sessions', [], ['last_activity', 'session_id']),
+    ('ix_audit_logs_trace_created', 'audit_logs', ['trace_id'], ['created_at', 'id']),
+    ('ix_audit_logs_tool_created', 'audit_logs', ['tool_name'], ['created_at', 'id']),
+    ('ix_audit_logs_status_created', 'audit_logs', ['status'], ['created_at', 'id']),
+    ('ix_audit_logs_created_at', 'audit_logs', [], ['created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    # add the id tie-breaker so (ts, id) seeks and ORDER BY ts, id never sort
+    for name, table, prefix, tail in _INDEXES:
+        op.drop_index(name, table_name=table)
+        op.create_index(name, table, prefix + tail, unique=False)
+
+    op.drop_index('ix_audit_logs_input_user_id', table_name='audit_logs')
+    op.create_index(
+        'ix_audit_logs_input_user_id',
+        'audit_logs',
+        [sa.text(_user_id_expr(dialect)), sa.text('created_at'), sa.text('id')],
+    )
+
+    op.create_index('ix_products_created_at', 'products', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    op.drop_index('ix_products_created_at', table_name='products')
+
+    op.drop_index('ix_audit_logs_input_user_id', table_name='audit_logs')
+    op.create_index(
+        'ix_audit_logs_input_user_id', 'audit_logs', [sa.text(_user_id_expr(dialect)), sa.text('created_at')]
+    )
+
+    for name, table, prefix, tail in reversed(_INDEXES):
+        op.drop_index(name, table_name=table)
+        op.create_index(name, table, prefix + tail[:1], unique=False)
@@ -2,19 +2,26 @@ from __future__ import annotations
 
 import json
 import logging
+import time
 
 from pydantic import BaseModel
 
 from app.agent.types import AgentPlan
+from app.core import metrics
 from app.core.config import settings
 from app.agent.planner import simple_planner
+from contextvars import ContextVar
 from copy import deepcopy
+from functools import lru_cache
 from typing import Any
 import re
 
 
 logger = logging.getLogger(__name__)
 
+# set by admission control while the service is overloaded: plan without calling the LLM
+heuristic_only: ContextVar[bool] = ContextVar("heuristic_only", default=False)
+
 
 # # # ---------- Tool specs for the model (descriptions only; execution happens in our system) ----------
 # # def tool_catalog_for_prompt() -> str:
@@ -386,43 +393,71 @@ def _extract_json_object(text: str) -> dict[str, Any]:
     return json.loads(m.group(0))
 
 
+@lru_cache(maxsize=1)
+def _openai_client(api_key: str):
+    # one client (and connection pool) per key, shared by every turn
+    from openai import OpenAI
+    return OpenAI(api_key=api_key)
+
+
+@lru_cache(maxsize=1)
+def _plan_schema() -> dict:
+    return openai_strictify_json_schema(AgentPlan.model_json_schema())
+
+
 def llm_plan(user_message: str, user_id: str | None) -> AgentPlan:
+    return plan_message(user_message, user_id)[0]
+
+
+def plan_message(user_message: str, user_id: str | None) -> tuple[AgentPlan, str]:
+    """The plan, and which planner produced it: "llm" or "heuristic" (by mode or as a fallback)."""
     if settings.planner_mode.lower() != "llm":
-        return simple_planner(user_message, user_id=user_id)
+        return simple_planner(user_message, user_id=user_id), "heuristic"
+
+    if heuristic_only.get():
+        metrics.planner_fallbacks_total.inc("overloaded")
+        return simple_planner(user_message, user_id=user_id), "heuristic"
 
     if not settings.openai_api_key:
         logger.warning("OPENAI_API_KEY missing; using heuristic planner.")
-        return simple_planner(user_message, user_id=user_id)
+        metrics.planner_fallbacks_total.inc("no_api_key")
+        return simple_planner(user_message, user_id=user_id), "heuristic"
 
     try:
-        from openai import OpenAI
-        client = OpenAI(api_key=settings.openai_api_key)
-
-        schema = openai_strictify_json_schema(AgentPlan.model_json_schema())
-
-        response = client.responses.create(
-            model=settings.openai_model,
-            input=[
-                {"role": "system", "content": "You are a careful planner that outputs only schema-valid JSON."},
-                {"role": "user", "content": build_planner_instructions(user_message, user_id)},
-            ],
-            # Strongly reduce formatting errors
-            temperature=0,
-            top_p=1,
-            text={
-                "format": {
-                    "type": "json_schema",
-                    "name": "agent_plan",
-                    "strict": True,
-                    "schema": schema,
-                }
-            },
-        )
+        client = _openai_client(settings.openai_api_key)
+        schema = _plan_schema()
+
+        t0 = time.perf_counter()
+        try:
+            response = client.responses.create(
+                model=settings.openai_model,
+                input=[
+                    {"role": "system", "content": "You are a careful planner that outputs only schema-valid JSON."},
+                    {"role": "user", "content": build_planner_instructions(user_message, user_id)},
+                ],
+                # Strongly reduce formatting errors
+                temperature=0,
+                top_p=1,
+                text={
+                    "format": {
+                        "type": "json_schema",
+                        "name": "agent_plan",
+                        "strict": True,
+                        "schema": schema,
+                    }
+                },
+            )
+        except Exception:
+            metrics.llm_requests_total.inc("error")
+            metrics.llm_request_seconds.observe(time.perf_counter() - t0, "error")
+            raise
+        metrics.llm_requests_total.inc("ok")
+        metrics.llm_request_seconds.observe(time.perf_counter() - t0, "ok")
 
         # 1) If SDK parsed it, use it
         parsed = getattr(response, "output_parsed", None)
         if parsed is not None:
-            return AgentPlan.model_validate(parsed)
+            return AgentPlan.model_validate(parsed), "llm"
 
         # 2) Otherwise, parse JSON ourselves from output text
         # Prefer response.output_text if available
@@ -432,8 +467,9 @@ def llm_plan(user_message: str, user_id: str | None) -> AgentPlan:
             raw_text = response.output[0].content[0].text  # type: ignore[attr-defined]
 
         data = _extract_json_object(raw_text)
-        return AgentPlan.model_validate(data)
+        return AgentPlan.model_validate(data), "llm"
 
     except Exception as e:
         logger.exception("LLM planner failed; falling back to heuristic. Error=%s", e)
-        return simple_planner(user_message, user_id=user_id)
+        metrics.planner_fallbacks_total.inc("llm_error")
+        return simple_planner(user_message, user_id=user_id), "heuristic"
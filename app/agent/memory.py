@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import json
 from dataclasses import dataclass
 
 from sqlalchemy.orm import Session
@@ -19,19 +18,20 @@ def save_pending_confirmation(db: Session, trace_id: str, pending: PendingConfir
     tr = db.get(Trace, trace_id)
     if not tr:
         return
-    tr.plan_json = json.dumps({"pending_confirmation": pending.__dict__}, ensure_ascii=False)
+    # keep the plan already stored on the trace; the confirmation rides along with it.
+    # JSON columns are not mutation-tracked, so assign a new dict.
+    tr.plan_json = {**(tr.plan_json or {}), "pending_confirmation": dict(pending.__dict__)}
     db.commit()
 
 
 def load_pending_confirmation(db: Session, trace_id: str) -> PendingConfirmation | None:
     tr = db.get(Trace, trace_id)
-    if not tr or not tr.plan_json:
+    if not tr or not isinstance(tr.plan_json, dict):
+        return None
+    pc = tr.plan_json.get("pending_confirmation")
+    if not pc:
         return None
     try:
-        payload = json.loads(tr.plan_json)
-        pc = payload.get("pending_confirmation")
-        if not pc:
-            return None
         return PendingConfirmation(**pc)
-    except Exception:
+    except TypeError:
         return None
@@ -1,30 +1,38 @@
 from __future__ import annotations
 
-import json
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+
 from app.db.models import SessionMemory
+from app.db.profiles import savepoint
 
 
 def get_memory(db: Session, session_id: str) -> dict:
     row = db.query(SessionMemory).filter(SessionMemory.session_id == session_id).one_or_none()
     if not row:
         return {}
-    try:
-        return json.loads(row.memory_json) or {}
-    except Exception:
-        return {}
+    return dict(row.memory_json or {})
 
 
 def patch_memory(db: Session, session_id: str, patch: dict) -> dict:
-    mem = get_memory(db, session_id)
-    mem.update(patch)
+    for attempt in range(2):
+        mem = get_memory(db, session_id)
+        mem.update(patch)
 
-    row = db.query(SessionMemory).filter(SessionMemory.session_id == session_id).one_or_none()
-    if not row:
-        row = SessionMemory(session_id=session_id, memory_json=json.dumps(mem, ensure_ascii=False))
-        db.add(row)
-    else:
-        row.memory_json = json.dumps(mem, ensure_ascii=False)
+        row = db.query(SessionMemory).filter(SessionMemory.session_id == session_id).one_or_none()
+        try:
+            with savepoint(db):
+                if not row:
+                    db.add(SessionMemory(session_id=session_id, memory_json=mem))
+                else:
+                    row.memory_json = mem
+        except IntegrityError:
+            # a concurrent request created the row first (uq_session_memory_session_id): patch
+            # that one, once; only the savepoint is undone, not the caller's pending work
+            if attempt:
+                raise
+            continue
+        break
 
     db.commit()
     return mem
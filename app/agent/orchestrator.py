@@ -1,27 +1,41 @@
 # app/agent/orchestrator.py
 from __future__ import annotations
 
-import json
-from dataclasses import dataclass
-from typing import Any
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import cache
+from typing import Any, Callable, Iterator
 
 from sqlalchemy.orm import Session
 
-from app.agent.llm_planner import llm_plan
+from app.agent.llm_planner import plan_message
 from app.agent.memory import PendingConfirmation, save_pending_confirmation
 from app.agent.memory_store import get_memory, patch_memory
-from app.agent.policy import evaluate_plan
+from app.agent.policy import audit_decision, evaluate_plan
 from app.agent.resolver import parse_selection_index
-from app.agent.types import AgentPlan, PlanStepType, ToolName,ToolCall, PlanStep
+from app.agent.types import AgentPlan, PlanStepType, ToolName,ToolCall, PlanStep, TurnClass
+from app.core import metrics
+from app.core.logging import trace_id_var
+from app.db import payloads
 from app.db.models import Trace
+from app.services.sessions import record_turn
 from app.tools.balance import check_balance_tool
 from app.tools.products import search_products_tool
 from app.tools.purchase import execute_purchase_tool
 from app.tools.records import update_database_tool
-from app.tools.registry import ToolRegistry
+from app.tools.registry import ToolRegistry, ToolResult
 from app.utils.ids import new_confirmation_token, new_idempotency_key
 
 
+# progress(event, data): called as each stage of a planned turn completes (see POST /chat/stream)
+Progress = Callable[[str, dict[str, Any]], None]
+
+
+def _no_progress(event: str, data: dict[str, Any]) -> None:
+    pass
+
+
 @dataclass(frozen=True)
 class OrchestratorResult:
     trace_id: str
@@ -30,6 +44,7 @@ class OrchestratorResult:
     confirmation_token: str | None = None
 
 
+@cache  # registrations are static; built once and shared by every turn
 def _init_registry() -> ToolRegistry:
     reg = ToolRegistry()
     reg.register(ToolName.check_balance.value, check_balance_tool)
@@ -60,11 +75,51 @@ def _plan_needs_product_search(plan: AgentPlan, message: str) -> bool:
     return True
 
 
-def create_trace(db: Session, *, session_id: str, user_message: str) -> Trace:
+_TIMINGS = "turn_timings"
+
+
+@dataclass
+class _TurnTimings:
+    started: float
+    trace_id: str | None = None
+    stages: dict[str, float] = field(default_factory=dict)  # stage -> ms
+    planner: str | None = None
+
+
+def _start_turn(db: Session) -> _TurnTimings:
+    # one turn at a time per Session, so the current turn's timings live in session.info
+    timings = db.info[_TIMINGS] = _TurnTimings(started=time.perf_counter())
+    return timings
+
+
+def _timings(db: Session) -> _TurnTimings:
+    return db.info.get(_TIMINGS) or _start_turn(db)
+
+
+@contextmanager
+def _stage(db: Session, name: str) -> Iterator[None]:
+    """Time a stage of the current turn: into /metrics and onto the turn's trace."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        metrics.stage_seconds.observe(elapsed, name)
+        stages = _timings(db).stages
+        stages[name] = stages.get(name, 0.0) + elapsed * 1000
+
+
+def create_trace(db: Session, *, session_id: str, user_id: str | None, user_message: str) -> Trace:
+    timings = _timings(db)
+    if timings.trace_id is not None:
+        timings = _start_turn(db)  # a turn that never called _start_turn; don't inherit old stages
     tr = Trace(session_id=session_id, user_message=user_message, assistant_message=None, plan_json=None)
     db.add(tr)
+    record_turn(db, session_id=session_id, user_id=user_id, user_message=user_message)
     db.commit()
     db.refresh(tr)
+    timings.trace_id = tr.id
+    trace_id_var.set(tr.id)  # log records from here on carry it (reset by log_context)
     return tr
 
 
@@ -75,7 +130,17 @@ def update_trace(db: Session, *, trace_id: str, assistant_message: str | None, p
     if assistant_message is not None:
         tr.assistant_message = assistant_message
     if plan is not None:
-        tr.plan_json = plan.model_dump_json()
+        tr.plan_json = plan.model_dump(mode="json")
+        tr.intent = plan.intent.value
+    timings = db.info.get(_TIMINGS)
+    if timings is not None and timings.trace_id == trace_id:
+        # every update rewrites the timings, so the last one (the answer) has the full turn
+        tr.duration_ms = (time.perf_counter() - timings.started) * 1000
+        tr.memory_ms = timings.stages.get("memory_load")
+        tr.plan_ms = timings.stages.get("plan")
+        tr.policy_ms = timings.stages.get("policy")
+        tr.tools_ms = timings.stages.get("tools")
+        tr.planner = timings.planner
     db.commit()
 
 
@@ -92,6 +157,9 @@ def _format_product_candidates(candidates: list[dict[str, Any]]) -> str:
     return "\n".join(lines)
 
 
+_CANCEL_WORDS = {"cancel", "stop", "nevermind", "never mind"}
+
+
 def _try_handle_selection_flow(
     db: Session,
     *,
@@ -105,10 +173,10 @@ def _try_handle_selection_flow(
       - then automatically proceed to purchase confirmation flow.
     """
     msg = message.strip().lower()
-    if msg in {"cancel", "stop", "nevermind", "never mind"}:
+    if msg in _CANCEL_WORDS:
         # Clear selection memory
         patch_memory(db, session_id, {"last_product_candidates": [], "selected_product_id": None, "pending_qty": None})
-        tr = create_trace(db, session_id=session_id, user_message=message)
+        tr = create_trace(db, session_id=session_id, user_id=user_id, user_message=message)
         out = "Okay — canceled. What would you like to do next?"
         update_trace(db, trace_id=tr.id, assistant_message=out, plan=None)
         return OrchestratorResult(trace_id=tr.id, message=out)
@@ -117,13 +185,14 @@ def _try_handle_selection_flow(
     if idx is None:
         return None
 
-    mem = get_memory(db, session_id)
+    with _stage(db, "memory_load"):
+        mem = get_memory(db, session_id)
     candidates = mem.get("last_product_candidates") or []
     if not isinstance(candidates, list) or len(candidates) == 0:
         return None
 
     if idx < 1 or idx > len(candidates):
-        tr = create_trace(db, session_id=session_id, user_message=message)
+        tr = create_trace(db, session_id=session_id, user_id=user_id, user_message=message)
         out = f"That option number is out of range (1–{len(candidates)}). Please try again."
         update_trace(db, trace_id=tr.id, assistant_message=out, plan=None)
         return OrchestratorResult(trace_id=tr.id, message=out)
@@ -149,7 +218,7 @@ def _try_handle_selection_flow(
         },
     )
     # Persist it linked to a trace
-    tr = create_trace(db, session_id=session_id, user_message=message)
+    tr = create_trace(db, session_id=session_id, user_id=user_id, user_message=message)
     save_pending_confirmation(db, tr.id, pending)
 
     out = (
@@ -180,6 +249,7 @@ def handle_confirmation(
     if len(parts) != 2 or parts[0].lower() != "confirm":
         return None
     token = parts[1]
+    _start_turn(db)
 
     recent = (
         db.query(Trace)
@@ -189,20 +259,15 @@ def handle_confirmation(
         .all()
     )
 
+    payloads.prefetch(db, (tr.plan_ref for tr in recent))
     pending = None
     for tr in recent:
-        if not tr.plan_json:
-            continue
-        try:
-            payload = json.loads(tr.plan_json)
-            pc = payload.get("pending_confirmation")
-            if pc and pc.get("confirmation_token") == token:
-                pending = pc
-                break
-        except Exception:
-            continue
+        pc = tr.plan_json.get("pending_confirmation") if isinstance(tr.plan_json, dict) else None
+        if pc and pc.get("confirmation_token") == token:
+            pending = pc
+            break
 
-    exec_trace = create_trace(db, session_id=session_id, user_message=message)
+    exec_trace = create_trace(db, session_id=session_id, user_id=user_id, user_message=message)
 
     if not pending:
         out = "Invalid or expired confirmation token."
@@ -219,7 +284,8 @@ def handle_confirmation(
     args = dict(pending["tool_args"])
     args["user_id"] = user_id  # enforce current context user
 
-    result = reg.run_with_audit(db=db, trace_id=exec_trace.id, tool_name=tool_name, args=args)
+    with _stage(db, "tools"):
+        result = reg.run_with_audit(db=db, trace_id=exec_trace.id, tool_name=tool_name, args=args)
     if not result.ok:
         out = f"Purchase failed: {result.error}"
         update_trace(db, trace_id=exec_trace.id, assistant_message=out, plan=None)
@@ -236,13 +302,36 @@ def handle_confirmation(
     return OrchestratorResult(trace_id=exec_trace.id, message=out)
 
 
+def classify_turn(db: Session, *, session_id: str, message: str) -> TurnClass:
+    """The path handle_message will take for `message`, decided cheaply and without side effects."""
+    parts = message.strip().split()
+    if len(parts) == 2 and parts[0].lower() == "confirm":
+        return TurnClass.confirmation
+    msg = message.strip().lower()
+    if msg in _CANCEL_WORDS:
+        return TurnClass.selection
+    if parse_selection_index(message) is not None:
+        candidates = get_memory(db, session_id).get("last_product_candidates")
+        if isinstance(candidates, list) and candidates:
+            return TurnClass.selection
+    # same keywords the heuristic planner keys on
+    if any(k in msg for k in ["balance", "how much do i have", "my funds"]) and not any(
+        k in msg for k in ["buy", "purchase", "order"]
+    ):
+        return TurnClass.read_only
+    return TurnClass.planned
+
+
 def handle_message(
     db: Session,
     *,
     session_id: str,
     user_id: str | None,
     message: str,
+    progress: Progress | None = None,
 ) -> OrchestratorResult:
+    _start_turn(db)
+
     # 1) Confirmation path
     conf = handle_confirmation(db, session_id=session_id, user_id=user_id, message=message)
     if conf is not None:
@@ -254,7 +343,7 @@ def handle_message(
         return sel
 
     # 3) Normal planned flow
-    return _handle_planned_flow(db, session_id=session_id, user_id=user_id, message=message)
+    return _handle_planned_flow(db, session_id=session_id, user_id=user_id, message=message, progress=progress)
 
 
 def _handle_planned_flow(
@@ -264,6 +353,7 @@ def _handle_planned_flow(
     user_id: str | None,
     message: str,
     original_user_message: str | None = None,
+    progress: Progress | None = None,
 ) -> OrchestratorResult:
     """
     Core path:
@@ -271,10 +361,22 @@ def _handle_planned_flow(
     """
     
     reg = _init_registry()
-    trace = create_trace(db, session_id=session_id, user_message=original_user_message or message)
+    trace = create_trace(db, session_id=session_id, user_id=user_id, user_message=original_user_message or message)
+    progress = progress or _no_progress
+    progress("planning", {"trace_id": trace.id, "session_id": session_id})
+
+    def run_tool(tool_name: str, args: dict) -> ToolResult:
+        with _stage(db, "tools"):
+            result = reg.run_with_audit(db=db, trace_id=trace.id, tool_name=tool_name, args=args)
+        progress(
+            "tool_result",
+            {"trace_id": trace.id, "tool_name": tool_name, "ok": result.ok, "output": result.output, "error": result.error},
+        )
+        return result
 
     # Pull memory to help planning (e.g., reuse selected product)
-    mem = get_memory(db, session_id)
+    with _stage(db, "memory_load"):
+        mem = get_memory(db, session_id)
 
     # If user previously selected a product and is now saying "buy it" or similar, help the model.
     # Also, if selected_product_id exists and user says "buy" without product_id, we can inject.
@@ -285,7 +387,9 @@ def _handle_planned_flow(
         message = f"buy product_id={mem['selected_product_id']} qty={qty}"
 
     # Plan (LLM planner with fallback)
-    plan = llm_plan(message, user_id=user_id)
+    with _stage(db, "plan"):
+        plan, planner = plan_message(message, user_id=user_id)
+    _timings(db).planner = planner
     if _plan_needs_product_search(plan, message):
         # Force a deterministic search step
         # naive query extraction: use the full message; later you can improve extraction
@@ -312,6 +416,7 @@ def _handle_planned_flow(
             risk_level=plan.risk_level,
         )
     update_trace(db, trace_id=trace.id, assistant_message=None, plan=plan)
+    progress("plan", {"trace_id": trace.id, "plan": plan.model_dump(mode="json")})
 
     # If plan asks user something, return that immediately
     # If plan asks user something, only return it if it's truly needed
@@ -339,7 +444,9 @@ def _handle_planned_flow(
             return OrchestratorResult(trace_id=trace.id, message=out)
 
     # Policy decision (safety)
-    decision = evaluate_plan(db, plan, user_id=user_id)
+    with _stage(db, "policy"):
+        decision = evaluate_plan(db, plan, user_id=user_id)
+        audit_decision(db, trace_id=trace.id, user_id=user_id, decision=decision)
 
     if not decision.allowed:
         out = f"Cannot proceed: {decision.reason}."
@@ -385,7 +492,7 @@ def _handle_planned_flow(
             # Default limit if missing
             args.setdefault("limit", 5)
 
-            result = reg.run_with_audit(db=db, trace_id=trace.id, tool_name=tool_name, args=args)
+            result = run_tool(tool_name, args)
             if not result.ok:
                 out = f"Tool error ({tool_name}): {result.error}"
                 update_trace(db, trace_id=trace.id, assistant_message=out, plan=plan)
@@ -433,7 +540,8 @@ def _handle_planned_flow(
 
                 out = decision.confirmation_summary or "Please confirm this purchase."
                 out = f"{out}\n\nReply with: confirm {token}"
-                update_trace(db, trace_id=trace.id, assistant_message=out, plan=plan)
+                # plan=None: the plan is already stored and now carries the pending confirmation
+                update_trace(db, trace_id=trace.id, assistant_message=out, plan=None)
                 return OrchestratorResult(
                     trace_id=trace.id,
                     message=out,
@@ -442,7 +550,7 @@ def _handle_planned_flow(
                 )
 
             # (Should not reach here; safety: execute_purchase_tool also blocks if confirm=False)
-            result = reg.run_with_audit(db=db, trace_id=trace.id, tool_name=tool_name, args={**args, "confirm": False})
+            result = run_tool(tool_name, {**args, "confirm": False})
             if not result.ok:
                 out = f"Tool error ({tool_name}): {result.error}"
                 update_trace(db, trace_id=trace.id, assistant_message=out, plan=plan)
@@ -454,7 +562,7 @@ def _handle_planned_flow(
             # if not args.get('user_id'):
             #     if user_id:
             #         args['user_id'] = user_id
-            result = reg.run_with_audit(db=db, trace_id=trace.id, tool_name=tool_name, args=args)
+            result = run_tool(tool_name, args)
             if not result.ok:
                 out = f"Tool error ({tool_name}): {result.error}"
                 update_trace(db, trace_id=trace.id, assistant_message=out, plan=plan)
@@ -468,7 +576,7 @@ def _handle_planned_flow(
 
         # ---- Tool: update_database ----
         if tool_name == ToolName.update_database.value:
-            result = reg.run_with_audit(db=db, trace_id=trace.id, tool_name=tool_name, args=args)
+            result = run_tool(tool_name, args)
             if not result.ok:
                 out = f"Tool error ({tool_name}): {result.error}"
                 update_trace(db, trace_id=trace.id, assistant_message=out, plan=plan)
@@ -5,8 +5,12 @@ from decimal import Decimal
 from sqlalchemy.orm import Session
 
 from app.agent.types import AgentPlan, ToolName
+from app.core.config import settings
+from app.db.models import AuditLog, ToolCallStatus
 from app.services.accounts import get_balance
 from app.services.inventory import check_available
+from app.services.velocity import velocity
+from app.utils.money import format_minor, to_minor
 
 
 @dataclass(frozen=True)
@@ -15,6 +19,8 @@ class PolicyDecision:
     needs_confirmation: bool = False
     confirmation_summary: str | None = None
     reason: str | None = None
+    # velocity-limit snapshot for purchase plans (written to the audit trail)
+    limits: dict | None = None
 
 
 MAX_SINGLE_PURCHASE = Decimal("1500.00")
@@ -40,18 +46,43 @@ def evaluate_plan(db: Session, plan: AgentPlan, *, user_id: str | None) -> Polic
     qty = int(args.get("qty", 1))
 
     # Check inventory and compute total
-    unit_price, currency = check_available(db, product_id, qty)
-    total = (unit_price * Decimal(qty)).quantize(Decimal("0.01"))
+    unit_price_minor, currency = check_available(db, product_id, qty)
+    total_minor = unit_price_minor * qty
 
     # Hard cap
-    if total > MAX_SINGLE_PURCHASE:
+    if total_minor > to_minor(MAX_SINGLE_PURCHASE, currency):
         return PolicyDecision(allowed=False, reason="purchase_amount_exceeds_limit")
 
+    # Rolling-window spend / count limits (O(1) lookup, no scan over transactions)
+    limits = None
+    if settings.velocity_limits_enabled:
+        v = velocity.check(user_id, total_minor, currency)
+        limits = v.as_dict()
+        if not v.allowed:
+            return PolicyDecision(allowed=False, reason=v.reason, limits=limits)
+
     # Check funds
-    bal, _ = get_balance(db, user_id)
-    if Decimal(bal) < total:
-        return PolicyDecision(allowed=False, reason="insufficient_funds")
+    bal_minor, _ = get_balance(db, user_id, consistent=settings.account_cache_strict_purchases)
+    if bal_minor < total_minor:
+        return PolicyDecision(allowed=False, reason="insufficient_funds", limits=limits)
 
     # Always require confirmation for purchases
-    summary = f"Confirm purchase of {qty} item(s) (product_id={product_id}) for {total} {currency}?"
-    return PolicyDecision(allowed=True, needs_confirmation=True, confirmation_summary=summary)
+    summary = f"Confirm purchase of {qty} item(s) (product_id={product_id}) for {format_minor(total_minor, currency)} {currency}?"
+    return PolicyDecision(allowed=True, needs_confirmation=True, confirmation_summary=summary, limits=limits)
+
+
+def audit_decision(db: Session, *, trace_id: str, user_id: str | None, decision: PolicyDecision) -> None:
+    """Record the velocity-limit decision for a purchase plan in the audit trail."""
+    if decision.limits is None:
+        return
+    db.add(
+        AuditLog(
+            trace_id=trace_id,
+            tool_name="policy.velocity",
+            status=ToolCallStatus.ok if decision.limits["allowed"] else ToolCallStatus.blocked,
+            input_json={"user_id": user_id, "amount_minor": decision.limits["amount_minor"]},
+            output_json=decision.limits,
+            error_message=None if decision.limits["allowed"] else decision.reason,
+        )
+    )
+    # committed with the rest of the turn (the orchestrator's next trace update)
@@ -11,6 +11,14 @@ class Intent(str, Enum):
     unknown = "unknown"
 
 
+class TurnClass(str, Enum):
+    # scheduling class of a chat turn, cheapest / closest to revenue first
+    confirmation = "confirmation"
+    selection = "selection"
+    read_only = "read_only"
+    planned = "planned"
+
+
 class PlanStepType(str, Enum):
     tool_call = "tool_call"
     ask_user = "ask_user"
@@ -0,0 +1,101 @@
+"""
+Response compression: brotli (when installed) or gzip, for complete responses over a size threshold.
+
+Only responses sent in one piece are compressed. Streamed bodies (SSE, CSV/NDJSON exports)
+pass through untouched, so their chunks are never held back. Compression runs on a worker
+thread so a large body does not stall the event loop. Strong ETags become weak ones, since
+the encoded bytes differ from the identity representation.
+"""
+from __future__ import annotations
+
+import gzip
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+try:  # optional: smaller than gzip at a similar speed on JSON
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+_COMPRESSIBLE = ("application/json", "text/", "application/javascript", "image/svg+xml")
+_NEVER = ("text/event-stream",)
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """The encoding to use for an Accept-Encoding header: "br", "gzip" or None (identity)."""
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name.strip().lower()] = q
+    wildcard = accepted.get("*", 0.0)
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best = max(candidates, key=lambda e: accepted.get(e, wildcard))  # ties keep the earlier one
+    return best if accepted.get(best, wildcard) > 0 else None
+
+
+def compress(encoding: str, body: bytes) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.compression_brotli_quality)
+    return gzip.compress(body, compresslevel=settings.compression_gzip_level, mtime=0)
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int | None = None) -> None:
+        self.app = app
+        self.minimum_size = settings.compression_min_bytes if minimum_size is None else minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        start: Message | None = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message  # held until we know whether the body is compressed
+                return
+            if start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+            initial, start = start, None
+            headers = MutableHeaders(raw=initial["headers"])
+            body = message.get("body", b"")
+            content_type = headers.get("content-type", "")
+            if (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or not content_type.startswith(_COMPRESSIBLE)
+                or content_type.startswith(_NEVER)
+            ):
+                await send(initial)
+                await send(message)
+                return
+            # this response may be encoded for other clients: caches must key on Accept-Encoding
+            headers.add_vary_header("Accept-Encoding")
+            if encoding is None or len(body) < self.minimum_size:
+                await send(initial)
+                await send(message)
+                return
+            compressed = await anyio.to_thread.run_sync(compress, encoding, body)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = "W/" + etag
+            await send(initial)
+            await send({**message, "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,103 @@
+"""
+Sparse fieldsets (`fields=a,b,c`) for the UI read routes.
+
+Each selectable field names the columns it needs; a route loads only those (load_only with
+raiseload, so a field that forgets a column fails loudly instead of lazy-loading per row)
+and skips the stored-payload lookups of fields that were not asked for. `id` is always
+returned, since clients merge pages and deltas by it.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Mapping
+
+from fastapi import HTTPException
+from sqlalchemy.orm import InstrumentedAttribute, load_only
+
+from app.api.responses import RawJSON, raw_payloads
+from app.db.models import AuditLog, Trace
+
+Stored = Mapping[str | None, RawJSON]
+
+
+@dataclass(frozen=True)
+class Field:
+    columns: tuple[InstrumentedAttribute, ...]
+    value: Callable[[Any, Stored], Any]  # (row, stored payloads of the page) -> JSON value
+    options: tuple = ()  # extra loader options, e.g. raw_payloads()
+    payload_ref: InstrumentedAttribute | None = None  # content-addressed payload it renders
+
+
+class Fieldset:
+    def __init__(self, model_id: InstrumentedAttribute, fields: dict[str, Field]) -> None:
+        self.model_id = model_id
+        self.fields = fields
+
+    def parse(self, value: str | None, *, extra: tuple[str, ...] = ()) -> list[str]:
+        """`fields=` -> selected names in declaration order (all when absent); 400 on unknown ones."""
+        allowed = [*self.fields, *extra]
+        if value is None:
+            return allowed
+        names = {n.strip() for n in value.split(",") if n.strip()}
+        unknown = sorted(names.difference(allowed))
+        if unknown:
+            raise HTTPException(
+                status_code=400, detail=f"Unknown fields: {', '.join(unknown)} (allowed: {', '.join(allowed)})"
+            )
+        return [n for n in allowed if n in names or n == "id"]
+
+    def load_options(self, names: list[str], *always: InstrumentedAttribute) -> list:
+        """Loader options fetching only the columns behind `names` (plus `always`, e.g. sort keys)."""
+        columns = {self.model_id, *always}
+        options: list = []
+        for n in names:
+            if n in self.fields:
+                columns.update(self.fields[n].columns)
+                options.extend(self.fields[n].options)
+        return [load_only(*columns, raiseload=True), *options]
+
+    def payload_refs(self, names: list[str], rows: list) -> list[str | None]:
+        refs = []
+        for n in names:
+            ref = self.fields[n].payload_ref if n in self.fields else None
+            if ref is not None:
+                refs.extend(getattr(r, ref.key) for r in rows)
+        return refs
+
+    def render(self, row: Any, names: list[str], stored: Stored) -> dict[str, Any]:
+        return {n: self.fields[n].value(row, stored) for n in names if n in self.fields}
+
+
+def _column(attr: InstrumentedAttribute) -> Field:
+    return Field((attr,), lambda row, _stored, key=attr.key: getattr(row, key))
+
+
+TRACE_FIELDS = Fieldset(
+    Trace.id,
+    {
+        "id": _column(Trace.id),
+        "session_id": _column(Trace.session_id),
+        "user_message": _column(Trace.user_message),
+        "assistant_message": _column(Trace.assistant_message),
+        "plan": Field((Trace.plan_ref,), lambda t, stored: stored[t.plan_ref], payload_ref=Trace.plan_ref),
+        "created_at": _column(Trace.created_at),
+    },
+)
+
+AUDIT_LOG_FIELDS = Fieldset(
+    AuditLog.id,
+    {
+        "id": _column(AuditLog.id),
+        "trace_id": _column(AuditLog.trace_id),
+        "tool_name": _column(AuditLog.tool_name),
+        "status": Field((AuditLog.status,), lambda log, _stored: str(log.status)),
+        "input": Field(
+            (), lambda log, _stored: RawJSON(log.input_json_raw), options=tuple(raw_payloads(AuditLog.input_json))
+        ),
+        "output": Field(
+            (AuditLog.output_ref,), lambda log, stored: stored[log.output_ref], payload_ref=AuditLog.output_ref
+        ),
+        "error_message": _column(AuditLog.error_message),
+        "created_at": _column(AuditLog.created_at),
+    },
+)
@@ -0,0 +1,91 @@
+"""
+Keyset (seek) pagination shared by the list endpoints.
+
+A page is ordered by (timestamp, key) and the next one starts strictly after the last row
+returned, so every page is an index range scan whatever its depth. Cursors are opaque to
+clients: urlsafe base64 of the last row's [timestamp, key].
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+from datetime import datetime
+from typing import Any
+
+from fastapi import HTTPException
+from sqlalchemy import String, literal, tuple_, type_coerce
+from sqlalchemy.orm import InstrumentedAttribute, Query
+
+from app.utils import jsoncodec
+
+
+def encode_cursor(ts: Any, key: str) -> str:
+    if isinstance(ts, datetime):
+        ts = ts.isoformat()
+    return base64.urlsafe_b64encode(jsoncodec.dumps([ts, key]).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        ts, key = jsoncodec.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+    if not isinstance(ts, str) or not isinstance(key, str):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return ts, key
+
+
+def keyset_rows(
+    query: Query,
+    ts_col: InstrumentedAttribute,
+    key_col: InstrumentedAttribute,
+    *,
+    cursor: str | None,
+    limit: int,
+    descending: bool = False,
+) -> tuple[list[tuple[Any, str]], bool]:
+    """
+    Up to `limit` rows of `query` after `cursor`, each paired with its own cursor, and whether
+    more rows follow. `query` must not be ordered; needs an index ending in (ts_col, key_col)
+    after its equality filters.
+    """
+    sqlite = query.session.get_bind().dialect.name == "sqlite"
+    if cursor:
+        ts, key = decode_cursor(cursor)
+        if sqlite:
+            # compare against the stored text exactly; re-rendering a datetime may not round-trip
+            bound_ts = literal(ts, String)
+        else:
+            try:
+                bound_ts = literal(datetime.fromisoformat(ts), ts_col.type)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor") from None
+        row, bound = tuple_(ts_col, key_col), tuple_(bound_ts, literal(key, String))
+        query = query.filter(row < bound if descending else row > bound)
+
+    order = (ts_col.desc(), key_col.desc()) if descending else (ts_col.asc(), key_col.asc())
+    rows = (
+        query.add_columns(type_coerce(ts_col, String).label("cursor_ts"))
+        .order_by(*order)
+        .limit(limit + 1)
+        .all()
+    )
+    page = [(r[0], encode_cursor(r.cursor_ts, getattr(r[0], key_col.key))) for r in rows[:limit]]
+    return page, len(rows) > limit
+
+
+def keyset_page(
+    query: Query,
+    ts_col: InstrumentedAttribute,
+    key_col: InstrumentedAttribute,
+    *,
+    cursor: str | None,
+    limit: int,
+    descending: bool = False,
+) -> tuple[list[Any], str | None]:
+    """
+    Return up to `limit` rows of `query` after `cursor`, and the cursor of the following
+    page (None on the last page).
+    """
+    page, more = keyset_rows(query, ts_col, key_col, cursor=cursor, limit=limit, descending=descending)
+    return [item for item, _ in page], (page[-1][1] if more else None)
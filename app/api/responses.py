@@ -0,0 +1,47 @@
+"""
+Responses that pass stored JSON payloads through without decoding them.
+
+Payloads only ever hold valid JSON (they are encoded by app.utils.jsoncodec on write), so read
+routes wrap their text in RawJSON and RawJSONResponse splices it into the body as-is instead
+of a parse -> objects -> dump round trip per row. Inline JSON columns are loaded as text with
+raw_payloads(); content-addressed ones (plans, tool outputs) come from stored_payloads().
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Any, Iterable
+
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import InstrumentedAttribute, Session, defer, with_expression
+
+from app.db import payloads
+from app.db.models import AuditLog
+from app.db.types import raw_json
+from app.utils.jsoncodec import RawJSON, dumps_with_raw
+
+# inline payload column -> query_expression() attribute holding its stored text
+_RAW = {
+    "input_json": AuditLog.input_json_raw,
+}
+
+__all__ = ["RawJSON", "RawJSONResponse", "raw_payloads", "stored_payloads"]
+
+
+def raw_payloads(*columns: InstrumentedAttribute) -> list:
+    """Loader options: skip decoding `columns`, load their text into the matching *_raw attribute."""
+    options = []
+    for column in columns:
+        options.append(defer(column))
+        options.append(with_expression(_RAW[column.key], raw_json(column)))
+    return options
+
+
+def stored_payloads(db: Session, refs: Iterable[str | None]) -> dict[str | None, RawJSON]:
+    """RawJSON for each payload reference of a page (None -> null), uncached ones in one query."""
+    found = payloads.texts(db, refs)
+    return defaultdict(lambda: RawJSON(None), {ref: RawJSON(text) for ref, text in found.items()})
+
+
+class RawJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps_with_raw(content).encode("utf-8")
@@ -3,11 +3,32 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
+from app.db import payloads
 from app.db.deps import get_db
 from app.db.seed import seed_synthetic_data
+from app.services.account_cache import account_cache
+from app.services.admission import admission
+from app.services.session_lanes import session_lanes
 
 router = APIRouter(tags=["admin"])
 
 @router.post("/admin/seed")
 def seed(db: Session = Depends(get_db)):
     return seed_synthetic_data(db)
+
+
+@router.get("/admin/cache_stats")
+def cache_stats():
+    return {"account_snapshots": account_cache.stats(), "payloads": payloads.payload_cache.stats()}
+
+
+@router.get("/admin/payload_stats")
+def payload_stats(db: Session = Depends(get_db)):
+    """Deduplication of plans and tool outputs across the whole payload store."""
+    return payloads.db_stats(db)
+
+
+@router.get("/admin/chat_stats")
+def chat_stats():
+    """Admission control (with per-class scheduler waits) and per-session lanes: depths, waits, rejections."""
+    return {"admission": admission.stats(), "session_lanes": session_lanes.stats()}
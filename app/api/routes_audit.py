@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-import json
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
+from app.api.pagination import keyset_page
+from app.db import payloads
 from app.db.deps import get_db
-from app.db.models import AuditLog  # adjust if your model name differs
+from app.db.models import AuditLog, ToolCallStatus
 
 router = APIRouter(tags=["audit"])
 
@@ -13,35 +14,29 @@ router = APIRouter(tags=["audit"])
 @router.get("/audit_logs")
 def list_audit_logs(
     trace_id: str = Query(...),
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=100, ge=1, le=500),
     db: Session = Depends(get_db),
 ):
-    rows = (
-        db.query(AuditLog)
-        .filter(AuditLog.trace_id == trace_id)
-        .order_by(AuditLog.created_at.asc())
-        .all()
+    rows, next_cursor = keyset_page(
+        db.query(AuditLog).filter(AuditLog.trace_id == trace_id),
+        AuditLog.created_at,
+        AuditLog.id,
+        cursor=cursor,
+        limit=limit,
     )
+    payloads.prefetch(db, (r.output_ref for r in rows))
     out = []
     for r in rows:
-        def _j(v):
-            if v is None:
-                return None
-            if isinstance(v, (dict, list)):
-                return v
-            try:
-                return json.loads(v)
-            except Exception:
-                return v
-
         out.append(
             {
                 "id": r.id,
                 "created_at": r.created_at.isoformat() if r.created_at else None,
                 "tool_name": r.tool_name,
-                "ok": bool(r.ok),
-                "args": _j(r.args_json),
-                "output": _j(r.output_json),
-                "error": r.error,
+                "ok": r.status == ToolCallStatus.ok,
+                "args": r.input_json,
+                "output": r.output_json,
+                "error": r.error_message,
             }
         )
-    return out
+    return {"items": out, "next_cursor": next_cursor}
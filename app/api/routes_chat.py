@@ -1,17 +1,63 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+import logging
+import queue
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.core.logging import log_context
 from app.db.deps import get_db
-from app.schemas.chat import ChatRequest, ChatResponse
-from app.agent.orchestrator import handle_message, handle_confirmation
+from app.schemas.chat import ChatBatchItem, ChatBatchRequest, ChatBatchResponse, ChatRequest, ChatResponse
+from app.agent.orchestrator import Progress, classify_turn, handle_message, handle_confirmation
+from app.agent.types import TurnClass
+from app.services.admission import AdmissionRejected, admission
+from app.services.session_lanes import session_lanes
+from app.utils import jsoncodec
 
 router = APIRouter(tags=["chat"])
 
+logger = logging.getLogger(__name__)
 
-@router.post("/chat", response_model=ChatResponse)
-def chat(req: ChatRequest, db: Session = Depends(get_db)) -> ChatResponse:
+# streamed turns outlive their request handler; a shared pool bounds the threads they hold
+# while waiting in a session lane or for an admission slot
+_stream_pool = ThreadPoolExecutor(max_workers=settings.chat_stream_workers, thread_name_prefix="chat-stream")
+
+
+def _http_error(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(status_code=e.status_code, detail=e.detail, headers=e.headers)
+
+
+def _screen(db: Session, req: ChatRequest) -> TurnClass:
+    """Classify the turn and apply the caller's rate limit and the up-front capacity check."""
+    turn_class = classify_turn(db, session_id=req.session_id, message=req.message)
+    db.rollback()  # don't hold a read transaction open while queued
+    try:
+        admission.screen(req.user_id or req.session_id, turn_class)
+    except AdmissionRejected as e:
+        raise _http_error(e) from e
+    return turn_class
+
+
+def _respond(
+    db: Session, req: ChatRequest, turn_class: TurnClass, progress: Progress | None = None
+) -> ChatResponse:
+    # one turn at a time per session: memory patches and confirmations are read-modify-write.
+    # The admission slot is taken only once the turn is next in its lane, so a burst from one
+    # session waits in its lane instead of holding slots other sessions could use.
+    with log_context(session_id=req.session_id), session_lanes.lane(req.session_id):
+        with admission.admit(None, turn_class):
+            return _respond_in_lane(db, req, progress)
+
+
+def _respond_in_lane(db: Session, req: ChatRequest, progress: Progress | None) -> ChatResponse:
     # If this is a confirmation, route it
     conf = handle_confirmation(db, session_id=req.session_id, user_id=req.user_id, message=req.message)
     if conf is not None:
@@ -23,7 +69,7 @@ def chat(req: ChatRequest, db: Session = Depends(get_db)) -> ChatResponse:
             confirmation_token=None,
         )
 
-    res = handle_message(db, session_id=req.session_id, user_id=req.user_id, message=req.message)
+    res = handle_message(db, session_id=req.session_id, user_id=req.user_id, message=req.message, progress=progress)
     return ChatResponse(
         trace_id=res.trace_id,
         session_id=req.session_id,
@@ -31,3 +77,117 @@ def chat(req: ChatRequest, db: Session = Depends(get_db)) -> ChatResponse:
         needs_confirmation=res.needs_confirmation,
         confirmation_token=res.confirmation_token,
     )
+
+
+@router.post("/chat", response_model=ChatResponse)
+def chat(req: ChatRequest, db: Session = Depends(get_db)) -> ChatResponse:
+    turn_class = _screen(db, req)
+    try:
+        return _respond(db, req, turn_class)
+    except AdmissionRejected as e:
+        raise _http_error(e) from e
+
+
+def _sse(event: str, data: str) -> bytes:
+    # data is single-line JSON, so one `data:` field per event
+    return f"event: {event}\ndata: {data}\n\n".encode("utf-8")
+
+
+@router.post("/chat/stream")
+def chat_stream(req: ChatRequest, db: Session = Depends(get_db)) -> StreamingResponse:
+    """
+    /chat as Server-Sent Events: `planning`, `plan` and `tool_result` as each stage of a planned
+    turn completes, then `message`, whose data is byte-for-byte the /chat response body (or
+    `error`). Confirmations and option picks only send `message`. Rate limits and the up-front
+    capacity check run before the stream starts, so those rejections are plain 429/503
+    responses; a turn that then times out waiting for a slot ends with an `error` event.
+    """
+    turn_class = _screen(db, req)
+    # the request's session is closed before the body is sent; the turn needs its own
+    bind = db.get_bind()
+    events: queue.Queue[bytes | None] = queue.Queue()
+
+    def progress(event: str, data: dict[str, Any]) -> None:
+        events.put(_sse(event, jsoncodec.dumps(data)))
+
+    def run() -> None:
+        try:
+            with Session(bind) as s:
+                resp = _respond(s, req, turn_class, progress)
+            # rendered exactly like the response_model of POST /chat
+            events.put(_sse("message", JSONResponse(jsonable_encoder(resp)).body.decode("utf-8")))
+        except AdmissionRejected as e:
+            events.put(_sse("error", jsoncodec.dumps({"detail": e.detail, "status_code": e.status_code})))
+        except Exception:
+            logger.exception("Streamed chat turn failed (session %s)", req.session_id)
+            events.put(_sse("error", jsoncodec.dumps({"detail": "Internal Server Error"})))
+        finally:
+            events.put(None)
+
+    # the turn runs to completion (and commits) even if the client goes away
+    _stream_pool.submit(run)
+
+    def body() -> Iterator[bytes]:
+        while (chunk := events.get()) is not None:
+            yield chunk
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/chat/batch", response_model=ChatBatchResponse)
+def chat_batch(req: ChatBatchRequest, db: Session = Depends(get_db)) -> ChatBatchResponse:
+    """
+    Many /chat turns in one request. Turns are grouped by session_id: each session runs its
+    turns in list order on one pooled DB session, and up to CHAT_BATCH_WORKERS sessions run
+    concurrently. Each turn is charged to its caller's rate limit like a /chat request. A
+    failed or rejected turn is reported in its item and does not stop the rest.
+    """
+    started = time.perf_counter()
+    lanes: dict[str, list[int]] = defaultdict(list)
+    for i, item in enumerate(req.items):
+        lanes[item.session_id].append(i)
+
+    bind = db.get_bind()
+    results: list[ChatBatchItem | None] = [None] * len(req.items)
+
+    def run_lane(indexes: list[int]) -> None:
+        with Session(bind) as s:
+            for i in indexes:
+                item = req.items[i]
+                t0 = time.perf_counter()
+                try:
+                    turn_class = classify_turn(s, session_id=item.session_id, message=item.message)
+                    s.rollback()
+                    admission.screen(item.user_id or item.session_id, turn_class)
+                    resp, error, status = _respond(s, item, turn_class), None, 200
+                except AdmissionRejected as e:
+                    resp, error, status = None, e.detail, e.status_code
+                except Exception:
+                    logger.exception("Batched chat turn %d failed (session %s)", i, item.session_id)
+                    s.rollback()
+                    resp, error, status = None, "Internal Server Error", 500
+                results[i] = ChatBatchItem(
+                    index=i,
+                    session_id=item.session_id,
+                    ok=error is None,
+                    status_code=status,
+                    response=resp,
+                    error=error,
+                    duration_ms=round((time.perf_counter() - t0) * 1000, 3),
+                )
+
+    workers = max(1, min(settings.chat_batch_workers, len(lanes)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chat-batch") as pool:
+        # list() re-raises anything that escaped a lane
+        list(pool.map(run_lane, lanes.values()))
+
+    return ChatBatchResponse(
+        items=results,
+        sessions=len(lanes),
+        workers=workers,
+        duration_ms=round((time.perf_counter() - started) * 1000, 3),
+    )
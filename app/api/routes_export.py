@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.db.deps import get_db
+from app.services.export import ExportFilter, export_query, iter_ndjson, iter_records
+
+router = APIRouter(tags=["export"])
+
+
+@router.get("/export/{kind}")
+def export(
+    kind: str,
+    since: datetime | None = Query(default=None),
+    until: datetime | None = Query(default=None),
+    session_id: str | None = Query(default=None),
+    tool_name: str | None = Query(default=None),
+    compress: bool = Query(default=False, alias="gzip"),
+    db: Session = Depends(get_db),
+):
+    """
+    Full export as streamed NDJSON (kind: traces, audit_logs, transactions), oldest first.
+    """
+    f = ExportFilter(since=since, until=until, session_id=session_id, tool_name=tool_name)
+    try:
+        stmt = export_query(kind, f)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    # the request's session is closed before the body is sent; the stream needs its own
+    bind = db.get_bind()
+
+    def body():
+        with Session(bind) as s:
+            yield from iter_ndjson(iter_records(s, kind, stmt), compress=compress)
+
+    filename = f"{kind}.ndjson" + (".gz" if compress else "")
+    return StreamingResponse(
+        body(),
+        media_type="application/gzip" if compress else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -1,95 +1,87 @@
 from __future__ import annotations
 
-import json
-from typing import Any
-
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from app.api.pagination import keyset_page
+from app.api.responses import RawJSON, RawJSONResponse, raw_payloads, stored_payloads
 from app.db.deps import get_db
-from app.db.models import AuditLog, Trace, User
-from app.schemas.api import AuditLogOut, SessionOut, TraceOut, UserOut
+from app.db.models import AuditLog, SessionSummary, Trace, User
+from app.schemas.api import AuditLogOut, Page, SessionOut, TraceOut, UserOut
 
 router = APIRouter(tags=["frontend"])
 
 
-@router.get("/users", response_model=list[UserOut])
+@router.get("/users", response_model=Page[UserOut])
 def list_users(
+    cursor: str | None = Query(default=None),
     limit: int = Query(default=25, ge=1, le=200),
     db: Session = Depends(get_db),
 ):
-    users = db.query(User).order_by(User.created_at.desc()).limit(limit).all()  # type: ignore[attr-defined]
-    return [UserOut(id=u.id, full_name=u.full_name, email=u.email) for u in users]
+    users, next_cursor = keyset_page(
+        db.query(User), User.created_at, User.id, cursor=cursor, limit=limit, descending=True
+    )
+    return Page(items=[UserOut(id=u.id, full_name=u.full_name, email=u.email) for u in users], next_cursor=next_cursor)
 
 
-@router.get("/sessions", response_model=list[SessionOut])
+@router.get("/sessions", response_model=Page[SessionOut])
 def list_sessions(
+    cursor: str | None = Query(default=None),
     limit: int = Query(default=50, ge=1, le=500),
     db: Session = Depends(get_db),
 ):
-    # Get last trace per session_id
-    subq = (
-        db.query(
-            Trace.session_id.label("session_id"),
-            func.max(Trace.created_at).label("last_message_at"),
-        )
-        .group_by(Trace.session_id)
-        .subquery()
-    )
-
-    rows = (
-        db.query(Trace)
-        .join(subq, (Trace.session_id == subq.c.session_id) & (Trace.created_at == subq.c.last_message_at))
-        .order_by(Trace.created_at.desc())
-        .limit(limit)
-        .all()
+    rows, next_cursor = keyset_page(
+        db.query(SessionSummary),
+        SessionSummary.last_activity,
+        SessionSummary.session_id,
+        cursor=cursor,
+        limit=limit,
+        descending=True,
     )
 
-    return [
+    items = [
         SessionOut(
-            session_id=t.session_id,
-            last_message_at=t.created_at,
-            last_user_message=t.user_message,
+            session_id=r.session_id,
+            user_id=r.user_id,
+            last_message_at=r.last_activity,
+            last_user_message=r.last_user_message,
+            turns=r.turns,
         )
-        for t in rows
+        for r in rows
     ]
+    return Page(items=items, next_cursor=next_cursor)
 
 
-@router.get("/sessions/{session_id}/traces", response_model=list[TraceOut])
+@router.get("/sessions/{session_id}/traces", response_model=Page[TraceOut])
 def get_session_traces(
     session_id: str,
+    cursor: str | None = Query(default=None),
     limit: int = Query(default=100, ge=1, le=500),
     db: Session = Depends(get_db),
 ):
-    traces = (
-        db.query(Trace)
-        .filter(Trace.session_id == session_id)
-        .order_by(Trace.created_at.asc())
-        .limit(limit)
-        .all()
+    traces, next_cursor = keyset_page(
+        db.query(Trace).filter(Trace.session_id == session_id),
+        Trace.created_at,
+        Trace.id,
+        cursor=cursor,
+        limit=limit,
     )
 
-    out: list[TraceOut] = []
+    # TraceOut-shaped dicts; plans are passed through without decoding
+    plans = stored_payloads(db, (t.plan_ref for t in traces))
+    out = []
     for t in traces:
-        plan_dict: dict[str, Any] | None = None
-        if t.plan_json:
-            try:
-                plan_dict = json.loads(t.plan_json)
-            except Exception:
-                plan_dict = None
-
         out.append(
-            TraceOut(
-                id=t.id,
-                session_id=t.session_id,
-                user_message=t.user_message,
-                assistant_message=t.assistant_message,
-                created_at=t.created_at,
-                plan_json=plan_dict,
-            )
+            {
+                "id": t.id,
+                "session_id": t.session_id,
+                "user_message": t.user_message,
+                "assistant_message": t.assistant_message,
+                "plan_json": plans[t.plan_ref],
+                "created_at": t.created_at,
+            }
         )
-    return out
+    return RawJSONResponse({"items": out, "next_cursor": next_cursor})
 
 
 @router.get("/traces/{trace_id}", response_model=TraceOut)
@@ -103,45 +95,47 @@ def get_trace(
         from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Trace not found")
 
-    plan_dict: dict[str, Any] | None = None
-    if t.plan_json:
-        try:
-            plan_dict = json.loads(t.plan_json)
-        except Exception:
-            plan_dict = None
-
-    return TraceOut(
-        id=t.id,
-        session_id=t.session_id,
-        user_message=t.user_message,
-        assistant_message=t.assistant_message,
-        created_at=t.created_at,
-        plan_json=plan_dict,
+    return RawJSONResponse(
+        {
+            "id": t.id,
+            "session_id": t.session_id,
+            "user_message": t.user_message,
+            "assistant_message": t.assistant_message,
+            "plan_json": stored_payloads(db, [t.plan_ref])[t.plan_ref],
+            "created_at": t.created_at,
+        }
     )
 
 
-@router.get("/traces/{trace_id}/audit_logs", response_model=list[AuditLogOut])
+@router.get("/traces/{trace_id}/audit_logs", response_model=Page[AuditLogOut])
 def get_trace_audit_logs(
     trace_id: str,
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=100, ge=1, le=500),
     db: Session = Depends(get_db),
 ):
-    logs = (
+    logs, next_cursor = keyset_page(
         db.query(AuditLog)
-        .filter(AuditLog.trace_id == trace_id)
-        .order_by(AuditLog.created_at.asc())
-        .all()
+        .options(*raw_payloads(AuditLog.input_json))
+        .filter(AuditLog.trace_id == trace_id),
+        AuditLog.created_at,
+        AuditLog.id,
+        cursor=cursor,
+        limit=limit,
     )
-
-    return [
-        AuditLogOut(
-            id=l.id,
-            trace_id=l.trace_id,
-            tool_name=l.tool_name,
-            status=str(l.status),
-            input_json=l.input_json,
-            output_json=l.output_json,
-            error_message=l.error_message,
-            created_at=l.created_at,
-        )
-        for l in logs
+    outputs = stored_payloads(db, (log.output_ref for log in logs))
+
+    items = [
+        {
+            "id": log.id,
+            "trace_id": log.trace_id,
+            "tool_name": log.tool_name,
+            "status": str(log.status),
+            "input_json": RawJSON(log.input_json_raw),
+            "output_json": outputs[log.output_ref],
+            "error_message": log.error_message,
+            "created_at": log.created_at,
+        }
+        for log in logs
     ]
+    return RawJSONResponse({"items": items, "next_cursor": next_cursor})
@@ -3,6 +3,7 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
+from app.db import payloads
 from app.db.deps import get_db
 from app.db.models import AuditLog, Trace
 
@@ -15,6 +16,7 @@ def get_logs(trace_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Trace not found")
 
     audit = db.query(AuditLog).filter(AuditLog.trace_id == trace_id).order_by(AuditLog.created_at.asc()).all()
+    payloads.prefetch(db, [trace.plan_ref, *(a.output_ref for a in audit)])
 
     return {
         "trace": {
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import time
+from typing import Iterable
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+from app.db import payloads
+from app.db.session import engine
+from app.services.account_cache import account_cache
+from app.services.admission import admission
+from app.services.session_lanes import session_lanes
+
+router = APIRouter(tags=["observability"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics_endpoint() -> PlainTextResponse:
+    """Prometheus text exposition of every in-process metric."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+class RouteTimingMiddleware:
+    """Observes each HTTP request, labelled by route template (not raw path), until its body is sent."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        t0 = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # the router stores the matched route on the shared scope
+            route = scope.get("route")
+            metrics.http_request_seconds.observe(
+                time.perf_counter() - t0,
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status),
+            )
+
+
+def _gauge(name: str, help: str, samples: list) -> metrics.Family:
+    return name, "gauge", help, samples
+
+
+def _counter(name: str, help: str, samples: list) -> metrics.Family:
+    return name, "counter", help, samples
+
+
+def _db_pool() -> Iterable[metrics.Family]:
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return []  # e.g. StaticPool for in-memory SQLite
+    return [
+        _gauge("sentinelflow_db_pool_size", "Configured pool size.", [({}, pool.size())]),
+        _gauge("sentinelflow_db_pool_checked_out", "Connections in use.", [({}, pool.checkedout())]),
+        _gauge("sentinelflow_db_pool_idle", "Connections idle in the pool.", [({}, pool.checkedin())]),
+        _gauge("sentinelflow_db_pool_overflow", "Connections open beyond pool_size.", [({}, max(0, pool.overflow()))]),
+    ]
+
+
+def _caches() -> Iterable[metrics.Family]:
+    caches = {"account_snapshots": account_cache.stats(), "payloads": payloads.payload_cache.stats()}
+    lookups = [
+        ({"cache": c, "result": result}, st[key])
+        for c, st in caches.items()
+        for result, key in (("hit", "hits"), ("miss", "misses"))
+    ]
+    return [
+        _counter("sentinelflow_cache_lookups_total", "Cache lookups by result.", lookups),
+        _gauge(
+            "sentinelflow_cache_hit_ratio",
+            "Hits / lookups since start.",
+            [({"cache": c}, st["hit_rate"]) for c, st in caches.items()],
+        ),
+        _gauge(
+            "sentinelflow_cache_entries",
+            "Entries currently cached.",
+            [({"cache": c}, st["entries"]) for c, st in caches.items()],
+        ),
+    ]
+
+
+def _chat_queues() -> Iterable[metrics.Family]:
+    adm, lanes = admission.stats(), session_lanes.stats()
+    queued = [({"class": c}, st["queued_now"]) for c, st in adm["classes"].items()]
+    rejected = [({"reason": r}, adm[f"rejected_{r}"]) for r in ("rate", "full", "deadline")]
+    rejected.append(({"reason": "timeout"}, adm["timed_out"]))
+    return [
+        _gauge("sentinelflow_admission_running", "Chat turns holding an admission slot.", [({}, adm["running"])]),
+        _gauge("sentinelflow_admission_queued", "Chat turns waiting for a slot.", queued),
+        _counter("sentinelflow_admission_rejected_total", "Chat turns refused by admission control.", rejected),
+        _counter(
+            "sentinelflow_admission_degraded_total",
+            "Turns planned heuristically due to queue depth.",
+            [({}, adm["degraded"])],
+        ),
+        _gauge("sentinelflow_session_lanes", "Per-session execution lanes alive.", [({}, lanes["lanes"])]),
+        _gauge(
+            "sentinelflow_session_lanes_queued",
+            "Turns waiting behind another turn of their session.",
+            [({}, lanes["queued_now"])],
+        ),
+    ]
+
+
+for _collector in (_db_pool, _caches, _chat_queues):
+    metrics.register_collector(_collector)
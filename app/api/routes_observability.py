@@ -3,27 +3,32 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
+from app.api.pagination import keyset_page
+from app.db import payloads
 from app.db.deps import get_db
 from app.db.models import Trace, AuditLog
+from app.schemas.api import Page
 from app.schemas.observability import TraceOut, AuditLogOut
 
 router = APIRouter(tags=["observability"])
 
 
-@router.get("/sessions/{session_id}/traces", response_model=list[TraceOut])
+@router.get("/sessions/{session_id}/traces", response_model=Page[TraceOut])
 def list_session_traces(
     session_id: str,
+    cursor: str | None = Query(default=None),
     limit: int = Query(default=50, ge=1, le=200),
     db: Session = Depends(get_db),
 ):
-    rows = (
-        db.query(Trace)
-        .filter(Trace.session_id == session_id)
-        .order_by(Trace.created_at.asc())
-        .limit(limit)
-        .all()
+    rows, next_cursor = keyset_page(
+        db.query(Trace).filter(Trace.session_id == session_id),
+        Trace.created_at,
+        Trace.id,
+        cursor=cursor,
+        limit=limit,
     )
-    return [
+    payloads.prefetch(db, (t.plan_ref for t in rows))
+    items = [
         TraceOut(
             id=t.id,
             session_id=t.session_id,
@@ -34,6 +39,7 @@ def list_session_traces(
         )
         for t in rows
     ]
+    return Page(items=items, next_cursor=next_cursor)
 
 
 @router.get("/traces/{trace_id}", response_model=TraceOut)
@@ -54,15 +60,22 @@ def get_trace(trace_id: str, db: Session = Depends(get_db)):
     )
 
 
-@router.get("/traces/{trace_id}/audit_logs", response_model=list[AuditLogOut])
-def list_audit_logs(trace_id: str, db: Session = Depends(get_db)):
-    rows = (
-        db.query(AuditLog)
-        .filter(AuditLog.trace_id == trace_id)
-        .order_by(AuditLog.created_at.asc())
-        .all()
+@router.get("/traces/{trace_id}/audit_logs", response_model=Page[AuditLogOut])
+def list_audit_logs(
+    trace_id: str,
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=100, ge=1, le=500),
+    db: Session = Depends(get_db),
+):
+    rows, next_cursor = keyset_page(
+        db.query(AuditLog).filter(AuditLog.trace_id == trace_id),
+        AuditLog.created_at,
+        AuditLog.id,
+        cursor=cursor,
+        limit=limit,
     )
-    return [
+    payloads.prefetch(db, (a.output_ref for a in rows))
+    items = [
         AuditLogOut(
             id=a.id,
             trace_id=a.trace_id,
@@ -75,3 +88,4 @@ def list_audit_logs(trace_id: str, db: Session = Depends(get_db)):
         )
         for a in rows
     ]
+    return Page(items=items, next_cursor=next_cursor)
@@ -3,8 +3,10 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
+from app.api.pagination import keyset_page
 from app.db.deps import get_db
 from app.db.models import Product
+from app.utils.money import format_minor
 
 router = APIRouter(tags=["products"])
 
@@ -12,21 +14,27 @@ router = APIRouter(tags=["products"])
 @router.get("/products")
 def list_products(
     q: str | None = Query(default=None, description="Search by name"),
+    cursor: str | None = Query(default=None),
     limit: int = Query(default=10, ge=1, le=50),
     db: Session = Depends(get_db),
 ):
     query = db.query(Product).filter(Product.is_active == True)  # noqa: E712
     if q:
         query = query.filter(Product.name.ilike(f"%{q}%"))
-    items = query.order_by(Product.created_at.desc()).limit(limit).all()
+    items, next_cursor = keyset_page(
+        query, Product.created_at, Product.id, cursor=cursor, limit=limit, descending=True
+    )
 
-    return [
-        {
-            "id": p.id,
-            "name": p.name,
-            "price": str(p.price),
-            "currency": p.currency,
-            "inventory_qty": p.inventory_qty,
-        }
-        for p in items
-    ]
+    return {
+        "items": [
+            {
+                "id": p.id,
+                "name": p.name,
+                "price": format_minor(p.price_minor, p.currency),
+                "currency": p.currency,
+                "inventory_qty": p.inventory_qty,
+            }
+            for p in items
+        ],
+        "next_cursor": next_cursor,
+    }
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
+from app.api.pagination import keyset_page
+from app.api.responses import RawJSONResponse, stored_payloads
 from app.db.deps import get_db
 from app.agent.memory_store import get_memory
 from app.db.models import Trace
-from app.schemas.api import TraceOut
+from app.schemas.api import Page, TraceOut
 
 router = APIRouter(tags=["sessions"])
 
@@ -15,12 +17,30 @@ router = APIRouter(tags=["sessions"])
 def session_memory(session_id: str, db: Session = Depends(get_db)):
     return get_memory(db, session_id)
 
-@router.get("/sessions/{session_id}/traces", response_model=list[TraceOut])
-def list_traces(session_id: str, db: Session = Depends(get_db)):
-    traces = (
-        db.query(Trace)
-        .filter(Trace.session_id == session_id)
-        .order_by(Trace.created_at.asc())
-        .all()
+@router.get("/sessions/{session_id}/traces", response_model=Page[TraceOut])
+def list_traces(
+    session_id: str,
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=100, ge=1, le=500),
+    db: Session = Depends(get_db),
+):
+    traces, next_cursor = keyset_page(
+        db.query(Trace).filter(Trace.session_id == session_id),
+        Trace.created_at,
+        Trace.id,
+        cursor=cursor,
+        limit=limit,
     )
-    return traces
\ No newline at end of file
+    plans = stored_payloads(db, (t.plan_ref for t in traces))
+    items = [
+        {
+            "id": t.id,
+            "session_id": t.session_id,
+            "user_message": t.user_message,
+            "assistant_message": t.assistant_message,
+            "plan_json": plans[t.plan_ref],
+            "created_at": t.created_at,
+        }
+        for t in traces
+    ]
+    return RawJSONResponse({"items": items, "next_cursor": next_cursor})
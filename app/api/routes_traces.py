@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-import json
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
 
+from app.api.pagination import keyset_page
+from app.api.responses import RawJSON, RawJSONResponse, raw_payloads, stored_payloads
 from app.db.deps import get_db
 from app.db.models import Trace
-from app.schemas.api import TraceOut
+from app.schemas.api import Page, TraceOut
 from app.db.models import AuditLog
 from app.schemas.api import AuditLogOut
 
@@ -16,50 +17,79 @@ router = APIRouter(tags=["traces"])
 @router.get("/traces")
 def list_traces(
     session_id: str = Query(...),
+    cursor: str | None = Query(default=None),
     limit: int = Query(50, ge=1, le=200),
     db: Session = Depends(get_db),
 ):
-    rows = (
-        db.query(Trace)
-        .filter(Trace.session_id == session_id)
-        .order_by(Trace.created_at.desc())
-        .limit(limit)
-        .all()
+    # newest page first; next_cursor walks back to older turns
+    rows, next_cursor = keyset_page(
+        db.query(Trace).filter(Trace.session_id == session_id),
+        Trace.created_at,
+        Trace.id,
+        cursor=cursor,
+        limit=limit,
+        descending=True,
     )
 
+    plans = stored_payloads(db, (tr.plan_ref for tr in rows))
     out = []
     for tr in reversed(rows):  # chronological
-        plan = None
-        if tr.plan_json:
-            try:
-                plan = json.loads(tr.plan_json)
-            except Exception:
-                plan = tr.plan_json
         out.append(
             {
                 "id": tr.id,
                 "created_at": tr.created_at.isoformat() if tr.created_at else None,
                 "user_message": tr.user_message,
                 "assistant_message": tr.assistant_message,
-                "plan_json": plan,
+                "plan_json": plans[tr.plan_ref],
             }
         )
-    return out
+    return RawJSONResponse({"items": out, "next_cursor": next_cursor})
 
 @router.get("/traces/{trace_id}", response_model=TraceOut)
 def get_trace(trace_id: str, db: Session = Depends(get_db)):
     tr = db.query(Trace).filter(Trace.id == trace_id).first()
     if not tr:
         raise HTTPException(status_code=404, detail="Trace not found")
-    return tr
+    return RawJSONResponse(
+        {
+            "id": tr.id,
+            "session_id": tr.session_id,
+            "user_message": tr.user_message,
+            "assistant_message": tr.assistant_message,
+            "plan_json": stored_payloads(db, [tr.plan_ref])[tr.plan_ref],
+            "created_at": tr.created_at,
+        }
+    )
 
 
-@router.get("/traces/{trace_id}/audit-logs", response_model=list[AuditLogOut])
-def get_audit_logs(trace_id: str, db: Session = Depends(get_db)):
-    logs = (
+@router.get("/traces/{trace_id}/audit-logs", response_model=Page[AuditLogOut])
+def get_audit_logs(
+    trace_id: str,
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=100, ge=1, le=500),
+    db: Session = Depends(get_db),
+):
+    logs, next_cursor = keyset_page(
         db.query(AuditLog)
-        .filter(AuditLog.trace_id == trace_id)
-        .order_by(AuditLog.created_at.asc())
-        .all()
+        .options(*raw_payloads(AuditLog.input_json))
+        .filter(AuditLog.trace_id == trace_id),
+        AuditLog.created_at,
+        AuditLog.id,
+        cursor=cursor,
+        limit=limit,
     )
-    return logs
\ No newline at end of file
+    outputs = stored_payloads(db, (log.output_ref for log in logs))
+    items = [
+        {
+            "id": log.id,
+            "trace_id": log.trace_id,
+            "tool_name": log.tool_name,
+            "status": log.status.value,
+            "input_json": RawJSON(log.input_json_raw),
+            "output_json": outputs[log.output_ref],
+            "error_message": log.error_message,
+            "created_at": log.created_at,
+        }
+        for log in logs
+    ]
+    return RawJSONResponse({"items": items, "next_cursor": next_cursor})
@@ -1,46 +1,44 @@
 from __future__ import annotations
 
-import json
-from typing import Any
-
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
+from app.api.fieldsets import AUDIT_LOG_FIELDS
+from app.api.pagination import keyset_page
+from app.api.responses import RawJSONResponse, stored_payloads
 from app.db.deps import get_db
 from app.db.models import AuditLog, Trace
+from app.db.types import json_text
 
 router = APIRouter(prefix="/ui", tags=["ui"])
 
 
-def _safe_json_loads(s: str | None) -> Any:
-    if not s:
-        return None
-    try:
-        return json.loads(s)
-    except Exception:
-        return s
-
-
 @router.get("/audit_logs")
 def ui_audit_logs(
     session_id: str | None = Query(default=None),
     trace_id: str | None = Query(default=None),
     tool_name: str | None = Query(default=None),
     status: str | None = Query(default=None),
+    user_id: str | None = Query(default=None),
+    cursor: str | None = Query(default=None),
     limit: int = Query(default=100, ge=1, le=500),
+    fields: str | None = Query(default=None, description="Comma-separated item fields (default: all)"),
     db: Session = Depends(get_db),
 ):
     """
-    Filterable audit log feed for UI.
+    Filterable audit log feed for UI, newest first. Each filter has an index ending in
+    (created_at, id), so every page is a seek. `fields` trims items to the named fields and
+    loads only their columns (e.g. `fields=tool_name,status,created_at` skips the payloads).
     """
-    q = db.query(AuditLog)
+    names = AUDIT_LOG_FIELDS.parse(fields)
+    q = db.query(AuditLog).options(*AUDIT_LOG_FIELDS.load_options(names, AuditLog.created_at))
 
     if trace_id:
         q = q.filter(AuditLog.trace_id == trace_id)
 
     if session_id:
-        # join traces to filter by session
-        q = q.join(Trace, Trace.id == AuditLog.trace_id).filter(Trace.session_id == session_id)
+        session_traces = db.query(Trace.id).filter(Trace.session_id == session_id)
+        q = q.filter(AuditLog.trace_id.in_(session_traces.scalar_subquery()))
 
     if tool_name:
         q = q.filter(AuditLog.tool_name == tool_name)
@@ -48,18 +46,11 @@ def ui_audit_logs(
     if status:
         q = q.filter(AuditLog.status == status)
 
-    logs = q.order_by(AuditLog.created_at.desc()).limit(limit).all()
+    if user_id:
+        # served by ix_audit_logs_input_user_id
+        q = q.filter(json_text(AuditLog.input_json, "user_id") == user_id)
 
-    return [
-        {
-            "id": l.id,
-            "trace_id": l.trace_id,
-            "tool_name": l.tool_name,
-            "status": str(l.status),
-            "input": _safe_json_loads(l.input_json),
-            "output": _safe_json_loads(l.output_json),
-            "error_message": l.error_message,
-            "created_at": l.created_at,
-        }
-        for l in logs
-    ]
+    logs, next_cursor = keyset_page(q, AuditLog.created_at, AuditLog.id, cursor=cursor, limit=limit, descending=True)
+    outputs = stored_payloads(db, AUDIT_LOG_FIELDS.payload_refs(names, logs))
+    items = [AUDIT_LOG_FIELDS.render(log, names, outputs) for log in logs]
+    return RawJSONResponse({"items": items, "next_cursor": next_cursor})
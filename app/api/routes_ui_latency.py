@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import Select, case, func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.db.deps import get_db
+from app.db.models import AuditLog, Trace
+
+router = APIRouter(prefix="/ui", tags=["ui"])
+
+# stage name -> Trace column with its duration
+STAGES = {
+    "total": Trace.duration_ms,
+    "memory_load": Trace.memory_ms,
+    "plan": Trace.plan_ms,
+    "policy": Trace.policy_ms,
+    "tools": Trace.tools_ms,
+}
+PERCENTILES = (50, 90, 95, 99)
+
+
+def _utc(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc) if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _percentiles(db: Session, samples, group: list[str]) -> list[dict]:
+    """
+    Nearest-rank percentiles of samples.v per `group`, entirely in SQL: rank each sample
+    within its group with row_number(), then pick the value at rank ceil(n * p / 100).
+    """
+    keys = [samples.c[g] for g in group]
+    ranked = select(
+        *keys,
+        samples.c.v,
+        func.row_number().over(partition_by=keys, order_by=samples.c.v).label("rn"),
+        func.count().over(partition_by=keys).label("n"),
+    ).subquery("ranked")
+    rkeys = [ranked.c[g] for g in group]
+    cols = [func.max(ranked.c.n).label("count"), func.avg(ranked.c.v).label("avg")]
+    for p in PERCENTILES:
+        rank = (ranked.c.n * p + 99) // 100  # integer ceil
+        cols.append(func.max(case((ranked.c.rn == rank, ranked.c.v))).label(f"p{p}"))
+    cols.append(func.max(ranked.c.v).label("max"))
+    stmt: Select = select(*rkeys, *cols).group_by(*rkeys).order_by(*rkeys)
+    return [
+        {k: (round(v, 3) if isinstance(v, float) else v) for k, v in row.items()}
+        for row in db.execute(stmt).mappings()
+    ]
+
+
+@router.get("/latency")
+def ui_latency(
+    since: datetime | None = Query(default=None, description="Window start (default: 24h before `until`)"),
+    until: datetime | None = Query(default=None, description="Window end, exclusive (default: now)"),
+    db: Session = Depends(get_db),
+):
+    """
+    Where chat turns spend their time, over traces created in [since, until): p50/p90/p95/p99
+    (ms) per stage, per stage and intent, per stage and planner, and per tool.
+    """
+    until = _utc(until) if until else datetime.now(timezone.utc)
+    since = _utc(since) if since else until - timedelta(hours=24)
+
+    stage_samples = union_all(
+        *(
+            select(
+                literal(name).label("stage"),
+                column.label("v"),
+                Trace.intent.label("intent"),
+                Trace.planner.label("planner"),
+            ).where(Trace.created_at >= since, Trace.created_at < until, column.is_not(None))
+            for name, column in STAGES.items()
+        )
+    ).subquery("samples")
+    tool_samples = (
+        select(AuditLog.tool_name.label("tool"), AuditLog.duration_ms.label("v"))
+        .where(AuditLog.created_at >= since, AuditLog.created_at < until, AuditLog.duration_ms.is_not(None))
+        .subquery("samples")
+    )
+
+    return {
+        "since": since,
+        "until": until,
+        "stages": _percentiles(db, stage_samples, ["stage"]),
+        "by_intent": _percentiles(db, stage_samples, ["stage", "intent"]),
+        "by_planner": _percentiles(db, stage_samples, ["stage", "planner"]),
+        "tools": _percentiles(db, tool_samples, ["tool"]),
+    }
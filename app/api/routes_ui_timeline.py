@@ -1,111 +1,158 @@
 from __future__ import annotations
 
-import json
+import hashlib
 from typing import Any
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
+from app.api.fieldsets import AUDIT_LOG_FIELDS, TRACE_FIELDS
+from app.api.pagination import decode_cursor, encode_cursor, keyset_page, keyset_rows
+from app.api.responses import RawJSONResponse, stored_payloads
 from app.db.deps import get_db
-from app.db.models import Trace, AuditLog
+from app.db.models import AuditLog, SessionSummary, Trace
 
 router = APIRouter(prefix="/ui", tags=["ui"])
 
 
-def _safe_json_loads(s: str | None) -> Any:
-    if not s:
-        return None
-    try:
-        return json.loads(s)
-    except Exception:
-        return s  # keep raw string if it isn't valid JSON
-
-
 @router.get("/sessions")
 def ui_list_sessions(
+    cursor: str | None = Query(default=None),
     limit: int = Query(default=50, ge=1, le=200),
     db: Session = Depends(get_db),
 ):
     """
-    Returns distinct session_ids ordered by most recent trace time.
+    Returns sessions ordered by most recent activity.
     Perfect for a left sidebar in the frontend.
     """
-    rows = (
-        db.query(Trace.session_id, Trace.created_at)
-        .order_by(Trace.created_at.desc())
-        .limit(5000)
-        .all()
+    rows, next_cursor = keyset_page(
+        db.query(SessionSummary),
+        SessionSummary.last_activity,
+        SessionSummary.session_id,
+        cursor=cursor,
+        limit=limit,
+        descending=True,
     )
+    items = [
+        {
+            "session_id": r.session_id,
+            "user_id": r.user_id,
+            "last_activity": r.last_activity,
+            "last_user_message": r.last_user_message,
+            "turns": r.turns,
+        }
+        for r in rows
+    ]
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def _etag(version: int, created_at, *variant: object) -> str:
+    # created_at tells apart a session re-created after retention dropped its row; the variant
+    # (page, delta start, size, field selection) keeps one query's ETag from validating another's body
+    key = hashlib.blake2b(repr(variant).encode("utf-8"), digest_size=6).hexdigest()
+    return f'"{version}-{int(created_at.timestamp())}-{key}"'
 
-    seen: set[str] = set()
-    sessions: list[dict[str, Any]] = []
-    for session_id, created_at in rows:
-        if session_id in seen:
-            continue
-        seen.add(session_id)
-        sessions.append({"session_id": session_id, "last_activity": created_at})
-        if len(sessions) >= limit:
-            break
 
-    return sessions
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    return any(tag.strip().removeprefix("W/") in (etag, "*") for tag in if_none_match.split(","))
 
 
 @router.get("/sessions/{session_id}/timeline")
 def ui_session_timeline(
     session_id: str,
+    cursor: str | None = Query(default=None),
+    since: str | None = Query(default=None, description="sync_cursor of an earlier response"),
     limit_traces: int = Query(default=50, ge=1, le=200),
+    fields: str | None = Query(
+        default=None,
+        description="Comma-separated trace fields, `audit_logs`, and/or `audit_logs.<field>` (default: all)",
+    ),
+    if_none_match: str | None = Header(default=None),
     db: Session = Depends(get_db),
 ):
     """
-    Returns a session timeline: traces with nested audit logs.
+    Returns a session timeline: traces with nested audit logs, oldest first.
     This is the single best endpoint for a "conversation + tool calls" UI.
+    Stored plans and tool payloads are passed through verbatim (see app/api/responses.py).
+
+    Polling: send the last response's `sync_cursor` as `since` to get only the newest traces,
+    and its ETag as If-None-Match; an unchanged session is answered 304 from its summary row
+    alone. Deltas repeat the traces sharing the last-seen timestamp (merge by id): timestamps
+    can tie, and the last turn may still have been in progress. ETags cover the query too
+    (cursor, since, limit, fields), so an ETag only ever validates a repeat of the same request.
+
+    `fields` trims each trace (and audit log) to the named fields, loading only their columns;
+    e.g. `fields=user_message,created_at` for a list view skips plans and audit logs entirely.
     """
-    traces = (
+    if cursor and since:
+        raise HTTPException(status_code=400, detail="Pass either cursor or since, not both")
+    names = TRACE_FIELDS.parse(fields, extra=("audit_logs", *(f"audit_logs.{n}" for n in AUDIT_LOG_FIELDS.fields)))
+    nested = [n.removeprefix("audit_logs.") for n in names if n.startswith("audit_logs.")]
+    with_logs = "audit_logs" in names or bool(nested)
+    log_names = AUDIT_LOG_FIELDS.parse(",".join(nested) if nested else None)
+
+    # read the version before the traces: a write landing in between only costs a spare 200
+    summary = (
+        db.query(SessionSummary.version, SessionSummary.created_at)
+        .filter(SessionSummary.session_id == session_id)
+        .one_or_none()
+    )
+    headers: dict[str, str] = {}
+    if summary is not None:
+        etag = _etag(summary.version, summary.created_at, cursor, since, limit_traces, names, with_logs, log_names)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+
+    rows, more = keyset_rows(
         db.query(Trace)
-        .filter(Trace.session_id == session_id)
-        .order_by(Trace.created_at.asc())
-        .limit(limit_traces)
-        .all()
+        .options(*TRACE_FIELDS.load_options(names, Trace.created_at))
+        .filter(Trace.session_id == session_id),
+        Trace.created_at,
+        Trace.id,
+        cursor=cursor or since,
+        limit=limit_traces,
     )
+    traces = [t for t, _ in rows]
+    next_cursor = rows[-1][1] if more else None
+    sync_cursor = cursor or since
+    if rows:
+        # "" sorts before every id: the next delta starts at the last timestamp, inclusive
+        sync_cursor = encode_cursor(decode_cursor(rows[-1][1])[0], "")
 
     if not traces:
-        return {"session_id": session_id, "traces": []}
-
-    trace_ids = [t.id for t in traces]
-    logs = (
-        db.query(AuditLog)
-        .filter(AuditLog.trace_id.in_(trace_ids))
-        .order_by(AuditLog.created_at.asc())
-        .all()
+        return RawJSONResponse(
+            {"session_id": session_id, "traces": [], "next_cursor": None, "sync_cursor": sync_cursor}, headers=headers
+        )
+
+    logs: list[AuditLog] = []
+    if with_logs:
+        logs = (
+            db.query(AuditLog)
+            .options(*AUDIT_LOG_FIELDS.load_options(log_names, AuditLog.trace_id, AuditLog.created_at))
+            .filter(AuditLog.trace_id.in_([t.id for t in traces]))
+            # grouped per trace below; (trace_id, created_at) walks ix_audit_logs_trace_created without a sort
+            .order_by(AuditLog.trace_id, AuditLog.created_at.asc())
+            .all()
+        )
+    stored = stored_payloads(
+        db, [*TRACE_FIELDS.payload_refs(names, traces), *AUDIT_LOG_FIELDS.payload_refs(log_names, logs)]
     )
 
     logs_by_trace: dict[str, list[dict[str, Any]]] = {}
-    for l in logs:
-        logs_by_trace.setdefault(l.trace_id, []).append(
-            {
-                "id": l.id,
-                "trace_id": l.trace_id,
-                "tool_name": l.tool_name,
-                "status": str(l.status),
-                "input": _safe_json_loads(l.input_json),
-                "output": _safe_json_loads(l.output_json),
-                "error_message": l.error_message,
-                "created_at": l.created_at,
-            }
-        )
+    for log in logs:
+        logs_by_trace.setdefault(log.trace_id, []).append(AUDIT_LOG_FIELDS.render(log, log_names, stored))
 
     out_traces: list[dict[str, Any]] = []
     for t in traces:
-        out_traces.append(
-            {
-                "id": t.id,
-                "session_id": t.session_id,
-                "user_message": t.user_message,
-                "assistant_message": t.assistant_message,
-                "plan": _safe_json_loads(t.plan_json),
-                "created_at": t.created_at,
-                "audit_logs": logs_by_trace.get(t.id, []),
-            }
-        )
-
-    return {"session_id": session_id, "traces": out_traces}
+        item = TRACE_FIELDS.render(t, names, stored)
+        if with_logs:
+            item["audit_logs"] = logs_by_trace.get(t.id, [])
+        out_traces.append(item)
+
+    return RawJSONResponse(
+        {"session_id": session_id, "traces": out_traces, "next_cursor": next_cursor, "sync_cursor": sync_cursor},
+        headers=headers,
+    )
@@ -3,19 +3,27 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
+from app.api.pagination import keyset_page
 from app.db.deps import get_db
 from app.db.models import User, Account
+from app.utils.money import format_minor
 
 router = APIRouter(prefix="/ui", tags=["ui"])
 
 
 @router.get("/users")
 def ui_list_users(
+    cursor: str | None = Query(default=None),
     limit: int = Query(default=50, ge=1, le=200),
     db: Session = Depends(get_db),
 ):
-    users = db.query(User).order_by(User.created_at.desc()).limit(limit).all()
-    return [{"id": u.id, "full_name": u.full_name, "email": u.email} for u in users]
+    users, next_cursor = keyset_page(
+        db.query(User), User.created_at, User.id, cursor=cursor, limit=limit, descending=True
+    )
+    return {
+        "items": [{"id": u.id, "full_name": u.full_name, "email": u.email} for u in users],
+        "next_cursor": next_cursor,
+    }
 
 
 @router.get("/users/{user_id}")
@@ -30,6 +38,6 @@ def ui_user_detail(user_id: str, db: Session = Depends(get_db)):
         "full_name": u.full_name,
         "email": u.email,
         "account": (
-            {"balance": str(acct.balance), "currency": acct.currency} if acct else None
+            {"balance": format_minor(acct.balance_minor, acct.currency), "currency": acct.currency} if acct else None
         ),
     }
@@ -1,18 +1,29 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
+from app.api.pagination import keyset_page
 from app.db.deps import get_db
 from app.db.models import User, Account
+from app.utils.money import format_minor
 
 router = APIRouter(tags=["users"])
 
 
 @router.get("/users")
-def list_users(db: Session = Depends(get_db)):
-    users = db.query(User).order_by(User.created_at.desc()).all()
-    return [{"id": u.id, "full_name": u.full_name, "email": u.email} for u in users]
+def list_users(
+    cursor: str | None = Query(default=None),
+    limit: int = Query(default=50, ge=1, le=200),
+    db: Session = Depends(get_db),
+):
+    users, next_cursor = keyset_page(
+        db.query(User), User.created_at, User.id, cursor=cursor, limit=limit, descending=True
+    )
+    return {
+        "items": [{"id": u.id, "full_name": u.full_name, "email": u.email} for u in users],
+        "next_cursor": next_cursor,
+    }
 
 
 @router.get("/users/{user_id}/account")
@@ -20,4 +31,4 @@ def get_account(user_id: str, db: Session = Depends(get_db)):
     acct = db.query(Account).filter(Account.user_id == user_id).one_or_none()
     if not acct:
         raise HTTPException(status_code=404, detail="Account not found")
-    return {"user_id": user_id, "balance": str(acct.balance), "currency": acct.currency}
+    return {"user_id": user_id, "balance": format_minor(acct.balance_minor, acct.currency), "currency": acct.currency}
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from decimal import Decimal
+
 from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -9,12 +11,82 @@ class Settings(BaseSettings):
 
     app_env: str = "dev"
     database_url: str = "sqlite:///./sentinelflow.db"
+    # engine tuning profile: "auto" (by URL), "sqlite", "postgres" or "plain" (untuned)
+    storage_profile: str = "auto"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size_kib: int = 64 * 1024
+    pg_pool_size: int = 20
+    pg_max_overflow: int = 10
+    pg_pool_timeout_s: float = 10.0
+    pg_pool_recycle_s: int = 1800
+    pg_statement_timeout_ms: int = 5000
+    pg_idle_in_transaction_timeout_ms: int = 15000
     log_level: str = "INFO"
+    # "json" (one object per line) or "text"; records go through a bounded queue (see app/core/logging.py)
+    log_format: str = "json"
+    log_queue_size: int = 10000
+    # keep one in N DEBUG records per call site
+    log_debug_sample_every: int = 100
+    # JSON payload serializer: "auto" (orjson when installed), "orjson" or "stdlib"
+    json_backend: str = "auto"
+    # in-process cache of deduplicated plan/tool-output payloads (see app/db/payloads.py)
+    payload_cache_bytes: int = 64 * 1024 * 1024
+    # response compression (see app/api/compression.py); brotli is used when installed
+    compression_min_bytes: int = 1024
+    compression_gzip_level: int = 5
+    compression_brotli_quality: int = 4
 
     planner_mode: str = "heuristic"  # "llm" or "heuristic"
     openai_api_key: str | None = None
     openai_model: str = "gpt-5.2"
 
+    # POST /chat/batch: sessions processed in parallel (each holds one DB connection)
+    chat_batch_workers: int = 8
+    # POST /chat/stream: turns run on one shared pool of this many threads; the rest wait for one
+    chat_stream_workers: int = 64
+    # per-session execution lanes (turns of one session run one at a time); idle lanes are dropped
+    session_lane_idle_s: float = 300.0
+    # admission control in front of the orchestrator (see app/services/admission.py)
+    admission_enabled: bool = True
+    admission_max_concurrent: int = 32
+    admission_max_queue: int = 256
+    admission_max_wait_s: float = 10.0
+    admission_degrade_depth: int = 32  # queued turns at which new turns skip the LLM planner
+    chat_rate_per_user_s: float = 5.0
+    chat_burst_per_user: float = 20.0
+    # weighted fair queuing of waiting turns by class; a class without a slot this long is served next
+    sched_weight_confirmation: float = 8.0
+    sched_weight_selection: float = 8.0
+    sched_weight_read_only: float = 4.0
+    sched_weight_planned: float = 1.0
+    sched_starvation_s: float = 2.0
+
+    # startup warmup (see app/services/warmup.py); /ready is 503 until it has run
+    warmup_enabled: bool = True
+    warmup_db_connections: int = 4
+    warmup_retry_s: float = 5.0
+
+    # per-user account snapshot cache (check_balance + policy)
+    account_cache_enabled: bool = True
+    account_cache_ttl_s: float = 2.0
+    # read balances straight from the DB when the policy gates a purchase
+    account_cache_strict_purchases: bool = False
+
+    # retention (days; 0 keeps forever). Expired UTC days are archived to
+    # <retention_archive_dir>/<table>/<day>.jsonl.gz, then dropped. Audit rows never
+    # outlive their trace: they are archived with it if their own TTL is longer.
+    trace_retention_days: int = 30
+    audit_retention_days: int = 30
+    session_memory_retention_days: int = 14
+    retention_archive_dir: str = "./archive"
+
+    # rolling-window purchase velocity limits (per user)
+    velocity_limits_enabled: bool = True
+    max_hourly_spend: Decimal = Decimal("2000.00")
+    max_daily_spend: Decimal = Decimal("5000.00")
+    max_hourly_purchases: int = 10
+    max_daily_purchases: int = 50
 
 
 settings = Settings()
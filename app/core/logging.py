@@ -1,14 +1,157 @@
+"""
+Logging setup: structured JSON lines, written off the request path.
+
+Request threads only put records on a bounded in-memory queue (QueueHandler); a background
+QueueListener formats them and writes to stdout. A slow or stalled log collector therefore
+delays log output, never a request: when the queue is full, records are dropped and counted
+(sentinelflow_log_records_dropped_total) instead of blocking.
+
+Each record carries the trace_id and session_id of the turn that emitted it (see
+log_context), captured in the emitting thread before it is queued. DEBUG records are
+sampled: one in LOG_DEBUG_SAMPLE_EVERY per call site is kept.
+"""
 from __future__ import annotations
 
+import atexit
+import copy
+import itertools
 import logging
+import logging.handlers
+import queue
 import sys
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Iterator
+
+from app.core import metrics
 from app.core.config import settings
+from app.utils import jsoncodec
+
+trace_id_var: ContextVar[str | None] = ContextVar("log_trace_id", default=None)
+session_id_var: ContextVar[str | None] = ContextVar("log_session_id", default=None)
+
+# LogRecord attributes that are not user-supplied `extra=` fields
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+logs_dropped_total = metrics.Counter(
+    "sentinelflow_log_records_dropped_total", "Log records dropped because the log queue was full."
+)
+
+_plain = logging.Formatter()
+_listener: logging.handlers.QueueListener | None = None
+_lock = threading.Lock()
+
+
+@contextmanager
+def log_context(*, session_id: str | None = None) -> Iterator[None]:
+    """Tag records logged inside this block with `session_id`; create_trace sets the trace_id."""
+    session_token, trace_token = session_id_var.set(session_id), trace_id_var.set(None)
+    try:
+        yield
+    finally:
+        session_id_var.reset(session_token)
+        trace_id_var.reset(trace_token)
+
+
+class ContextFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = trace_id_var.get()
+        record.session_id = session_id_var.get()
+        return True
+
+
+class DebugSampler(logging.Filter):
+    """Keeps the 1st, (n+1)th, ... DEBUG record of each call site; other levels always pass."""
+
+    def __init__(self, every: int) -> None:
+        super().__init__()
+        self.every = max(1, every)
+        self._counters: dict[tuple[str, int], Iterator[int]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.every == 1:
+            return True
+        key = (record.pathname, record.lineno)
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters.setdefault(key, itertools.count())
+        if next(counter) % self.every:
+            return False
+        record.sample_every = self.every
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, trace_id, session_id, extras, exc."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        out: dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and value is not None:
+                out[key] = value
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            out["exc"] = record.exc_text
+        if record.stack_info:
+            out["stack"] = self.formatStack(record.stack_info)
+        return jsoncodec.codec.dumps_with(out, str)
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # like the base class (merge args, render the traceback), but keep
+        # the message and the traceback apart so the formatter can emit them as fields
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = _plain.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            logs_dropped_total.inc()
 
 
 def configure_logging() -> None:
-    # Simple, production-friendly baseline. Can upgrade to JSON logs later.
-    logging.basicConfig(
-        level=getattr(logging, settings.log_level.upper(), logging.INFO),
-        format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
-        handlers=[logging.StreamHandler(sys.stdout)],
-    )
+    """Route the root logger through the queue; idempotent. The listener stops at exit."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return
+        stream = logging.StreamHandler(sys.stdout)
+        if settings.log_format.lower() == "text":
+            stream.setFormatter(logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(message)s"))
+        else:
+            stream.setFormatter(JsonFormatter())
+
+        handler = _NonBlockingQueueHandler(queue.Queue(maxsize=settings.log_queue_size))
+        handler.addFilter(DebugSampler(settings.log_debug_sample_every))
+        handler.addFilter(ContextFilter())
+
+        root = logging.getLogger()
+        root.handlers[:] = [handler]
+        root.setLevel(getattr(logging, settings.log_level.upper(), logging.INFO))
+
+        _listener = logging.handlers.QueueListener(handler.queue, stream, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    with _lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
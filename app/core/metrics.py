@@ -0,0 +1,201 @@
+"""
+In-process metrics rendered in the Prometheus text format (GET /metrics).
+
+Recording is lock-free on the hot path: every thread writes to its own shard (a dict of
+label values -> cells), and a scrape sums the shards. A shard is registered under a lock
+once per thread; when the thread exits, its shard is folded into one retired total, so
+nothing recorded is lost and per-request threads do not pile up shards.
+
+Gauges that mirror state kept elsewhere (pool usage, cache counters, queue depths) are
+not recorded at all; modules register a collector that reads them at scrape time.
+"""
+from __future__ import annotations
+
+import math
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator
+
+# seconds; tuned for chat turns (sub-millisecond cache hits up to slow LLM calls)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# (name, type, help, [(labels, value), ...])
+Family = tuple[str, str, str, list[tuple[dict[str, str], float]]]
+
+_lock = threading.Lock()
+_metrics: list[_Metric] = []
+_collectors: list[Callable[[], Iterable[Family]]] = []
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._local = threading.local()
+        self._shards: list[dict[tuple[str, ...], list]] = []
+        self._retired: dict[tuple[str, ...], list] = {}  # sum of the shards of exited threads
+        # shards of exited threads not yet folded in; the finalizer only appends here, since it
+        # may run from garbage collection in a thread that already holds _lock
+        self._exited: deque[dict[tuple[str, ...], list]] = deque()
+        with _lock:
+            _metrics.append(self)
+
+    def _shard(self) -> dict[tuple[str, ...], list]:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard: dict[tuple[str, ...], list] = {}
+            with _lock:
+                self._retire_exited()
+                self._shards.append(shard)
+            self._local.shard = shard
+            weakref.finalize(threading.current_thread(), self._exited.append, shard)
+            return shard
+
+    def _retire_exited(self) -> None:
+        # caller holds _lock
+        while self._exited:
+            shard = self._exited.popleft()
+            self._shards.remove(shard)
+            _accumulate(self._retired, shard)
+
+    def _merged(self) -> dict[tuple[str, ...], list]:
+        out: dict[tuple[str, ...], list] = {}
+        with _lock:
+            # under the lock, so a shard is never counted both live and retired
+            self._retire_exited()
+            _accumulate(out, self._retired)
+            for shard in self._shards:
+                _accumulate(out, shard)
+        return out
+
+    def _labels(self, values: tuple[str, ...], extra: str = "") -> str:
+        parts = [f'{k}="{_escape(v)}"' for k, v in zip(self.labelnames, values)]
+        if extra:
+            parts.append(extra)
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def render(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        shard = self._shard()
+        cell = shard.get(labels)
+        if cell is None:
+            shard[labels] = [amount]
+        else:
+            cell[0] += amount
+
+    def render(self) -> list[str]:
+        return [f"{self.name}{self._labels(k)} {_num(v[0])}" for k, v in sorted(self._merged().items())]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = buckets
+
+    def observe(self, value: float, *labels: str) -> None:
+        # cell: one count per bucket, +Inf, then the sum
+        shard = self._shard()
+        cell = shard.get(labels)
+        if cell is None:
+            cell = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, *labels)
+
+    def render(self) -> list[str]:
+        lines = []
+        for labels, cell in sorted(self._merged().items()):
+            total = 0
+            for le, n in zip((*self.buckets, math.inf), cell):
+                total += n
+                bound = 'le="' + _num(le) + '"'
+                lines.append(f"{self.name}_bucket{self._labels(labels, bound)} {total}")
+            lines.append(f"{self.name}_sum{self._labels(labels)} {_num(cell[-1])}")
+            lines.append(f"{self.name}_count{self._labels(labels)} {total}")
+        return lines
+
+
+def register_collector(fn: Callable[[], Iterable[Family]]) -> None:
+    """`fn` is called on every scrape and returns metric families read from live state."""
+    with _lock:
+        _collectors.append(fn)
+
+
+def render() -> str:
+    with _lock:
+        metrics, collectors = list(_metrics), list(_collectors)
+    lines: list[str] = []
+    for m in metrics:
+        lines.append(f"# HELP {m.name} {m.help}")
+        lines.append(f"# TYPE {m.name} {m.kind}")
+        lines.extend(m.render())
+    for fn in collectors:
+        for name, kind, help, samples in fn():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                rendered = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+                lines.append(f"{name}{{{rendered}}} {_num(value)}" if rendered else f"{name} {_num(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _accumulate(into: dict[tuple[str, ...], list], shard: dict[tuple[str, ...], list]) -> None:
+    for labels, cell in list(shard.items()):
+        acc = into.get(labels)
+        if acc is None:
+            into[labels] = list(cell)
+        else:
+            for i, v in enumerate(cell):
+                acc[i] += v
+
+
+def _num(v: float) -> str:
+    if v == math.inf:
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) and not v.is_integer() else str(int(v))
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+# ---- metrics recorded across the app ----
+
+http_request_seconds = Histogram(
+    "sentinelflow_http_request_seconds", "Request latency by route template.", ("method", "route", "status")
+)
+stage_seconds = Histogram("sentinelflow_stage_seconds", "Orchestrator stage latency.", ("stage",))
+tool_seconds = Histogram(
+    "sentinelflow_tool_seconds", "Tool call latency, including its audit write.", ("tool", "status")
+)
+db_commit_seconds = Histogram("sentinelflow_db_commit_seconds", "Session commit latency (flush + COMMIT).")
+llm_request_seconds = Histogram("sentinelflow_llm_request_seconds", "LLM planner request latency.", ("outcome",))
+llm_requests_total = Counter("sentinelflow_llm_requests_total", "LLM planner requests by outcome.", ("outcome",))
+planner_fallbacks_total = Counter(
+    "sentinelflow_planner_fallbacks_total", "Turns planned heuristically while PLANNER_MODE=llm.", ("reason",)
+)
@@ -0,0 +1,404 @@
+"""
+Deterministic large-scale synthetic data for load testing.
+
+Generates users, accounts, products, transactions, chat sessions (traces, audit rows, session
+memory and session summaries) with skewed, production-like distributions. Rows are streamed
+in batches through Core executemany inserts. The same --seed always yields the same rows and
+ids; timestamps spread over --days before --now (default: the current time).
+
+Usage:
+  poetry run python -m app.db.bulk_seed --users 100000 --products 5000
+  poetry run python -m app.db.bulk_seed --db-url sqlite:///./load.db --users 1000000 --create-tables
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import time
+import uuid
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+from sqlalchemy import Table, delete, insert
+from sqlalchemy.engine import Engine
+
+from app.db import payloads
+from app.db.models import (
+    Account,
+    AuditLog,
+    Base,
+    Payload,
+    Product,
+    SessionMemory,
+    SessionSummary,
+    Trace,
+    Transaction,
+    TransactionStatus,
+    User,
+)
+from app.services.sessions import PREVIEW_CHARS
+
+_FIRST = ["Ada", "Ben", "Chen", "Dana", "Eli", "Fatima", "Goran", "Hana", "Ivan", "Jia", "Kofi", "Lena",
+          "Mateo", "Nia", "Omar", "Priya", "Quinn", "Rosa", "Sven", "Tara", "Umar", "Vera", "Wei", "Yusuf", "Zoe"]
+_LAST = ["Adams", "Bauer", "Costa", "Diallo", "Evans", "Fischer", "Garcia", "Haddad", "Ito", "Jensen", "Kim",
+         "Lopez", "Moreau", "Novak", "Okafor", "Patel", "Rossi", "Silva", "Tanaka", "Ueda", "Wang", "Yilmaz"]
+_ADJ = ["Wireless", "Mechanical", "Ergonomic", "Portable", "Compact", "Premium", "Budget", "Pro", "Smart",
+        "Foldable", "Silent", "Backlit", "Rugged", "Ultra", "Mini"]
+_NOUN = [("Keyboard", "Input"), ("Mouse", "Input"), ("Headphones", "Audio"), ("Speaker", "Audio"),
+         ("Monitor", "Display"), ("Webcam", "Video"), ("USB-C Hub", "Accessories"), ("Laptop Stand", "Accessories"),
+         ("Desk Lamp", "Office"), ("SSD 1TB", "Storage"), ("Microphone", "Audio"), ("Charger", "Power"),
+         ("Docking Station", "Accessories"), ("Tablet", "Devices"), ("Router", "Network")]
+# (currency, weight)
+_CURRENCIES = [("USD", 85), ("EUR", 9), ("GBP", 5), ("JPY", 1)]
+_TX_STATUSES = [(TransactionStatus.confirmed, 80), (TransactionStatus.settled, 14),
+                (TransactionStatus.failed, 4), (TransactionStatus.canceled, 2)]
+# relative chat volume by UTC hour (quiet nights, afternoon peak)
+_HOURLY = [2, 1, 1, 1, 1, 2, 4, 6, 8, 9, 10, 11, 12, 12, 13, 13, 12, 11, 10, 9, 8, 6, 4, 3]
+
+
+@dataclass
+class SeedConfig:
+    users: int = 10_000
+    products: int = 2_000
+    tx_per_user: float = 5.0  # mean; per-user counts are heavy-tailed
+    sessions_per_user: float = 2.0
+    turns_per_session: float = 4.0
+    days: int = 30
+    seed: int = 42
+    batch: int = 5_000
+    now: datetime = field(default_factory=lambda: datetime.now(timezone.utc).replace(microsecond=0))
+
+
+@dataclass
+class TableStats:
+    rows: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_s(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+class _Writer:
+    """Buffers rows per table and flushes them as executemany batches, parents first."""
+
+    ORDER = ["users", "accounts", "products", "transactions", "payloads", "traces", "audit_logs", "session_memory",
+             "sessions"]
+
+    def __init__(self, engine: Engine, batch: int) -> None:
+        self.engine = engine
+        self.batch = batch
+        self.tables: dict[str, Table] = {m.__table__.name: m.__table__ for m in (
+            User, Account, Product, Transaction, Payload, Trace, AuditLog, SessionMemory, SessionSummary)}
+        self.buffers: dict[str, list[dict]] = {name: [] for name in self.ORDER}
+        self.stats: dict[str, TableStats] = {name: TableStats() for name in self.ORDER}
+        self.payload_refs: set[str] = set()
+
+    def add(self, table: str, row: dict) -> None:
+        buf = self.buffers[table]
+        buf.append(row)
+        if len(buf) >= self.batch:
+            self.flush()
+
+    def payload(self, value: dict | None) -> str | None:
+        """Reference for a plan/tool output; each distinct payload is written once."""
+        if value is None:
+            return None
+        ref, text = payloads.encode(value)
+        if ref not in self.payload_refs:
+            self.payload_refs.add(ref)
+            self.add("payloads", payloads.payload_row(ref, text))
+        return ref
+
+    def flush(self) -> None:
+        for name in self.ORDER:
+            rows = self.buffers[name]
+            if not rows:
+                continue
+            t0 = time.perf_counter()
+            with self.engine.begin() as conn:
+                if name == "payloads":  # may already exist from an earlier run
+                    payloads.insert_missing(conn, rows)
+                else:
+                    conn.execute(insert(self.tables[name]), rows)
+            st = self.stats[name]
+            st.seconds += time.perf_counter() - t0
+            st.rows += len(rows)
+            self.buffers[name] = []
+
+
+class _Ids:
+    def __init__(self, seed: int) -> None:
+        self.ns = uuid.uuid5(uuid.NAMESPACE_URL, f"sentinelflow-bulk-seed:{seed}")
+
+    def __call__(self, kind: str, n: int) -> str:
+        return str(uuid.uuid5(self.ns, f"{kind}:{n}"))
+
+
+def _weighted(rng: random.Random, choices: list[tuple]) -> object:
+    return rng.choices([c for c, _ in choices], weights=[w for _, w in choices])[0]
+
+
+def _heavy_tail(rng: random.Random, mean: float) -> int:
+    # geometric-ish with a Pareto tail: most users do little, a few do a lot
+    if mean <= 0:
+        return 0
+    return min(int(rng.paretovariate(2.0) * mean / 2.0), int(mean * 50))
+
+
+def _timestamp(rng: random.Random, cfg: SeedConfig, hour_cum: list[int]) -> datetime:
+    day = cfg.now - timedelta(days=rng.randrange(cfg.days))
+    hour = bisect_left(hour_cum, rng.random() * hour_cum[-1])
+    ts = day.replace(hour=hour, minute=rng.randrange(60), second=rng.randrange(60))
+    return min(ts, cfg.now)
+
+
+def _gen_catalog(cfg: SeedConfig, ids: _Ids, w: _Writer) -> list[tuple[str, str, int, str]]:
+    rng = random.Random(f"{cfg.seed}:products")
+    catalog = []
+    for i in range(cfg.products):
+        noun, category = rng.choice(_NOUN)
+        name = f"{rng.choice(_ADJ)} {noun} {i % 97 + 1}"
+        # lognormal prices, median ~ 60.00
+        price_minor = max(199, int(rng.lognormvariate(math.log(6_000), 0.9)) // 100 * 100 + 99)
+        pid = ids("product", i)
+        w.add("products", {
+            "id": pid,
+            "name": name,
+            "description": f"{category} / {noun.lower()}",
+            "price_minor": price_minor,
+            "currency": "USD",
+            "inventory_qty": int(rng.expovariate(1 / 200)),
+            "is_active": rng.random() < 0.95,
+        })
+        catalog.append((pid, name, price_minor, "USD"))
+    return catalog
+
+
+def _gen_user(cfg: SeedConfig, ids: _Ids, w: _Writer, i: int, rng: random.Random) -> tuple[str, str]:
+    uid = ids("user", i)
+    w.add("users", {
+        "id": uid,
+        "full_name": f"{rng.choice(_FIRST)} {rng.choice(_LAST)}",
+        "email": f"user{i}@load.example.com",
+    })
+    currency = _weighted(rng, _CURRENCIES)
+    w.add("accounts", {
+        "id": ids("account", i),
+        "user_id": uid,
+        # lognormal balances, median ~ 500.00 (minor units; JPY has none but stays comparable)
+        "balance_minor": int(rng.lognormvariate(math.log(50_000), 1.2)),
+        "currency": currency,
+    })
+    return uid, currency
+
+
+def _gen_transactions(cfg, ids, w, rng, uid, catalog, product_cum, hour_cum, counter) -> None:
+    for k in range(_heavy_tail(rng, cfg.tx_per_user)):
+        pid, _, price_minor, currency = catalog[bisect_left(product_cum, rng.random() * product_cum[-1])]
+        qty = 1 if rng.random() < 0.85 else rng.randint(2, 4)
+        w.add("transactions", {
+            "id": ids("tx", counter[0]),
+            "user_id": uid,
+            "product_id": pid,
+            "qty": qty,
+            "unit_price_minor": price_minor,
+            "total_amount_minor": price_minor * qty,
+            "currency": currency,
+            "status": _weighted(rng, _TX_STATUSES),
+            "idempotency_key": f"seed_{k:05d}",
+            "metadata_json": None,
+            "created_at": _timestamp(rng, cfg, hour_cum),
+        })
+        counter[0] += 1
+
+
+def _search(catalog, searches: dict[str, dict], query: str) -> dict:
+    # like search_products: the same query returns the same products
+    if query not in searches:
+        hits = [p for p in catalog if query in p[1].lower()][:5]
+        searches[query] = {"results": [{"id": p[0], "name": p[1], "price": f"{p[2] / 100:.2f}", "currency": p[3]} for p in hits]}
+    return searches[query]
+
+
+def _timings(rng: random.Random, planned: bool, tools: list[str]) -> tuple[dict, list[float | None]]:
+    """Stage timings (ms) shaped like local heuristic-planner turns: trace columns, per-audit durations."""
+    durations = [None if t.startswith("policy.") else round(rng.lognormvariate(math.log(4.0), 0.6), 3) for t in tools]
+    stages = {
+        "memory_ms": round(rng.lognormvariate(math.log(0.8), 0.5), 3) if planned else None,
+        "plan_ms": round(rng.lognormvariate(math.log(0.3), 0.5), 3) if planned else None,
+        "policy_ms": round(rng.lognormvariate(math.log(1.5), 0.6), 3) if planned else None,
+        "tools_ms": round(sum(d for d in durations if d is not None), 3) if tools else None,
+    }
+    # plus trace writes and commits
+    overhead = rng.lognormvariate(math.log(6.0), 0.5)
+    stages["duration_ms"] = round(sum(v for v in stages.values() if v is not None) + overhead, 3)
+    return stages, durations
+
+
+def _gen_sessions(cfg, ids, w, rng, uid, user_index, catalog, searches, hour_cum, counter) -> None:
+    n_sessions = min(int(rng.expovariate(1 / cfg.sessions_per_user)) if cfg.sessions_per_user > 0 else 0, 200)
+    for s in range(n_sessions):
+        sid = f"load-{user_index}-{s}"
+        # separate stream, so timings don't change the rest of the generated data
+        timing_rng = random.Random(f"{cfg.seed}:timings:{sid}")
+        ts = _timestamp(rng, cfg, hour_cum)
+        started = ts
+        turns = 1 + int(rng.expovariate(1 / max(cfg.turns_per_session - 1, 0.1)))
+        last_message = ""
+        last_product = None
+        for _ in range(turns):
+            tid = ids("trace", counter[0])
+            counter[0] += 1
+            kind = rng.random()
+            audits: list[tuple[str, dict, dict | None]] = []
+            if kind < 0.35:
+                message = "what is my balance"
+                plan = {"intent": "check_balance", "steps": [{"step_type": "tool_call", "tool_call": {"tool_name": "check_balance", "arguments": {"user_id": uid}}}]}
+                audits.append(("check_balance", {"user_id": uid}, {"user_id": uid, "balance": f"{rng.randint(5, 5000)}.00", "currency": "USD"}))
+                reply = "Your balance is ..."
+            elif kind < 0.75 or last_product is None:
+                last_product = rng.choice(catalog)
+                query = last_product[1].split()[1].lower()
+                message = f"buy {query}"
+                plan = {"intent": "purchase", "steps": [{"step_type": "tool_call", "tool_call": {"tool_name": "search_products", "arguments": {"query": query, "limit": 5}}}]}
+                audits.append(("search_products", {"query": query, "limit": 5}, _search(catalog, searches, query)))
+                reply = "Here are matching products: ..."
+            else:
+                pid, name, price_minor, currency = last_product
+                message = f"confirm {uuid.UUID(int=rng.getrandbits(128)).hex[:16]}"
+                plan = None
+                args = {"user_id": uid, "product_id": pid, "qty": 1, "confirm": True}
+                audits.append(("policy.velocity", {"user_id": uid, "amount_minor": price_minor}, {"allowed": True, "amount_minor": price_minor}))
+                audits.append(("execute_purchase", args, {"product_id": pid, "total_amount": f"{price_minor / 100:.2f}", "currency": currency}))
+                reply = "Purchase confirmed ✅"
+            stages, durations = _timings(timing_rng, plan is not None, [a[0] for a in audits])
+            w.add("traces", {
+                "id": tid,
+                "session_id": sid,
+                "user_message": message,
+                "assistant_message": reply,
+                "plan_ref": w.payload(plan),
+                "intent": plan["intent"] if plan else None,
+                "planner": "heuristic" if plan else None,
+                **stages,
+                "created_at": ts,
+            })
+            for j, ((tool, inp, out), duration_ms) in enumerate(zip(audits, durations)):
+                w.add("audit_logs", {
+                    "id": ids("audit", counter[0] * 4 + j),
+                    "trace_id": tid,
+                    "tool_name": tool,
+                    "status": "ok",
+                    "input_json": inp,
+                    "output_ref": w.payload(out),
+                    "error_message": None,
+                    "duration_ms": duration_ms,
+                    "created_at": ts,
+                })
+            last_message = message
+            ts += timedelta(seconds=rng.randint(5, 180))
+
+        w.add("session_memory", {
+            "id": ids("memory", user_index * 1000 + s),
+            "session_id": sid,
+            "memory_json": {"selected_product_id": last_product[0] if last_product else None},
+            "updated_at": ts,
+        })
+        w.add("sessions", {
+            "session_id": sid,
+            "user_id": uid,
+            "turns": turns,
+            "last_user_message": last_message[:PREVIEW_CHARS],
+            "last_activity": ts,
+            "created_at": started,
+        })
+
+
+def reset(engine: Engine) -> None:
+    """Delete all rows from the seeded tables (children first). Dev/load databases only."""
+    with engine.begin() as conn:
+        for model in (AuditLog, SessionSummary, SessionMemory, Trace, Payload, Transaction, Account, Product, User):
+            conn.execute(delete(model.__table__))
+    payloads.payload_cache.forget(engine)
+
+
+def generate(engine: Engine, cfg: SeedConfig) -> dict[str, TableStats]:
+    ids = _Ids(cfg.seed)
+    w = _Writer(engine, cfg.batch)
+    hour_cum = list(accumulate(_HOURLY))
+
+    catalog = _gen_catalog(cfg, ids, w)
+    # Zipf-like popularity: the k-th product is bought ~1/k as often as the first
+    product_cum = list(accumulate(1 / (k + 1) for k in range(len(catalog))))
+
+    rng = random.Random(f"{cfg.seed}:users")
+    tx_counter, trace_counter = [0], [0]
+    searches: dict[str, dict] = {}
+    for i in range(cfg.users):
+        uid, _ = _gen_user(cfg, ids, w, i, rng)
+        if catalog:
+            _gen_transactions(cfg, ids, w, rng, uid, catalog, product_cum, hour_cum, tx_counter)
+            _gen_sessions(cfg, ids, w, rng, uid, i, catalog, searches, hour_cum, trace_counter)
+    w.flush()
+    return w.stats
+
+
+def main() -> None:
+    from app.core.config import settings
+    from app.db.profiles import build_engine
+    from app.services.account_cache import account_cache
+
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--db-url", default=settings.database_url)
+    ap.add_argument("--profile", default=settings.storage_profile)
+    ap.add_argument("--users", type=int, default=SeedConfig.users)
+    ap.add_argument("--products", type=int, default=SeedConfig.products)
+    ap.add_argument("--tx-per-user", type=float, default=SeedConfig.tx_per_user)
+    ap.add_argument("--sessions-per-user", type=float, default=SeedConfig.sessions_per_user)
+    ap.add_argument("--turns-per-session", type=float, default=SeedConfig.turns_per_session)
+    ap.add_argument("--days", type=int, default=SeedConfig.days)
+    ap.add_argument("--seed", type=int, default=SeedConfig.seed)
+    ap.add_argument("--batch", type=int, default=SeedConfig.batch)
+    ap.add_argument("--now", type=datetime.fromisoformat, default=None, help="anchor timestamp, e.g. 2026-01-01T00:00:00+00:00")
+    ap.add_argument("--create-tables", action="store_true", help="create missing tables first (no migrations)")
+    ap.add_argument("--reset", action="store_true", help="delete existing rows in the seeded tables first")
+    args = ap.parse_args()
+
+    engine = build_engine(args.db_url, args.profile)
+    if args.create_tables:
+        Base.metadata.create_all(bind=engine)
+    if args.reset:
+        reset(engine)
+
+    cfg = SeedConfig(
+        users=args.users,
+        products=args.products,
+        tx_per_user=args.tx_per_user,
+        sessions_per_user=args.sessions_per_user,
+        turns_per_session=args.turns_per_session,
+        days=args.days,
+        seed=args.seed,
+        batch=args.batch,
+    )
+    if args.now is not None:
+        cfg.now = args.now if args.now.tzinfo else args.now.replace(tzinfo=timezone.utc)
+    t0 = time.perf_counter()
+    stats = generate(engine, cfg)
+    elapsed = time.perf_counter() - t0
+    account_cache.clear()
+    engine.dispose()
+
+    total = sum(s.rows for s in stats.values())
+    print("\n=== Bulk seed ===")
+    print(f"{'table':<16} {'rows':>12} {'rows/s':>12}")
+    for name, st in stats.items():
+        print(f"{name:<16} {st.rows:>12,} {st.rows_per_s:>12,.0f}")
+    print(f"{'total':<16} {total:>12,} {total / elapsed:>12,.0f}   ({elapsed:.1f}s incl. generation)")
+
+
+if __name__ == "__main__":
+    main()
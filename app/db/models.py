@@ -4,19 +4,23 @@ import enum
 import uuid
 from datetime import datetime
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     DateTime,
     Enum,
+    Float,
     ForeignKey,
     Index,
     Integer,
-    Numeric,
+    LargeBinary,
     String,
     Text,
     UniqueConstraint,
     func,
 )
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, query_expression, relationship
+
+from app.db.types import JsonPayload, StoredPayload, json_text
 
 
 class Base(DeclarativeBase):
@@ -56,6 +60,9 @@ class User(Base):
     account: Mapped["Account"] = relationship(back_populates="user", uselist=False, cascade="all, delete-orphan")
     transactions: Mapped[list["Transaction"]] = relationship(back_populates="user")
 
+    # keyset pages seek on (created_at, id)
+    __table_args__ = (Index("ix_users_created_at", "created_at", "id"),)
+
 
 class Account(Base):
     __tablename__ = "accounts"
@@ -63,8 +70,8 @@ class Account(Base):
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=_uuid)
     user_id: Mapped[str] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), unique=True, nullable=False)
 
-    # Use Numeric for money. (Store as decimal, not float.)
-    balance: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False, default=0)
+    # Money is stored as integer minor units (cents for USD); see app/utils/money.py.
+    balance_minor: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
     currency: Mapped[str] = mapped_column(String(8), nullable=False, default="USD")
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -82,7 +89,7 @@ class Product(Base):
     name: Mapped[str] = mapped_column(String(160), nullable=False)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
 
-    price: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False)
+    price_minor: Mapped[int] = mapped_column(BigInteger, nullable=False)
     currency: Mapped[str] = mapped_column(String(8), nullable=False, default="USD")
 
     inventory_qty: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -96,6 +103,7 @@ class Product(Base):
     __table_args__ = (
         Index("ix_products_name", "name"),
         Index("ix_products_active", "is_active"),
+        Index("ix_products_created_at", "created_at", "id"),
     )
 
 
@@ -107,8 +115,8 @@ class Transaction(Base):
     product_id: Mapped[str | None] = mapped_column(ForeignKey("products.id", ondelete="SET NULL"), nullable=True)
 
     qty: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
-    unit_price: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False, default=0)
-    total_amount: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False, default=0)
+    unit_price_minor: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    total_amount_minor: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
     currency: Mapped[str] = mapped_column(String(8), nullable=False, default="USD")
 
     status: Mapped[TransactionStatus] = mapped_column(Enum(TransactionStatus), nullable=False, default=TransactionStatus.pending)
@@ -116,8 +124,8 @@ class Transaction(Base):
     # idempotency: the same key should not produce multiple charges
     idempotency_key: Mapped[str] = mapped_column(String(80), nullable=False)
 
-    # freeform json stored as text (simple for SQLite). Can upgrade to JSONB in Postgres.
-    metadata_json: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # freeform metadata (native JSON; JSONB on Postgres)
+    metadata_json: Mapped[dict | None] = mapped_column(JsonPayload, nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
@@ -130,10 +138,26 @@ class Transaction(Base):
     __table_args__ = (
         UniqueConstraint("user_id", "idempotency_key", name="uq_tx_user_idempotency"),
         Index("ix_transactions_user_id", "user_id"),
-        Index("ix_transactions_status", "status"),
+        Index("ix_transactions_created_at", "created_at"),
     )
 
 
+class Payload(Base):
+    """
+    A JSON document stored once and referenced by hash from traces and audit rows
+    (see app/db/payloads.py).
+    """
+    __tablename__ = "payloads"
+
+    # BLAKE2b-128 of the JSON text, hex
+    hash: Mapped[str] = mapped_column(String(32), primary_key=True)
+    # zlib-compressed UTF-8 JSON text
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)  # uncompressed bytes
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
 class Trace(Base):
     """
     One trace per user turn (or per request). This is your observability anchor.
@@ -141,15 +165,61 @@ class Trace(Base):
     __tablename__ = "traces"
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=_uuid)
-    session_id: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    session_id: Mapped[str] = mapped_column(String(64), nullable=False)
 
     user_message: Mapped[str] = mapped_column(Text, nullable=False)
     assistant_message: Mapped[str | None] = mapped_column(Text, nullable=True)
 
-    plan_json: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # content-addressed (see app/db/payloads.py); plan_json reads and writes through it
+    plan_ref: Mapped[str | None] = mapped_column(ForeignKey("payloads.hash"), nullable=True)
+    plan_json = StoredPayload("plan_ref")
+
+    # where the turn's time went (ms), written with the trace by the orchestrator; NULL for
+    # stages the turn did not run. tools_ms sums the turn's tool calls (see AuditLog.duration_ms)
+    intent: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    planner: Mapped[str | None] = mapped_column(String(16), nullable=True)  # "llm" | "heuristic"
+    duration_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    memory_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    plan_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    policy_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
+    tools_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # session timelines (keyset on created_at, id), confirmation-token scan, last-message-per-session
+        Index("ix_traces_session_created", "session_id", "created_at", "id"),
+        # global recency (sessions sidebar, retention)
+        Index("ix_traces_created_at", "created_at"),
+        # payload garbage collection
+        Index("ix_traces_plan_ref", "plan_ref"),
+    )
+
+
+class SessionSummary(Base):
+    """
+    One row per chat session, upserted in the same transaction as each trace
+    (see app/services/sessions.py). Session listings read this instead of traces.
+    """
+    __tablename__ = "sessions"
+
+    session_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    # no FK: the dev seed wipes users while sessions are kept
+    user_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
+
+    turns: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_user_message: Mapped[str | None] = mapped_column(Text, nullable=True)
+    last_activity: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    # bumped whenever a trace or audit row of the session changes; the timeline ETag
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_sessions_last_activity", "last_activity", "session_id"),
+        Index("ix_sessions_user_last_activity", "user_id", "last_activity"),
+    )
+
 
 class AuditLog(Base):
     """
@@ -158,33 +228,52 @@ class AuditLog(Base):
     __tablename__ = "audit_logs"
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=_uuid)
-    trace_id: Mapped[str] = mapped_column(ForeignKey("traces.id", ondelete="CASCADE"), nullable=False, index=True)
+    trace_id: Mapped[str] = mapped_column(ForeignKey("traces.id", ondelete="CASCADE"), nullable=False)
 
     tool_name: Mapped[str] = mapped_column(String(80), nullable=False)
     status: Mapped[ToolCallStatus] = mapped_column(Enum(ToolCallStatus), nullable=False, default=ToolCallStatus.ok)
 
-    input_json: Mapped[str | None] = mapped_column(Text, nullable=True)
-    output_json: Mapped[str | None] = mapped_column(Text, nullable=True)
+    input_json: Mapped[dict | None] = mapped_column(JsonPayload, nullable=True)
+    # stored JSON text, only loaded on request (see app.api.responses.raw_payloads)
+    input_json_raw: Mapped[str | None] = query_expression()
+    # outputs (search results above all) repeat across users: stored once in `payloads`
+    output_ref: Mapped[str | None] = mapped_column(ForeignKey("payloads.hash"), nullable=True)
+    output_json = StoredPayload("output_ref")
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # time spent in the tool itself (not the audit write)
+    duration_ms: Mapped[float | None] = mapped_column(Float, nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
+    # every filter is paired with (created_at, id) so the newest-first feeds seek and never sort
     __table_args__ = (
-        Index("ix_audit_logs_tool_name", "tool_name"),
-        Index("ix_audit_logs_status", "status"),
+        Index("ix_audit_logs_trace_created", "trace_id", "created_at", "id"),
+        Index("ix_audit_logs_tool_created", "tool_name", "created_at", "id"),
+        Index("ix_audit_logs_status_created", "status", "created_at", "id"),
+        Index("ix_audit_logs_created_at", "created_at", "id"),
+        Index("ix_audit_logs_output_ref", "output_ref"),
     )
 
+
+# Payload filter: every audited call made for a user. Queries must use the same
+# json_text() expression for the index to apply.
+Index("ix_audit_logs_input_user_id", json_text(AuditLog.input_json, "user_id"), AuditLog.created_at, AuditLog.id)
+
+
 class SessionMemory(Base):
     __tablename__ = "session_memory"
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=_uuid)
-    session_id: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    session_id: Mapped[str] = mapped_column(String(64), nullable=False)
 
-    # store recent resolved entities as JSON text
-    memory_json: Mapped[str] = mapped_column(Text, nullable=False, default="{}")
+    # recent resolved entities (candidates, selected product, pending qty)
+    memory_json: Mapped[dict] = mapped_column(JsonPayload, nullable=False, default=dict)
 
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
 
-    __table_args__ = (Index("ix_session_memory_session_id", "session_id"),)
+    __table_args__ = (
+        Index("uq_session_memory_session_id", "session_id", unique=True),
+        Index("ix_session_memory_updated_at", "updated_at"),
+    )
@@ -0,0 +1,361 @@
+"""
+Content-addressed store for trace plans and tool outputs (the `payloads` table).
+
+A payload is encoded once with app.utils.jsoncodec, hashed (BLAKE2b-128 of the JSON text),
+zlib-compressed and inserted only if the hash is new; `traces.plan_ref` and
+`audit_logs.output_ref` keep the hash. Plans and search results repeat across users and
+turns, so most writes add a 32-character reference instead of another copy.
+
+Models expose the decoded values as `Trace.plan_json` and `AuditLog.output_json`
+(app.db.types.StoredPayload): assigning one stores it on the next flush, reading one goes
+through an in-process LRU of payload texts. List endpoints call prefetch() (or texts())
+first, so a page costs at most one IN query for its uncached payloads. Payloads that are no
+longer referenced are dropped by gc(), which retention runs after each purge.
+
+  poetry run python -m app.db.payloads stats
+  poetry run python -m app.db.payloads gc
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import threading
+import time
+import weakref
+import zlib
+from collections import OrderedDict
+from typing import Any, Iterable, Iterator
+
+from sqlalchemy import Connection, delete, event, exists, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.db.models import AuditLog, Payload, Trace
+from app.db.types import StoredPayload
+from app.utils import jsoncodec
+from app.utils.jsoncodec import RawJSON
+
+# reference column -> payload field, per table; used wherever rows are read through Core
+PAYLOAD_REFS: dict[str, dict[str, str]] = {
+    "traces": {"plan_ref": "plan_json"},
+    "audit_logs": {"output_ref": "output_json"},
+}
+
+# hashes written in a session that has not committed yet
+_PENDING_KEY = "payloads_pending"
+# how long a committed hash is trusted to still exist without asking the database; far
+# below the shortest retention TTL, so gc() cannot have dropped it in the meantime
+_KNOWN_TTL_S = 600.0
+_KNOWN_MAX = 100_000
+_IN_CHUNK = 500
+
+
+def encode(value: Any) -> tuple[str, str]:
+    """(hash, JSON text) of a payload."""
+    text = jsoncodec.dumps(value)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest(), text
+
+
+def payload_row(ref: str, text: str) -> dict:
+    """A `payloads` row for an encoded payload."""
+    raw = text.encode("utf-8")
+    return {"hash": ref, "data": zlib.compress(raw, 6), "size": len(raw)}
+
+
+class PayloadCache:
+    """
+    Payload texts by hash (LRU, bounded in bytes) plus, per engine, the hashes recently
+    committed there so repeated payloads skip the insert entirely. Texts are immutable for
+    a given hash, so the text cache is shared by every database in the process.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._texts: OrderedDict[str, str] = OrderedDict()
+        self._bytes = 0
+        self._known: weakref.WeakKeyDictionary[Engine, dict[str, float]] = weakref.WeakKeyDictionary()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0  # non-null payloads stored by this process
+        self.inserted = 0  # ... that added a row
+
+    def get(self, ref: str) -> str | None:
+        with self._lock:
+            text = self._texts.get(ref)
+            if text is None:
+                self.misses += 1
+                return None
+            self._texts.move_to_end(ref)
+            self.hits += 1
+            return text
+
+    def put(self, ref: str, text: str) -> None:
+        if len(text) > self.max_bytes:
+            return
+        with self._lock:
+            if ref in self._texts:
+                self._texts.move_to_end(ref)
+                return
+            self._texts[ref] = text
+            self._bytes += len(text)
+            while self._bytes > self.max_bytes:
+                _, old = self._texts.popitem(last=False)
+                self._bytes -= len(old)
+
+    def known(self, engine: Engine, ref: str) -> bool:
+        with self._lock:
+            expires = self._known.get(engine, {}).get(ref)
+            return expires is not None and expires > time.monotonic()
+
+    def remember(self, engine: Engine, refs: Iterable[str]) -> None:
+        expires = time.monotonic() + _KNOWN_TTL_S
+        with self._lock:
+            known = self._known.setdefault(engine, {})
+            for ref in refs:
+                known.pop(ref, None)
+                known[ref] = expires
+            while len(known) > _KNOWN_MAX:
+                del known[next(iter(known))]
+
+    def forget(self, engine: Engine) -> None:
+        """Drop what is known to exist in `engine` (after gc() or a bulk delete)."""
+        with self._lock:
+            self._known.pop(engine, None)
+
+    def record_writes(self, writes: int, inserted: int) -> None:
+        with self._lock:
+            self.writes += writes
+            self.inserted += inserted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._texts.clear()
+            self._bytes = 0
+            self._known.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._texts),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "writes": self.writes,
+                "inserted": self.inserted,
+                "dedup_ratio": (self.writes / self.inserted) if self.inserted else 0.0,
+            }
+
+
+payload_cache = PayloadCache(max_bytes=settings.payload_cache_bytes)
+
+
+def _engine(db: Session | Connection) -> Engine:
+    bind = db.get_bind() if isinstance(db, Session) else db
+    return bind if isinstance(bind, Engine) else bind.engine
+
+
+def insert_missing(conn: Connection, rows: list[dict]) -> int:
+    """Insert payload rows whose hash is not stored yet. Returns the number added."""
+    if not rows:
+        return 0
+    t = Payload.__table__
+    dialect = conn.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        dml = sqlite if dialect == "sqlite" else postgresql
+        result = conn.execute(dml.insert(t).on_conflict_do_nothing(index_elements=[t.c.hash]), rows)
+        return result.rowcount if result.rowcount >= 0 else len(rows)
+    existing: set[str] = set()
+    for i in range(0, len(rows), _IN_CHUNK):
+        chunk = [r["hash"] for r in rows[i : i + _IN_CHUNK]]
+        existing.update(conn.execute(select(t.c.hash).where(t.c.hash.in_(chunk))).scalars())
+    fresh = [r for r in rows if r["hash"] not in existing]
+    if fresh:
+        conn.execute(insert(t), fresh)
+    return len(fresh)
+
+
+def store(db: Session, values: Iterable[Any]) -> list[str | None]:
+    """Store payloads (None stays None) in the session's transaction; returns their hashes."""
+    engine = _engine(db)
+    pending: set[str] = db.info.setdefault(_PENDING_KEY, set())
+    refs: list[str | None] = []
+    new: dict[str, str] = {}
+    for value in values:
+        if value is None:
+            refs.append(None)
+            continue
+        ref, text = encode(value)
+        refs.append(ref)
+        payload_cache.put(ref, text)
+        if ref not in pending and not payload_cache.known(engine, ref):
+            new[ref] = text
+    # Core on the session's connection: runs inside before_flush without re-entering the flush
+    inserted = insert_missing(db.connection(), [payload_row(ref, text) for ref, text in new.items()])
+    pending.update(new)
+    payload_cache.record_writes(sum(r is not None for r in refs), inserted)
+    return refs
+
+
+_ATTRS: dict[type, list[StoredPayload]] = {}
+
+
+def _stored_attributes(cls: type) -> list[StoredPayload]:
+    return [v for klass in cls.__mro__ for v in vars(klass).values() if isinstance(v, StoredPayload)]
+
+
+@event.listens_for(Session, "before_flush")
+def _store_assigned_payloads(session: Session, flush_context, instances) -> None:
+    assigned: list[tuple[Any, StoredPayload, Any]] = []
+    for obj in (*session.new, *session.dirty):
+        cls = type(obj)
+        if cls not in _ATTRS:
+            _ATTRS[cls] = _stored_attributes(cls)
+        for attr in _ATTRS[cls]:
+            unstored, value = attr.unstored(obj)
+            if unstored:
+                assigned.append((obj, attr, value))
+    if not assigned:
+        return
+    refs = store(session, [value for _, _, value in assigned])
+    for (obj, attr, value), ref in zip(assigned, refs):
+        attr.stored(obj, ref, value)
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_committed(session: Session) -> None:
+    refs = session.info.pop(_PENDING_KEY, None)
+    if refs:
+        payload_cache.remember(_engine(session), refs)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def texts(db: Session | Connection, refs: Iterable[str | None]) -> dict[str, str]:
+    """Payload texts by hash, from the cache or one IN query per 500 uncached hashes."""
+    out: dict[str, str] = {}
+    missing: list[str] = []
+    for ref in set(refs):
+        if ref is None:
+            continue
+        text = payload_cache.get(ref)
+        if text is None:
+            missing.append(ref)
+        else:
+            out[ref] = text
+    t = Payload.__table__
+    for i in range(0, len(missing), _IN_CHUNK):
+        rows = db.execute(select(t.c.hash, t.c.data).where(t.c.hash.in_(missing[i : i + _IN_CHUNK])))
+        for ref, data in rows:
+            text = zlib.decompress(data).decode("utf-8")
+            payload_cache.put(ref, text)
+            out[ref] = text
+    return out
+
+
+def prefetch(db: Session, refs: Iterable[str | None]) -> None:
+    """Warm the cache for a page of rows before reading their payload attributes."""
+    texts(db, refs)
+
+
+def load(obj: Any, ref: str | None) -> Any:
+    """Decoded payload `ref` for a model instance (used by StoredPayload)."""
+    if ref is None:
+        return None
+    text = payload_cache.get(ref)
+    if text is None:
+        db = object_session(obj)
+        if db is None:
+            raise RuntimeError(f"Cannot load payload {ref}: {type(obj).__name__} is detached")
+        text = texts(db, [ref]).get(ref)
+    return None if text is None else jsoncodec.loads(text)
+
+
+def inline(db: Session | Connection, table: str, records: Iterable[dict], *, batch: int = 1000) -> Iterator[dict]:
+    """
+    Replace the payload references of Core row dicts from `table` with the payload text
+    (RawJSON, for jsoncodec.dumps_with_raw), looked up `batch` rows at a time.
+    """
+    refs = PAYLOAD_REFS.get(table)
+    if not refs:
+        yield from records
+        return
+
+    def resolve(chunk: list[dict]) -> Iterator[dict]:
+        found = texts(db, (r[c] for r in chunk for c in refs))
+        for r in chunk:
+            yield {refs.get(k, k): (RawJSON(found.get(v)) if k in refs else v) for k, v in r.items()}
+
+    chunk: list[dict] = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= batch:
+            yield from resolve(chunk)
+            chunk = []
+    yield from resolve(chunk)
+
+
+def gc(db: Session) -> int:
+    """Delete payloads no trace or audit row references. Commits; returns the number removed."""
+    t = Payload.__table__
+    result = db.execute(
+        delete(t).where(
+            ~exists().where(Trace.plan_ref == t.c.hash),
+            ~exists().where(AuditLog.output_ref == t.c.hash),
+        )
+    )
+    db.commit()
+    payload_cache.forget(_engine(db))
+    return result.rowcount
+
+
+def db_stats(db: Session) -> dict:
+    """Deduplication across the whole store: references vs stored payloads, and bytes."""
+    t = Payload.__table__
+    payloads, stored_bytes, unique_bytes = db.execute(
+        select(func.count(), func.coalesce(func.sum(func.length(t.c.data)), 0), func.coalesce(func.sum(t.c.size), 0))
+    ).one()
+    references = logical_bytes = 0
+    for model, ref in ((Trace, Trace.plan_ref), (AuditLog, AuditLog.output_ref)):
+        n, size = db.execute(
+            select(func.count(), func.coalesce(func.sum(t.c.size), 0)).select_from(model).join(t, t.c.hash == ref)
+        ).one()
+        references += n
+        logical_bytes += size
+    return {
+        "payloads": payloads,
+        "references": references,
+        "dedup_ratio": (references / payloads) if payloads else 0.0,
+        "logical_bytes": logical_bytes,
+        "unique_bytes": unique_bytes,
+        "stored_bytes": stored_bytes,
+        # bytes the payloads would take inline vs what the table holds
+        "space_ratio": (logical_bytes / stored_bytes) if stored_bytes else 0.0,
+    }
+
+
+def main() -> None:
+    from app.db.session import SessionLocal
+
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("cmd", choices=["stats", "gc"])
+    args = ap.parse_args()
+
+    with SessionLocal() as db:
+        if args.cmd == "gc":
+            print(f"{gc(db)} unreferenced payloads removed")
+            return
+        for key, value in db_stats(db).items():
+            print(f"{key:14} {value:.2f}" if isinstance(value, float) else f"{key:14} {value}")
+
+
+if __name__ == "__main__":
+    main()
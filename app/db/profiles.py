@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, SessionTransaction
+
+from app.core.config import settings
+from app.utils import jsoncodec
+
+
+@dataclass(frozen=True)
+class StorageProfile:
+    """
+    Named engine configuration. `engine_kwargs` go to create_engine; `sqlite_pragmas`
+    are applied on every new DB-API connection.
+    """
+    name: str
+    engine_kwargs: dict[str, Any] = field(default_factory=dict)
+    connect_args: dict[str, Any] = field(default_factory=dict)
+    sqlite_pragmas: dict[str, Any] = field(default_factory=dict)
+
+
+def _plain(url: str) -> StorageProfile:
+    # What the app used before profiles existed; kept as a benchmark baseline.
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    return StorageProfile(name="plain", engine_kwargs={"pool_pre_ping": True}, connect_args=connect_args)
+
+
+def _sqlite(url: str) -> StorageProfile:
+    pragmas: dict[str, Any] = {
+        "synchronous": "NORMAL",
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+        "mmap_size": settings.sqlite_mmap_size,
+        "cache_size": -settings.sqlite_cache_size_kib,  # negative = KiB, not pages
+        "temp_store": "MEMORY",
+    }
+    if not _is_memory_sqlite(url):
+        # WAL lets readers run alongside the single writer; not applicable to :memory:
+        pragmas = {"journal_mode": "WAL", **pragmas}
+    return StorageProfile(
+        name="sqlite",
+        engine_kwargs={"pool_pre_ping": True},
+        # sqlite3's own busy timeout is in seconds; keep it in step with the pragma
+        connect_args={"check_same_thread": False, "timeout": settings.sqlite_busy_timeout_ms / 1000},
+        sqlite_pragmas=pragmas,
+    )
+
+
+def _postgres(url: str) -> StorageProfile:
+    options = (
+        f"-c statement_timeout={settings.pg_statement_timeout_ms} "
+        f"-c idle_in_transaction_session_timeout={settings.pg_idle_in_transaction_timeout_ms}"
+    )
+    return StorageProfile(
+        name="postgres",
+        engine_kwargs={
+            "pool_pre_ping": True,
+            "pool_size": settings.pg_pool_size,
+            "max_overflow": settings.pg_max_overflow,
+            "pool_timeout": settings.pg_pool_timeout_s,
+            "pool_recycle": settings.pg_pool_recycle_s,
+        },
+        connect_args={"options": options},
+    )
+
+
+PROFILES = {
+    "plain": _plain,
+    "sqlite": _sqlite,
+    "postgres": _postgres,
+}
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    return url in {"sqlite://", "sqlite:///:memory:"} or "mode=memory" in url
+
+
+def resolve_profile(url: str, name: str = "auto") -> StorageProfile:
+    if name == "auto":
+        if url.startswith("sqlite"):
+            name = "sqlite"
+        elif url.startswith("postgresql"):
+            name = "postgres"
+        else:
+            name = "plain"
+    if name not in PROFILES:
+        raise ValueError(f"Unknown storage profile: {name} (expected one of {sorted(PROFILES)} or 'auto')")
+    return PROFILES[name](url)
+
+
+def build_engine(url: str, profile: str = "auto", **engine_kwargs: Any) -> Engine:
+    prof = resolve_profile(url, profile)
+    eng = create_engine(
+        url,
+        connect_args=prof.connect_args,
+        future=True,
+        # JSON/JSONB payload columns go through the configured codec
+        json_serializer=jsoncodec.dumps,
+        json_deserializer=jsoncodec.loads,
+        **{**prof.engine_kwargs, **engine_kwargs},
+    )
+
+    if prof.sqlite_pragmas:
+        @event.listens_for(eng, "connect")
+        def _apply_pragmas(dbapi_conn, connection_record) -> None:
+            cur = dbapi_conn.cursor()
+            for key, value in prof.sqlite_pragmas.items():
+                cur.execute(f"PRAGMA {key}={value}")
+            cur.close()
+
+    return eng
+
+
+def savepoint(db: Session) -> SessionTransaction:
+    """db.begin_nested(), with the enclosing transaction opened first on SQLite."""
+    conn = db.connection()
+    # pysqlite only sends BEGIN before DML; a SAVEPOINT ahead of it would become the outermost
+    # transaction and its RELEASE would commit
+    if conn.dialect.name == "sqlite" and not conn.connection.dbapi_connection.in_transaction:
+        conn.exec_driver_sql("BEGIN")
+    return db.begin_nested()
@@ -0,0 +1,258 @@
+"""
+Retention for traces, audit logs, session memory and session summaries.
+
+Rows are grouped into UTC day partitions by their timestamp column. Once a whole day is
+older than the table's TTL it is written to `<archive_dir>/<table>/<YYYY-MM-DD>.jsonl.gz`
+and removed with a single range delete on the (indexed) timestamp, never row by row.
+Archives carry plans and tool outputs inline; payloads no longer referenced afterwards are
+garbage-collected. Archives can be loaded back for investigations:
+
+  poetry run python -m app.db.retention purge [--dry-run] [--vacuum]
+  poetry run python -m app.db.retention import archive/traces/2026-01-02.jsonl.gz ...
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import os
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterator
+
+from sqlalchemy import DateTime, Table, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import payloads
+from app.db.models import AuditLog, SessionMemory, SessionSummary, Trace
+from app.services.sessions import touch_sessions
+from app.utils import jsoncodec
+
+_BATCH = 1000
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    table: Table
+    ts_column: str
+    ttl_days: int  # 0 keeps rows forever
+
+
+@dataclass(frozen=True)
+class PartitionResult:
+    table: str
+    day: date
+    rows: int
+    path: str | None
+
+
+def default_policies() -> list[RetentionPolicy]:
+    # Audit rows go before their traces so a shorter audit TTL archives them on their own.
+    return [
+        RetentionPolicy(AuditLog.__table__, "created_at", settings.audit_retention_days),
+        RetentionPolicy(Trace.__table__, "created_at", settings.trace_retention_days),
+        RetentionPolicy(SessionMemory.__table__, "updated_at", settings.session_memory_retention_days),
+        # a session drops out of listings once its newest trace has expired
+        RetentionPolicy(SessionSummary.__table__, "last_activity", settings.trace_retention_days),
+    ]
+
+
+def _day_bounds(day: date) -> tuple[datetime, datetime]:
+    start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+    return start, start + timedelta(days=1)
+
+
+def _as_date(value: datetime | str) -> date:
+    # SQLite can hand back MIN(...) as a plain string
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.date()
+
+
+def _expired_days(db: Session, policy: RetentionPolicy, cutoff: datetime) -> Iterator[date]:
+    """Days that have rows older than `cutoff`, oldest first (empty days are skipped)."""
+    ts = policy.table.c[policy.ts_column]
+    after: datetime | None = None
+    while True:
+        stmt = select(func.min(ts)).where(ts < cutoff)
+        if after is not None:
+            stmt = stmt.where(ts >= after)
+        oldest = db.execute(stmt).scalar()
+        if oldest is None:
+            return
+        day = _as_date(oldest)
+        yield day
+        after = _day_bounds(day)[1]
+
+
+def _rows(db: Session, stmt) -> Iterator[dict]:
+    for row in db.execute(stmt.execution_options(yield_per=_BATCH)):
+        yield dict(row._mapping)
+
+
+def _archive_path(archive_dir: str, table: str, day: date) -> str:
+    return os.path.join(archive_dir, table, f"{day.isoformat()}.jsonl.gz")
+
+
+def _purge_partition(db: Session, policy: RetentionPolicy, day: date, *, archive_dir: str, dry_run: bool) -> PartitionResult:
+    table = policy.table
+    ts = table.c[policy.ts_column]
+    start, end = _day_bounds(day)
+    in_day = (ts >= start) & (ts < end)
+
+    if dry_run:
+        n = db.execute(select(func.count()).select_from(table).where(in_day)).scalar()
+        return PartitionResult(table.name, day, n, None)
+
+    path = _archive_path(archive_dir, table.name, day)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    audit = AuditLog.__table__
+    is_traces = table is Trace.__table__
+    day_traces = select(table.c.id).where(in_day)
+
+    # audit rows still attached to these traces (audit TTL >= trace TTL) travel with them
+    attached: dict[str, list[dict]] = {}
+    if is_traces:
+        for a in payloads.inline(db, audit.name, _rows(db, select(audit).where(audit.c.trace_id.in_(day_traces)))):
+            attached.setdefault(a["trace_id"], []).append(a)
+
+    n = 0
+    # append mode: re-running after a crash adds another gzip member; import skips duplicates
+    with gzip.open(path, "at", encoding="utf-8") as fh:
+        for record in payloads.inline(db, table.name, _rows(db, select(table).where(in_day).order_by(ts))):
+            if is_traces:
+                record["audit_logs"] = attached.get(record["id"], [])
+            fh.write(jsoncodec.dumps_with_raw(record))
+            fh.write("\n")
+            n += 1
+
+    # timelines of the affected sessions change: invalidate their ETags
+    if is_traces:
+        touch_sessions(db, trace_ids=day_traces)
+    elif table is audit:
+        touch_sessions(db, trace_ids=select(audit.c.trace_id).where(in_day))
+
+    if is_traces:
+        db.execute(delete(audit).where(audit.c.trace_id.in_(day_traces)))
+    db.execute(delete(table).where(in_day))
+    db.commit()
+    return PartitionResult(table.name, day, n, path)
+
+
+def purge_expired(
+    db: Session,
+    *,
+    policies: list[RetentionPolicy] | None = None,
+    archive_dir: str | None = None,
+    now: datetime | None = None,
+    dry_run: bool = False,
+) -> list[PartitionResult]:
+    """Archive and drop every day partition that is entirely past its table's TTL."""
+    now = now or datetime.now(timezone.utc)
+    archive_dir = archive_dir or settings.retention_archive_dir
+    results: list[PartitionResult] = []
+    for policy in policies or default_policies():
+        if policy.ttl_days <= 0:
+            continue
+        # only whole days: a partition expires once its last instant is past the TTL
+        cutoff = datetime.combine((now - timedelta(days=policy.ttl_days)).date(), time.min, tzinfo=timezone.utc)
+        for day in _expired_days(db, policy, cutoff):
+            results.append(_purge_partition(db, policy, day, archive_dir=archive_dir, dry_run=dry_run))
+    if results and not dry_run:
+        payloads.gc(db)
+    return results
+
+
+def _decode(table: Table, record: dict) -> dict:
+    out = {}
+    for key, value in record.items():
+        col = table.c.get(key)
+        if col is None:
+            continue
+        if isinstance(col.type, DateTime) and isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        out[key] = value
+    return out
+
+
+def _decode_batch(db: Session, table: Table, records: list[dict]) -> list[dict]:
+    # payloads are archived inline: store them again and point the rows at them
+    for ref, field in payloads.PAYLOAD_REFS.get(table.name, {}).items():
+        for record, h in zip(records, payloads.store(db, [r.pop(field, None) for r in records])):
+            record[ref] = h
+    return [_decode(table, r) for r in records]
+
+
+def _insert_missing(db: Session, table: Table, rows: list[dict]) -> int:
+    if not rows:
+        return 0
+    pk = table.primary_key.columns[0]
+    existing = set(db.execute(select(pk).where(pk.in_([r[pk.key] for r in rows]))).scalars())
+    fresh = [r for r in rows if r[pk.key] not in existing]
+    if fresh:
+        db.execute(insert(table), fresh)
+    return len(fresh)
+
+
+def import_archive(db: Session, path: str) -> int:
+    """Load an archive file back into its table. Rows already present are skipped."""
+    name = os.path.basename(os.path.dirname(path))
+    tables = {t.name: t for t in (Trace.__table__, AuditLog.__table__, SessionMemory.__table__, SessionSummary.__table__)}
+    if name not in tables:
+        raise ValueError(f"Cannot tell which table {path} belongs to (expected <table>/<day>.jsonl.gz)")
+    table = tables[name]
+    audit = AuditLog.__table__
+
+    n = 0
+    rows: list[dict] = []
+    nested: list[dict] = []
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        for line in fh:
+            if not line.strip():
+                continue
+            record = jsoncodec.loads(line)
+            nested.extend(record.pop("audit_logs", None) or [])
+            rows.append(record)
+            if len(rows) >= _BATCH:
+                n += _insert_missing(db, table, _decode_batch(db, table, rows))
+                rows = []
+    n += _insert_missing(db, table, _decode_batch(db, table, rows))
+    # parents first so the audit foreign keys resolve
+    for i in range(0, len(nested), _BATCH):
+        n += _insert_missing(db, audit, _decode_batch(db, audit, nested[i : i + _BATCH]))
+    db.commit()
+    return n
+
+
+def main() -> None:
+    from app.db.session import SessionLocal, engine
+
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("purge", help="archive and drop expired day partitions")
+    p.add_argument("--archive-dir", default=None)
+    p.add_argument("--dry-run", action="store_true", help="only report what would be archived")
+    p.add_argument("--vacuum", action="store_true", help="SQLite: reclaim file space afterwards")
+    i = sub.add_parser("import", help="re-import archive files")
+    i.add_argument("paths", nargs="+")
+    args = ap.parse_args()
+
+    with SessionLocal() as db:
+        if args.cmd == "import":
+            for path in args.paths:
+                print(f"{path}: {import_archive(db, path)} rows imported")
+            return
+
+        results = purge_expired(db, archive_dir=args.archive_dir, dry_run=args.dry_run)
+        for r in results:
+            print(f"{r.table} {r.day}: {r.rows} rows" + (f" -> {r.path}" if r.path else " (dry run)"))
+        if not results:
+            print("Nothing expired.")
+
+    if args.vacuum and not args.dry_run and engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            conn.exec_driver_sql("VACUUM")
+
+
+if __name__ == "__main__":
+    main()
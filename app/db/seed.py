@@ -2,10 +2,10 @@ from __future__ import annotations
 
 import json
 import random
-from decimal import Decimal
 from sqlalchemy.orm import Session
 
 from app.db.models import Account, Product, User
+from app.services.account_cache import account_cache
 
 random.seed(0)
 
@@ -17,6 +17,7 @@ def seed_synthetic_data(db: Session, *, num_users: int = 5, num_products: int =
     db.query(Product).delete()
     db.query(User).delete()
     db.commit()
+    account_cache.clear()
 
     users: list[User] = []
     for i in range(num_users):
@@ -29,9 +30,9 @@ def seed_synthetic_data(db: Session, *, num_users: int = 5, num_products: int =
     db.flush()
 
     for u in users:
-        # balances between 50 and 2000
-        bal = Decimal(str(random.randint(50, 2000))) + Decimal("0.00")
-        db.add(Account(user_id=u.id, balance=bal, currency="USD"))
+        # balances between 50.00 and 2000.00 (minor units)
+        bal_minor = random.randint(50, 2000) * 100
+        db.add(Account(user_id=u.id, balance_minor=bal_minor, currency="USD"))
 
     product_names = [
         ("Laptop Stand", "Ergonomic aluminum stand"),
@@ -45,9 +46,9 @@ def seed_synthetic_data(db: Session, *, num_users: int = 5, num_products: int =
     ]
 
     for name, desc in product_names:
-        price = Decimal(str(random.randint(20, 350))) + Decimal("0.99")
+        price_minor = random.randint(20, 350) * 100 + 99
         inv = random.randint(1, 30)
-        db.add(Product(name=name, description=desc, price=price, currency="USD", inventory_qty=inv, is_active=True))
+        db.add(Product(name=name, description=desc, price_minor=price_minor, currency="USD", inventory_qty=inv, is_active=True))
 
     db.commit()
 
@@ -1,18 +1,39 @@
 from __future__ import annotations
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from app.core.config import settings
+import time
 
-# SQLite needs special connect args for multi-threaded FastAPI usage
-connect_args = {"check_same_thread": False} if settings.database_url.startswith("sqlite") else {}
+from sqlalchemy import event
+from sqlalchemy.orm import Session, sessionmaker
+from app.core import metrics
+from app.core.config import settings
+from app.db.profiles import build_engine
 
-engine = create_engine(
-    settings.database_url,
-    echo=False,  # set True if debugging SQL
-    pool_pre_ping=True,
-    connect_args=connect_args,
-    future=True,
-)
+# Pool sizing, timeouts and SQLite PRAGMAs come from the storage profile (see app/db/profiles.py)
+engine = build_engine(settings.database_url, settings.storage_profile)
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+
+_COMMIT_STARTED = "commit_started"
+
+
+@event.listens_for(Session, "before_commit")
+def _commit_started(session: Session) -> None:
+    if session.in_nested_transaction():
+        return  # savepoint releases are not commits
+    session.info[_COMMIT_STARTED] = time.perf_counter()
+
+
+@event.listens_for(Session, "after_commit")
+def _commit_finished(session: Session) -> None:
+    if session.in_nested_transaction():
+        return
+    started = session.info.pop(_COMMIT_STARTED, None)
+    if started is not None:
+        metrics.db_commit_seconds.observe(time.perf_counter() - started)
+
+
+@event.listens_for(Session, "after_rollback")
+def _commit_abandoned(session: Session) -> None:
+    if session.in_nested_transaction():
+        return
+    session.info.pop(_COMMIT_STARTED, None)
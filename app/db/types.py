@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy import JSON, Text, literal_column
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm.attributes import flag_dirty
+from sqlalchemy.sql.functions import FunctionElement
+
+# Native JSON payload column: JSONB on Postgres, JSON (JSON1 text) on SQLite.
+# Python None is stored as SQL NULL rather than the JSON literal `null`.
+# Values are not mutation-tracked: assign a new dict instead of editing in place.
+JsonPayload = JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql")
+
+
+class json_text(FunctionElement):
+    """
+    Top-level field of a JSON column as text: `col ->> 'key'` on Postgres,
+    `json_extract(col, '$.key')` on SQLite. The key is rendered inline (not as a bound
+    parameter) so queries match expression indexes built from the same construct.
+    """
+    type = Text()
+    name = "json_text"
+    inherit_cache = True
+
+    def __init__(self, column, key: str) -> None:
+        if not key.isidentifier():
+            raise ValueError(f"Unsupported JSON key: {key!r}")
+        super().__init__(column, literal_column(key))
+
+
+def _parts(element, compiler, **kw) -> tuple[str, str]:
+    column, key = element.clauses
+    return compiler.process(column, **kw), key.name
+
+
+@compiles(json_text)
+def _json_text_default(element, compiler, **kw) -> str:
+    column, key = _parts(element, compiler, **kw)
+    return f"json_extract({column}, '$.{key}')"
+
+
+@compiles(json_text, "postgresql")
+def _json_text_postgresql(element, compiler, **kw) -> str:
+    column, key = _parts(element, compiler, **kw)
+    return f"({column} ->> '{key}')"
+
+
+class raw_json(FunctionElement):
+    """
+    A JSON column's stored text, not decoded: the column itself on SQLite (JSON1 stores
+    text), `col::text` on Postgres. Used to pass payloads through to responses verbatim.
+    """
+    type = Text()
+    name = "raw_json"
+    inherit_cache = True
+
+
+@compiles(raw_json)
+def _raw_json_default(element, compiler, **kw) -> str:
+    (column,) = element.clauses
+    return compiler.process(column, **kw)
+
+
+@compiles(raw_json, "postgresql")
+def _raw_json_postgresql(element, compiler, **kw) -> str:
+    (column,) = element.clauses
+    return f"({compiler.process(column, **kw)})::text"
+
+
+class StoredPayload:
+    """
+    Model attribute for a JSON payload kept in the content-addressed `payloads` table, whose
+    hash is held by the mapped column `ref` (see app/db/payloads.py). Reading decodes the
+    payload once per loaded reference; assigning stores the new value on the next flush.
+    Like JsonPayload, values are not mutation-tracked: assign a new dict.
+    """
+
+    def __init__(self, ref: str) -> None:
+        self.ref = ref
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+        # (reference the value was loaded from, or _UNSTORED; decoded value)
+        self.slot = f"_{name}_loaded"
+
+    def __get__(self, obj: Any, owner: type | None = None) -> Any:
+        if obj is None:
+            return self
+        loaded = obj.__dict__.get(self.slot)
+        if loaded is not None and loaded[0] is _UNSTORED:
+            return loaded[1]
+        ref = getattr(obj, self.ref)
+        if loaded is not None and loaded[0] == ref:
+            return loaded[1]
+        from app.db.payloads import load
+
+        value = load(obj, ref)
+        obj.__dict__[self.slot] = (ref, value)
+        return value
+
+    def __set__(self, obj: Any, value: Any) -> None:
+        import app.db.payloads  # noqa: F401  (registers the before_flush hook that stores it)
+
+        obj.__dict__[self.slot] = (_UNSTORED, value)
+        flag_dirty(obj)
+
+    def unstored(self, obj: Any) -> tuple[bool, Any]:
+        """(True, value) if a value was assigned since the last flush."""
+        loaded = obj.__dict__.get(self.slot)
+        if loaded is not None and loaded[0] is _UNSTORED:
+            return True, loaded[1]
+        return False, None
+
+    def stored(self, obj: Any, ref: str | None, value: Any) -> None:
+        setattr(obj, self.ref, ref)
+        obj.__dict__[self.slot] = (ref, value)
+
+
+_UNSTORED = object()
@@ -1,5 +1,16 @@
-from fastapi import FastAPI
-from app.core.logging import configure_logging
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging import configure_logging, stop_logging
+from app.db.deps import get_db
+from app.db.session import SessionLocal
+from app.services import warmup
+from app.services.velocity import velocity
 from app.api.routes_chat import router as chat_router
 from app.api.routes_admin import router as admin_router
 from app.api.routes_logs import router as logs_router
@@ -14,13 +25,37 @@ from app.api.routes_observability import router as observability_router
 from app.api.routes_ui_timeline import router as ui_timeline_router
 from app.api.routes_ui_audit import router as ui_audit_router
 from app.api.routes_ui_users import router as ui_users_router
+from app.api.routes_ui_latency import router as ui_latency_router
+from app.api.routes_export import router as export_router
+from app.api.routes_metrics import RouteTimingMiddleware, router as metrics_router
+from app.api.compression import CompressionMiddleware
 
-configure_logging()
 from fastapi.middleware.cors import CORSMiddleware
 
+logger = logging.getLogger(__name__)
+
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_logging()
+    # Velocity counters live in memory; replay the last 24h of transactions into them.
+    db = SessionLocal()
+    try:
+        n = velocity.rebuild(db)
+        logger.info("Velocity counters rebuilt from %d transactions", n)
+    except Exception:
+        logger.exception("Velocity rebuild failed; limits start from empty counters")
+    finally:
+        db.close()
+    if settings.warmup_enabled:
+        warmup.start(SessionLocal, extra=[("openapi", app.openapi)])
+    else:
+        warmup.readiness.state = "ready"
+    yield
+    stop_logging()
 
-app = FastAPI(title="SentinelFlow", version="0.1.0")
+
+app = FastAPI(title="SentinelFlow", version="0.1.0", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -31,6 +66,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware)
+# outermost: request timings include compression
+app.add_middleware(RouteTimingMiddleware)
 app.include_router(chat_router)
 app.include_router(admin_router)
 app.include_router(logs_router)
@@ -45,7 +83,23 @@ app.include_router(observability_router)
 app.include_router(ui_timeline_router)
 app.include_router(ui_audit_router)
 app.include_router(ui_users_router)
+app.include_router(ui_latency_router)
+app.include_router(export_router)
+app.include_router(metrics_router)
 
 @app.get("/health")
 def health():
     return {"status": "ok"}
+
+
+@app.get("/ready")
+def ready(db: Session = Depends(get_db)):
+    # liveness is /health; this is "warmed up and the database answers"
+    body = warmup.readiness.as_dict()
+    if not warmup.readiness.ready:
+        return JSONResponse(body, status_code=503)
+    try:
+        warmup.ping(db)
+    except Exception as e:
+        return JSONResponse({**body, "state": "db_unavailable", "error": str(e)}, status_code=503)
+    return body
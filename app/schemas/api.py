@@ -1,10 +1,18 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any, Optional, List
+from typing import Any, Generic, Optional, List, TypeVar
 
 from pydantic import BaseModel
 
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """One keyset page; pass next_cursor back as ?cursor= for the next one (None: last page)."""
+    items: List[T]
+    next_cursor: str | None = None
+
 
 class UserOut(BaseModel):
     id: str
@@ -14,8 +22,10 @@ class UserOut(BaseModel):
 
 class SessionOut(BaseModel):
     session_id: str
+    user_id: str | None = None
     last_message_at: datetime | None = None
     last_user_message: str | None = None
+    turns: int = 0
 
 
 
@@ -24,7 +34,7 @@ class TraceOut(BaseModel):
     session_id: str
     user_message: str
     assistant_message: Optional[str]
-    plan_json: Optional[str]
+    plan_json: Optional[Any]
     created_at: datetime
 
 
@@ -33,7 +43,7 @@ class AuditLogOut(BaseModel):
     trace_id: str
     tool_name: str
     status: str
-    input_json: Optional[str]
-    output_json: Optional[str]
+    input_json: Optional[Any]
+    output_json: Optional[Any]
     error_message: Optional[str]
     created_at: datetime
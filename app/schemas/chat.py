@@ -15,3 +15,25 @@ class ChatResponse(BaseModel):
     message: str
     needs_confirmation: bool = False
     confirmation_token: str | None = None
+
+
+class ChatBatchRequest(BaseModel):
+    # turns of one session run in list order; different sessions run concurrently
+    items: list[ChatRequest] = Field(..., min_length=1, max_length=1000)
+
+
+class ChatBatchItem(BaseModel):
+    index: int
+    session_id: str
+    ok: bool
+    status_code: int  # what /chat would have answered: 200, 429/503 from admission, or 500
+    response: ChatResponse | None = None
+    error: str | None = None
+    duration_ms: float
+
+
+class ChatBatchResponse(BaseModel):
+    items: list[ChatBatchItem]
+    sessions: int
+    workers: int
+    duration_ms: float
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Any
+
 from pydantic import BaseModel
 
 
@@ -10,13 +12,13 @@ class TraceCreate(BaseModel):
 
 class TraceUpdate(BaseModel):
     assistant_message: str | None = None
-    plan_json: str | None = None
+    plan_json: Any | None = None
 
 
 class AuditEvent(BaseModel):
     trace_id: str
     tool_name: str
     status: str
-    input_json: str | None = None
-    output_json: str | None = None
+    input_json: Any | None = None
+    output_json: Any | None = None
     error_message: str | None = None
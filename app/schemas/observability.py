@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Any
+
 from pydantic import BaseModel
 
 
@@ -9,7 +11,7 @@ class TraceOut(BaseModel):
     session_id: str
     user_message: str
     assistant_message: str | None
-    plan_json: str | None
+    plan_json: Any | None
     created_at: datetime
 
 
@@ -18,7 +20,7 @@ class AuditLogOut(BaseModel):
     trace_id: str
     tool_name: str
     status: str
-    input_json: str | None
-    output_json: str | None
+    input_json: Any | None
+    output_json: Any | None
     error_message: str | None
     created_at: datetime
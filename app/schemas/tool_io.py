@@ -1,16 +1,32 @@
 from __future__ import annotations
 
-from pydantic import BaseModel, Field, conint, condecimal
+from decimal import Decimal
 
+from pydantic import BaseModel, Field, conint, condecimal, model_validator
 
-Money = condecimal(max_digits=12, decimal_places=2)
+from app.utils.money import exponent
+
+# decimal places depend on the currency (2 for USD, 0 for JPY, 3 for KWD): see _MoneyOut
+Money = condecimal(max_digits=15)
+
+
+class _MoneyOut(BaseModel):
+    """Checks every Money field against the model's `currency` exponent."""
+
+    @model_validator(mode="after")
+    def _check_places(self):
+        places = exponent(self.currency)
+        for name, value in self:
+            if isinstance(value, Decimal) and -value.as_tuple().exponent > places:
+                raise ValueError(f"{name} has more than {places} decimal places for {self.currency}")
+        return self
 
 
 class CheckBalanceIn(BaseModel):
     user_id: str = Field(..., min_length=1)
 
 
-class CheckBalanceOut(BaseModel):
+class CheckBalanceOut(_MoneyOut):
     user_id: str
     balance: Money
     currency: str
@@ -24,7 +40,7 @@ class ExecutePurchaseIn(BaseModel):
     confirm: bool = False  # must be True for actual execution
 
 
-class ExecutePurchaseOut(BaseModel):
+class ExecutePurchaseOut(_MoneyOut):
     transaction_id: str
     status: str
     total_amount: Money
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import Account
+
+# user_ids whose balance changed inside a session that has not committed yet
+_PENDING_KEY = "account_cache_pending"
+
+
+@dataclass(frozen=True)
+class AccountSnapshot:
+    user_id: str
+    balance_minor: int
+    currency: str
+    fetched_at: float
+
+
+class AccountSnapshotCache:
+    """
+    Short-TTL, per-user account snapshots shared by check_balance and the policy engine.
+
+    A generation counter per user prevents a slow reader from re-populating the cache
+    with a balance that was invalidated while it was reading.
+    """
+
+    def __init__(self, ttl_s: float) -> None:
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._entries: dict[str, AccountSnapshot] = {}
+        self._generations: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.invalidations = 0
+
+    def get(self, user_id: str) -> AccountSnapshot | None:
+        with self._lock:
+            snap = self._entries.get(user_id)
+            if snap is not None and time.monotonic() - snap.fetched_at <= self.ttl_s:
+                self.hits += 1
+                return snap
+            if snap is not None:
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+
+    def record_bypass(self) -> None:
+        with self._lock:
+            self.bypasses += 1
+
+    def generation(self, user_id: str) -> int:
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def put(self, snap: AccountSnapshot, *, generation: int) -> None:
+        with self._lock:
+            if self._generations.get(snap.user_id, 0) != generation:
+                return  # invalidated while we were reading; don't cache a stale value
+            self._entries[snap.user_id] = snap
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            self._entries.pop(user_id, None)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            for user_id in self._entries:
+                self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "ttl_s": self.ttl_s,
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypasses": self.bypasses,
+                "invalidations": self.invalidations,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
+
+
+account_cache = AccountSnapshotCache(ttl_s=settings.account_cache_ttl_s)
+
+
+def mark_balance_changed(db: Session, user_id: str) -> None:
+    """
+    Invalidate now, and again once the surrounding transaction ends, so readers
+    never keep a value from before the change (or an uncommitted one).
+    """
+    account_cache.invalidate(user_id)
+    db.info.setdefault(_PENDING_KEY, set()).add(user_id)
+
+
+def has_pending_change(db: Session, user_id: str) -> bool:
+    return user_id in db.info.get(_PENDING_KEY, ())
+
+
+@event.listens_for(Session, "after_flush")
+def _track_account_writes(session: Session, flush_context) -> None:
+    # Catch balance changes made through the ORM outside accounts.debit (admin edits, seeding).
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Account) and obj.user_id:
+            mark_balance_changed(session, obj.user_id)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _flush_invalidations(session: Session) -> None:
+    if session.in_nested_transaction():
+        return  # a savepoint; the enclosing transaction has not ended
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        account_cache.invalidate(user_id)
@@ -1,9 +1,17 @@
 from __future__ import annotations
 
-from decimal import Decimal
+import time
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.db.models import Account
+from app.services.account_cache import (
+    AccountSnapshot,
+    account_cache,
+    has_pending_change,
+    mark_balance_changed,
+)
 
 
 class AccountNotFound(Exception):
@@ -17,18 +25,45 @@ def get_account(db: Session, user_id: str) -> Account:
     return acct
 
 
-def get_balance(db: Session, user_id: str) -> tuple[Decimal, str]:
-    acct = get_account(db, user_id)
-    return Decimal(acct.balance), acct.currency
+def get_snapshot(db: Session, user_id: str, *, consistent: bool = False) -> AccountSnapshot:
+    """
+    Cached account read. `consistent=True` always goes to the database (use it right
+    before money moves); sessions with uncommitted balance changes also bypass the cache.
+    """
+    if consistent or not settings.account_cache_enabled or has_pending_change(db, user_id):
+        account_cache.record_bypass()
+        acct = get_account(db, user_id)
+        return AccountSnapshot(user_id, acct.balance_minor, acct.currency, time.monotonic())
 
+    snap = account_cache.get(user_id)
+    if snap is not None:
+        return snap
 
-def debit(db: Session, user_id: str, amount: Decimal) -> tuple[Decimal, str]:
+    generation = account_cache.generation(user_id)
     acct = get_account(db, user_id)
-    bal = Decimal(acct.balance)
-    if amount <= Decimal("0"):
+    snap = AccountSnapshot(user_id, acct.balance_minor, acct.currency, time.monotonic())
+    account_cache.put(snap, generation=generation)
+    return snap
+
+
+def get_balance(db: Session, user_id: str, *, consistent: bool = False) -> tuple[int, str]:
+    """Balance in integer minor units, plus currency."""
+    snap = get_snapshot(db, user_id, consistent=consistent)
+    return snap.balance_minor, snap.currency
+
+
+def debit(db: Session, user_id: str, amount_minor: int) -> tuple[int, str]:
+    if amount_minor <= 0:
         raise ValueError("amount must be > 0")
-    if bal < amount:
+    # Single conditional UPDATE: the funds check and the write can't interleave with another debit.
+    row = db.execute(
+        update(Account)
+        .where(Account.user_id == user_id, Account.balance_minor >= amount_minor)
+        .values(balance_minor=Account.balance_minor - amount_minor)
+        .returning(Account.balance_minor, Account.currency)
+    ).one_or_none()
+    if row is None:
+        get_account(db, user_id)  # raises AccountNotFound if there is no account
         raise ValueError("insufficient_funds")
-    acct.balance = bal - amount
-    db.flush()
-    return Decimal(acct.balance), acct.currency
+    mark_balance_changed(db, user_id)
+    return row.balance_minor, row.currency
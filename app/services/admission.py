@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+
+from app.agent.llm_planner import heuristic_only
+from app.agent.types import TurnClass
+from app.core.config import settings
+from app.services.scheduler import WeightedFairQueue, turn_weights
+
+
+class AdmissionRejected(Exception):
+    """A turn refused at the door: 429 (caller over its rate) or 503 (service saturated)."""
+
+    def __init__(self, status_code: int, detail: str, retry_after_s: float) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after_s = retry_after_s
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {"Retry-After": str(max(1, math.ceil(self.retry_after_s)))}
+
+
+class _TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, burst: float, now: float) -> None:
+        self.tokens = burst
+        self.updated = now
+
+
+class _Waiter:
+    __slots__ = ("event", "granted")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.granted = False
+
+
+class Admission:
+    """A granted slot. Entering it runs the turn (degraded turns plan heuristically); exiting frees it."""
+
+    def __init__(self, controller: AdmissionController | None, degraded: bool) -> None:
+        self._controller = controller
+        self.degraded = degraded
+        self._token = None
+        self._started = 0.0
+
+    def __enter__(self) -> Admission:
+        self._started = time.monotonic()
+        if self.degraded:
+            self._token = heuristic_only.set(True)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._token is not None:
+            heuristic_only.reset(self._token)
+        if self._controller is not None:
+            self._controller._release(time.monotonic() - self._started)
+
+
+class AdmissionController:
+    """
+    Front door for chat turns, so a slow LLM provider degrades /chat instead of collapsing it.
+
+    - at most `max_concurrent` turns run; up to `max_queue` more wait, and a freed slot goes to
+      the waiter the scheduler picks by turn class (see scheduler.WeightedFairQueue)
+    - a turn whose estimated wait (turns ahead of it x smoothed turn time) exceeds `max_wait_s`
+      is turned away immediately with 503 rather than after timing out; one that is admitted
+      to the queue but not served within `max_wait_s` gets 503 too
+    - each caller (user_id, else session_id) has a token bucket: `rate` turns/s, `burst` deep;
+      an empty bucket is a 429
+    - while `degrade_depth` or more turns are queued, newly admitted turns skip the LLM
+      planner (see llm_planner.heuristic_only), which drains the queue quickly
+
+    Routes call screen() when a request arrives and admit() once the turn is next in its
+    session lane, so turns waiting behind their own session hold no slot.
+    """
+
+    def __init__(
+        self,
+        *,
+        enabled: bool,
+        max_concurrent: int,
+        max_queue: int,
+        max_wait_s: float,
+        degrade_depth: int,
+        rate: float,
+        burst: float,
+        weights: dict[TurnClass, float],
+        starvation_s: float,
+    ) -> None:
+        self.enabled = enabled
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait_s = max_wait_s
+        self.degrade_depth = degrade_depth
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._running = 0
+        self._queue: WeightedFairQueue[_Waiter] = WeightedFairQueue(weights, starvation_s)
+        self._buckets: dict[str, _TokenBucket] = {}
+        self._last_sweep = time.monotonic()
+        self._turn_s = 0.0  # EWMA of turn duration
+        self.admitted = 0
+        self.queued = 0
+        self.degraded = 0
+        self.rejected_rate = 0
+        self.rejected_full = 0
+        self.rejected_deadline = 0
+        self.timed_out = 0
+
+    def screen(self, key: str | None, turn_class: TurnClass = TurnClass.planned) -> None:
+        """
+        Refuse a turn at the door, without taking a slot: 429 if `key` is over its rate, 503 if
+        the turn could not be served in time right now. admit() takes the slot later.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if key is not None:
+                self._take_token(key)
+            if self._running >= self.max_concurrent or self._queue:
+                self._check_queue(turn_class)
+
+    def admit(self, key: str | None, turn_class: TurnClass = TurnClass.planned) -> Admission:
+        """Wait for a slot (bounded), or raise AdmissionRejected. `key=None` skips the rate limit."""
+        if not self.enabled:
+            return Admission(None, degraded=False)
+        with self._lock:
+            if key is not None:
+                self._take_token(key)
+            if self._running < self.max_concurrent and not self._queue:
+                self._running += 1
+                self.admitted += 1
+                return Admission(self, degraded=False)
+            self._check_queue(turn_class)
+            waiter = _Waiter()
+            self._queue.push(turn_class, waiter)
+            self.queued += 1
+
+        waiter.event.wait(self.max_wait_s)
+        with self._lock:
+            if not waiter.granted:
+                self._queue.remove(waiter)
+                self.timed_out += 1
+                raise AdmissionRejected(503, "Server busy; try again shortly.", self._estimate(len(self._queue)))
+            self.admitted += 1
+            degraded = len(self._queue) >= self.degrade_depth
+            self.degraded += degraded
+            return Admission(self, degraded=degraded)
+
+    def _check_queue(self, turn_class: TurnClass) -> None:
+        # caller holds self._lock; a turn that would have to queue must fit, and in time
+        if len(self._queue) >= self.max_queue:
+            self.rejected_full += 1
+            raise AdmissionRejected(503, "Server busy; try again shortly.", self._estimate(len(self._queue)))
+        expected = self._estimate(self._queue.ahead_of(turn_class))
+        if expected > self.max_wait_s:
+            self.rejected_deadline += 1
+            raise AdmissionRejected(503, "Server busy; try again shortly.", expected)
+
+    def _estimate(self, ahead: float) -> float:
+        # seconds until a turn with `ahead` turns queued before it gets a slot
+        return (ahead + 1) * self._turn_s / self.max_concurrent
+
+    def _take_token(self, key: str) -> None:
+        # caller holds self._lock
+        now = time.monotonic()
+        self._sweep(now)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _TokenBucket(self.burst, now)
+        bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+        bucket.updated = now
+        if bucket.tokens < 1:
+            self.rejected_rate += 1
+            raise AdmissionRejected(429, "Too many requests.", (1 - bucket.tokens) / self.rate)
+        bucket.tokens -= 1
+
+    def _sweep(self, now: float) -> None:
+        # drop buckets that have refilled completely; they are equivalent to a new one
+        full_after = self.burst / self.rate
+        if now - self._last_sweep < full_after:
+            return
+        self._last_sweep = now
+        for key in [k for k, b in self._buckets.items() if now - b.updated >= full_after]:
+            del self._buckets[key]
+
+    def _release(self, duration_s: float) -> None:
+        with self._lock:
+            self._turn_s = duration_s if not self._turn_s else 0.8 * self._turn_s + 0.2 * duration_s
+            if self._queue:
+                # hand the slot straight to the next waiter
+                waiter = self._queue.pop()
+                waiter.granted = True
+                waiter.event.set()
+            else:
+                self._running -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "running": self._running,
+                "queued_now": len(self._queue),
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "max_wait_s": self.max_wait_s,
+                "avg_turn_ms": self._turn_s * 1000,
+                "degrade_depth": self.degrade_depth,
+                "admitted": self.admitted,
+                "queued": self.queued,
+                "degraded": self.degraded,
+                "rejected_rate": self.rejected_rate,
+                "rejected_full": self.rejected_full,
+                "rejected_deadline": self.rejected_deadline,
+                "timed_out": self.timed_out,
+                "tracked_callers": len(self._buckets),
+                "classes": self._queue.stats(),
+            }
+
+
+admission = AdmissionController(
+    enabled=settings.admission_enabled,
+    max_concurrent=settings.admission_max_concurrent,
+    max_queue=settings.admission_max_queue,
+    max_wait_s=settings.admission_max_wait_s,
+    degrade_depth=settings.admission_degrade_depth,
+    rate=settings.chat_rate_per_user_s,
+    burst=settings.chat_burst_per_user,
+    weights=turn_weights(),
+    starvation_s=settings.sched_starvation_s,
+)
@@ -0,0 +1,149 @@
+"""
+Streaming NDJSON exports of traces, audit logs and transactions.
+
+Rows are read through a server-side cursor (yield_per) and encoded one line at a time,
+optionally through a streaming gzip compressor, so memory stays flat whatever the size of
+the export. Deduplicated payloads (plans, tool outputs) are written inline, as their stored
+JSON text. Served by GET /export/{kind}, and from the command line:
+
+  poetry run python -m app.services.export audit_logs --since 2026-01-01 --tool execute_purchase -o audit.ndjson.gz
+  poetry run python -m app.services.export traces --session-id demo-2 > demo-2.ndjson
+
+On PostgreSQL a slow reader holds a transaction open; keep
+PG_IDLE_IN_TRANSACTION_TIMEOUT_MS above the time a client may stall between reads.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterable, Iterator
+
+from sqlalchemy import Select, Table, select
+from sqlalchemy.orm import Session
+
+from app.db import payloads
+from app.db.models import AuditLog, Trace, Transaction
+from app.utils import jsoncodec
+
+KINDS: dict[str, Table] = {
+    "traces": Trace.__table__,
+    "audit_logs": AuditLog.__table__,
+    "transactions": Transaction.__table__,
+}
+
+_BATCH = 1000
+_CHUNK_BYTES = 64 * 1024
+
+
+@dataclass(frozen=True)
+class ExportFilter:
+    since: datetime | None = None  # inclusive
+    until: datetime | None = None  # exclusive
+    session_id: str | None = None  # traces, audit_logs
+    tool_name: str | None = None  # audit_logs
+
+
+def _utc(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc) if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def export_query(kind: str, f: ExportFilter) -> Select:
+    """SELECT for one export, oldest first. Raises ValueError for unknown kinds or filters."""
+    if kind not in KINDS:
+        raise ValueError(f"Unknown export {kind!r}; expected one of {', '.join(KINDS)}")
+    if f.session_id and kind == "transactions":
+        raise ValueError("session_id does not apply to transactions")
+    if f.tool_name and kind != "audit_logs":
+        raise ValueError("tool_name only applies to audit_logs")
+
+    table = KINDS[kind]
+    stmt = select(table)
+    if f.since:
+        stmt = stmt.where(table.c.created_at >= _utc(f.since))
+    if f.until:
+        stmt = stmt.where(table.c.created_at < _utc(f.until))
+    if f.session_id and kind == "traces":
+        stmt = stmt.where(table.c.session_id == f.session_id)
+    if f.session_id and kind == "audit_logs":
+        stmt = stmt.where(table.c.trace_id.in_(select(Trace.id).where(Trace.session_id == f.session_id)))
+    if f.tool_name:
+        stmt = stmt.where(table.c.tool_name == f.tool_name)
+    # every filter above has an index ending in created_at, so this order needs no sort
+    return stmt.order_by(table.c.created_at)
+
+
+def iter_records(db: Session, kind: str, stmt: Select) -> Iterator[dict]:
+    result = db.execute(stmt.execution_options(yield_per=_BATCH))
+    # payload references become the payload itself, fetched once per batch
+    yield from payloads.inline(db, KINDS[kind].name, (dict(row._mapping) for row in result), batch=_BATCH)
+
+
+def iter_ndjson(records: Iterable[dict], *, compress: bool = False) -> Iterator[bytes]:
+    """Encode records as NDJSON, yielding ~64 KiB chunks (gzip members if `compress`)."""
+    gz = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None  # wbits 31: gzip container
+    buf: list[bytes] = []
+    size = 0
+    for record in records:
+        line = (jsoncodec.dumps_with_raw(record) + "\n").encode()
+        buf.append(line)
+        size += len(line)
+        if size >= _CHUNK_BYTES:
+            chunk = b"".join(buf)
+            buf, size = [], 0
+            if gz is not None:
+                chunk = gz.compress(chunk)
+            if chunk:
+                yield chunk
+    chunk = b"".join(buf)
+    if gz is not None:
+        chunk = gz.compress(chunk) + gz.flush()
+    if chunk:
+        yield chunk
+
+
+def main() -> None:
+    from app.db.session import SessionLocal
+
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("kind", choices=sorted(KINDS))
+    ap.add_argument("--since", type=datetime.fromisoformat, default=None)
+    ap.add_argument("--until", type=datetime.fromisoformat, default=None)
+    ap.add_argument("--session-id", default=None)
+    ap.add_argument("--tool", default=None, help="audit_logs only")
+    ap.add_argument("-o", "--output", default=None, help="file to write (default: stdout); .gz implies --gzip")
+    ap.add_argument("--gzip", action="store_true")
+    args = ap.parse_args()
+
+    f = ExportFilter(since=args.since, until=args.until, session_id=args.session_id, tool_name=args.tool)
+    try:
+        stmt = export_query(args.kind, f)
+    except ValueError as e:
+        ap.error(str(e))
+    compress = args.gzip or bool(args.output and args.output.endswith(".gz"))
+
+    n = 0
+
+    def counted(records: Iterable[dict]) -> Iterator[dict]:
+        nonlocal n
+        for r in records:
+            n += 1
+            yield r
+
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        with SessionLocal() as db:
+            for chunk in iter_ndjson(counted(iter_records(db, args.kind, stmt)), compress=compress):
+                out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+        else:
+            out.flush()
+    print(f"{n} {args.kind} rows exported", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
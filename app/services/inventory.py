@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from decimal import Decimal
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
 from app.db.models import Product
@@ -17,18 +17,23 @@ def get_product(db: Session, product_id: str) -> Product:
     return p
 
 
-def check_available(db: Session, product_id: str, qty: int) -> tuple[Decimal, str]:
+def check_available(db: Session, product_id: str, qty: int) -> tuple[int, str]:
+    """Returns (unit price in minor units, currency)."""
     p = get_product(db, product_id)
     if qty <= 0:
         raise ValueError("qty must be >= 1")
     if p.inventory_qty < qty:
         raise ValueError("out_of_stock")
-    return Decimal(p.price), p.currency
+    return p.price_minor, p.currency
 
 
 def reserve(db: Session, product_id: str, qty: int) -> None:
-    p = get_product(db, product_id)
-    if p.inventory_qty < qty:
+    # Single conditional UPDATE: concurrent buyers can't both pass a stale stock check.
+    res = db.execute(
+        update(Product)
+        .where(Product.id == product_id, Product.is_active == True, Product.inventory_qty >= qty)  # noqa: E712
+        .values(inventory_qty=Product.inventory_qty - qty)
+    )
+    if res.rowcount != 1:
+        get_product(db, product_id)  # raises ProductNotFound if it's missing/inactive
         raise ValueError("out_of_stock")
-    p.inventory_qty -= qty
-    db.flush()
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-import json
-from decimal import Decimal
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.db.models import Transaction, TransactionStatus
+from app.db.profiles import savepoint
 from app.services.accounts import debit
 from app.services.inventory import check_available, reserve
+from app.services.velocity import hold, velocity
 
 
 class DuplicateIdempotency(Exception):
@@ -34,26 +36,48 @@ def execute_purchase(
     if existing:
         return existing
 
-    unit_price, currency = check_available(db, product_id, qty)
-    total = (unit_price * Decimal(qty)).quantize(Decimal("0.01"))
+    unit_price_minor, currency = check_available(db, product_id, qty)
+    total_minor = unit_price_minor * qty
 
-    # Reserve inventory first (in real life you might do more robust locking)
-    reserve(db, product_id, qty)
-
-    # Debit account
-    remaining_balance, _ = debit(db, user_id, total)
+    # Re-check velocity limits at execution time (confirmations can arrive long after planning),
+    # counting this purchase in the same step; the session releases it if it rolls back
+    reservation = None
+    if settings.velocity_limits_enabled:
+        v, reservation = velocity.reserve(user_id, total_minor, currency)
+        if not v.allowed:
+            raise ValueError(v.reason)
+        hold(db, reservation)
 
     tx = Transaction(
         user_id=user_id,
         product_id=product_id,
         qty=qty,
-        unit_price=unit_price,
-        total_amount=total,
+        unit_price_minor=unit_price_minor,
+        total_amount_minor=total_minor,
         currency=currency,
         status=TransactionStatus.confirmed,
         idempotency_key=idempotency_key,
-        metadata_json=json.dumps({"remaining_balance": str(remaining_balance)}),
     )
-    db.add(tx)
-    db.flush()
+    if reservation is not None:
+        reservation.tx = tx  # counted already; not again when it commits
+    try:
+        # Stock, debit and insert share one savepoint: if any fails, only they are undone,
+        # not whatever else the caller has pending in this session
+        with savepoint(db):
+            # Reserve inventory first (atomic conditional update; see inventory.reserve)
+            reserve(db, product_id, qty)
+
+            # Debit account
+            remaining_minor, _ = debit(db, user_id, total_minor)
+            tx.metadata_json = {"remaining_balance_minor": remaining_minor}
+            db.add(tx)
+    except Exception as e:
+        if reservation is not None:
+            velocity.release(reservation)  # rejected, or a duplicate of a committed purchase
+        if isinstance(e, IntegrityError):
+            # a concurrent request with the same idempotency key won the race: return the winner
+            existing = _existing_tx(db, user_id, idempotency_key)
+            if existing:
+                return existing
+        raise
     return tx
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import itertools
+import math
+import time
+from collections import deque
+from typing import Generic, TypeVar
+
+from app.agent.types import TurnClass
+from app.core.config import settings
+
+T = TypeVar("T")
+
+
+class _Entry(Generic[T]):
+    __slots__ = ("item", "start", "finish", "enqueued", "seq")
+
+    def __init__(self, item: T, start: float, finish: float, enqueued: float, seq: int) -> None:
+        self.item = item
+        self.start = start
+        self.finish = finish
+        self.enqueued = enqueued
+        self.seq = seq
+
+
+class _ClassStats:
+    __slots__ = ("served", "wait_s_total", "max_wait_s", "removed", "promoted")
+
+    def __init__(self) -> None:
+        self.served = 0
+        self.wait_s_total = 0.0
+        self.max_wait_s = 0.0
+        self.removed = 0  # left the queue without being served (timed out)
+        self.promoted = 0  # served out of fair order by the starvation guard
+
+
+class WeightedFairQueue(Generic[T]):
+    """
+    Waiting chat turns, one FIFO per TurnClass, served by start-time fair queuing: while
+    several classes are backlogged each gets a share of slots proportional to its weight, so
+    confirmations and option picks overtake a backlog of LLM-planned turns without shutting
+    it out. A backlogged class that has gone `starvation_s` without a slot is served next
+    regardless, which caps the guard at one promotion per class and window: under a backlog
+    older than `starvation_s` the weights still decide, instead of collapsing into FIFO.
+
+    Not thread-safe; the admission controller calls it under its own lock.
+    """
+
+    def __init__(self, weights: dict[TurnClass, float], starvation_s: float) -> None:
+        self.weights = weights
+        self.starvation_s = starvation_s
+        self._queues: dict[TurnClass, deque[_Entry[T]]] = {c: deque() for c in TurnClass}
+        self._last_finish = {c: 0.0 for c in TurnClass}
+        self._last_served = {c: 0.0 for c in TurnClass}  # or when the class became backlogged
+        self._vtime = 0.0
+        self._seq = itertools.count()
+        self._stats = {c: _ClassStats() for c in TurnClass}
+
+    def __len__(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def push(self, cls: TurnClass, item: T) -> None:
+        start = max(self._vtime, self._last_finish[cls])
+        finish = start + 1.0 / self.weights[cls]
+        self._last_finish[cls] = finish
+        now = time.monotonic()
+        if not self._queues[cls]:
+            self._last_served[cls] = now
+        self._queues[cls].append(_Entry(item, start, finish, now, next(self._seq)))
+
+    def pop(self) -> T | None:
+        heads = [(c, q[0]) for c, q in self._queues.items() if q]
+        if not heads:
+            return None
+        now = time.monotonic()
+        starving = [h for h in heads if now - self._last_served[h[0]] >= self.starvation_s]
+        if starving:
+            cls, entry = min(starving, key=lambda h: self._last_served[h[0]])
+            self._stats[cls].promoted += 1
+        else:
+            cls, entry = min(heads, key=lambda h: (h[1].start, h[1].seq))
+        self._queues[cls].popleft()
+        self._last_served[cls] = now
+        self._vtime = max(self._vtime, entry.start)
+        st = self._stats[cls]
+        waited = now - entry.enqueued
+        st.served += 1
+        st.wait_s_total += waited
+        st.max_wait_s = max(st.max_wait_s, waited)
+        return entry.item
+
+    def remove(self, item: T) -> bool:
+        for cls, q in self._queues.items():
+            for entry in q:
+                if entry.item is item:
+                    q.remove(entry)
+                    self._stats[cls].removed += 1
+                    return True
+        return False
+
+    def ahead_of(self, cls: TurnClass) -> float:
+        """Roughly how many queued turns would be served before a new `cls` turn."""
+        own = len(self._queues[cls])
+        ahead = float(own)
+        for other, q in self._queues.items():
+            if other is not cls and q:
+                ahead += min(len(q), math.ceil((own + 1) * self.weights[other] / self.weights[cls]))
+        return ahead
+
+    def stats(self) -> dict:
+        out = {}
+        for cls in TurnClass:
+            st = self._stats[cls]
+            out[cls.value] = {
+                "weight": self.weights[cls],
+                "queued_now": len(self._queues[cls]),
+                "served": st.served,
+                "avg_wait_ms": (st.wait_s_total / st.served * 1000) if st.served else 0.0,
+                "max_wait_ms": st.max_wait_s * 1000,
+                "timed_out": st.removed,
+                "promoted": st.promoted,
+            }
+        return out
+
+
+def turn_weights() -> dict[TurnClass, float]:
+    return {
+        TurnClass.confirmation: settings.sched_weight_confirmation,
+        TurnClass.selection: settings.sched_weight_selection,
+        TurnClass.read_only: settings.sched_weight_read_only,
+        TurnClass.planned: settings.sched_weight_planned,
+    }
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from app.core.config import settings
+
+
+class _Lane:
+    __slots__ = ("cond", "next_ticket", "serving", "last_used", "turns")
+
+    def __init__(self, lock: threading.Lock) -> None:
+        self.cond = threading.Condition(lock)
+        self.next_ticket = 0  # tickets handed out
+        self.serving = 0  # ticket currently allowed to run
+        self.last_used = time.monotonic()
+        self.turns = 0
+
+    @property
+    def depth(self) -> int:
+        # running turn + turns queued behind it
+        return self.next_ticket - self.serving
+
+
+class SessionLanes:
+    """
+    One execution lane per session_id: turns of a session run one at a time, in arrival
+    order (a ticket queue), while different sessions run in parallel. This is what keeps
+    session memory's read-modify-write (candidates, pending confirmations) consistent.
+
+    Lanes are created on demand and evicted once idle for `idle_s`. Serialization is
+    per process; several server processes each keep their own lanes.
+    """
+
+    def __init__(self, idle_s: float) -> None:
+        self.idle_s = idle_s
+        self._lock = threading.Lock()
+        self._lanes: dict[str, _Lane] = {}
+        self._last_sweep = time.monotonic()
+        self.turns = 0
+        self.queued = 0  # turns that had to wait for their lane
+        self.wait_s_total = 0.0
+        self.max_wait_s = 0.0
+        self.max_depth = 0
+        self.evictions = 0
+
+    @contextmanager
+    def lane(self, session_id: str) -> Iterator[None]:
+        with self._lock:
+            self._sweep()
+            ln = self._lanes.get(session_id)
+            if ln is None:
+                ln = self._lanes[session_id] = _Lane(self._lock)
+            ticket = ln.next_ticket
+            ln.next_ticket += 1
+            self.max_depth = max(self.max_depth, ln.depth)
+            started = time.monotonic()
+            if ln.serving != ticket:
+                self.queued += 1
+                ln.cond.wait_for(lambda: ln.serving == ticket)
+            waited = time.monotonic() - started
+            self.turns += 1
+            self.wait_s_total += waited
+            self.max_wait_s = max(self.max_wait_s, waited)
+        try:
+            yield
+        finally:
+            with self._lock:
+                ln.serving += 1
+                ln.turns += 1
+                ln.last_used = time.monotonic()
+                ln.cond.notify_all()
+
+    def _sweep(self) -> None:
+        # caller holds self._lock; at most one pass per idle period
+        now = time.monotonic()
+        if now - self._last_sweep < self.idle_s:
+            return
+        self._last_sweep = now
+        idle = [sid for sid, ln in self._lanes.items() if ln.depth == 0 and now - ln.last_used >= self.idle_s]
+        for sid in idle:
+            del self._lanes[sid]
+        self.evictions += len(idle)
+
+    def depth(self, session_id: str) -> int:
+        with self._lock:
+            ln = self._lanes.get(session_id)
+            return ln.depth if ln is not None else 0
+
+    def stats(self, top: int = 10) -> dict:
+        with self._lock:
+            busy = sorted(
+                ((sid, ln.depth) for sid, ln in self._lanes.items() if ln.depth),
+                key=lambda x: x[1],
+                reverse=True,
+            )
+            return {
+                "lanes": len(self._lanes),
+                "busy_lanes": len(busy),
+                "queued_now": sum(d - 1 for _, d in busy),
+                "deepest": [{"session_id": sid, "depth": d} for sid, d in busy[:top]],
+                "idle_s": self.idle_s,
+                "turns": self.turns,
+                "queued": self.queued,
+                "avg_wait_ms": (self.wait_s_total / self.turns * 1000) if self.turns else 0.0,
+                "max_wait_ms": self.max_wait_s * 1000,
+                "max_depth": self.max_depth,
+                "evictions": self.evictions,
+            }
+
+
+session_lanes = SessionLanes(idle_s=settings.session_lane_idle_s)
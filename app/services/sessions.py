@@ -0,0 +1,149 @@
+"""
+Per-session summary rows (the `sessions` table).
+
+record_turn() is called by create_trace before it commits, so the summary and the trace land
+in one transaction. Any ORM flush that writes a session's traces or audit rows bumps its
+`version` in the same transaction; the timeline serves it as its ETag. backfill() rebuilds
+every row from traces, for existing databases:
+
+  poetry run python -m app.services.sessions backfill
+"""
+from __future__ import annotations
+
+import argparse
+from typing import Iterable
+
+from sqlalchemy import Select, delete, event, func, insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, aliased
+
+from app.db.models import AuditLog, SessionSummary, Trace
+from app.db.types import json_text
+
+PREVIEW_CHARS = 280
+
+
+def record_turn(db: Session, *, session_id: str, user_id: str | None, user_message: str) -> None:
+    """Count one turn for `session_id` (upsert). Does not commit."""
+    values = {
+        "session_id": session_id,
+        "user_id": user_id,
+        "turns": 1,
+        "last_user_message": user_message[:PREVIEW_CHARS],
+        "last_activity": func.now(),
+    }
+    t = SessionSummary.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        dml = sqlite if dialect == "sqlite" else postgresql
+        stmt = dml.insert(t).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[t.c.session_id],
+            set_={
+                "turns": t.c.turns + 1,
+                "last_user_message": stmt.excluded.last_user_message,
+                "last_activity": stmt.excluded.last_activity,
+                "user_id": func.coalesce(stmt.excluded.user_id, t.c.user_id),
+            },
+        )
+        db.execute(stmt)
+        return
+
+    updated = db.execute(
+        update(t)
+        .where(t.c.session_id == session_id)
+        .values(
+            turns=t.c.turns + 1,
+            last_user_message=values["last_user_message"],
+            last_activity=func.now(),
+            user_id=func.coalesce(user_id, t.c.user_id),
+        )
+    )
+    if updated.rowcount == 0:
+        db.execute(insert(t).values(**values))
+
+
+def touch_sessions(db: Session, *, session_ids: Iterable[str] = (), trace_ids: Iterable[str] | Select = ()) -> None:
+    """Bump the version of the given sessions and of the sessions owning `trace_ids`. Does not commit."""
+    session_ids = set(session_ids)
+    if not isinstance(trace_ids, Select):
+        trace_ids = set(trace_ids)
+        if not session_ids and not trace_ids:
+            return
+    t = SessionSummary.__table__
+    owners = select(Trace.session_id).where(Trace.id.in_(trace_ids))
+    # Core on the session's connection: runs inside after_flush without re-entering the flush
+    db.connection().execute(
+        update(t)
+        .where(or_(t.c.session_id.in_(session_ids), t.c.session_id.in_(owners)))
+        .values(version=t.c.version + 1)
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _track_timeline_writes(session: Session, flush_context) -> None:
+    session_ids: set[str] = set()
+    trace_ids: set[str] = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Trace):
+            session_ids.add(obj.session_id)
+        elif isinstance(obj, AuditLog):
+            trace_ids.add(obj.trace_id)
+    touch_sessions(session, session_ids=session_ids, trace_ids=trace_ids)
+
+
+def backfill(db: Session) -> int:
+    """Rebuild all summary rows from traces. Returns the number of sessions written."""
+    last = aliased(Trace)
+    last_message = (
+        select(last.user_message)
+        .where(last.session_id == Trace.session_id)
+        .order_by(last.created_at.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    # traces carry no user_id; take it from the session's most recent audited tool input
+    audited_user = (
+        select(json_text(AuditLog.input_json, "user_id"))
+        .join(last, last.id == AuditLog.trace_id)
+        .where(last.session_id == Trace.session_id, json_text(AuditLog.input_json, "user_id").is_not(None))
+        .order_by(AuditLog.created_at.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    rows = (
+        select(
+            Trace.session_id,
+            audited_user,
+            func.count(),
+            func.substr(last_message, 1, PREVIEW_CHARS),
+            func.max(Trace.created_at),
+            func.min(Trace.created_at),
+        )
+        .group_by(Trace.session_id)
+    )
+    t = SessionSummary.__table__
+    db.execute(delete(t))
+    result = db.execute(
+        insert(t).from_select(
+            ["session_id", "user_id", "turns", "last_user_message", "last_activity", "created_at"], rows
+        )
+    )
+    db.commit()
+    return result.rowcount
+
+
+def main() -> None:
+    from app.db.session import SessionLocal
+
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("backfill", help="rebuild the sessions table from traces")
+    ap.parse_args()
+
+    with SessionLocal() as db:
+        print(f"{backfill(db)} sessions written")
+
+
+if __name__ == "__main__":
+    main()
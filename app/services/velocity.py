@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import Transaction, TransactionStatus
+from app.utils.money import to_minor
+
+# transactions flushed in a session that has not committed yet
+_PENDING_KEY = "velocity_pending"
+# reservations taken by purchases in a session that has not committed yet
+_HELD_KEY = "velocity_held"
+
+_COUNTED_STATUSES = (TransactionStatus.confirmed, TransactionStatus.settled)
+
+HOUR_S = 3600
+DAY_S = 24 * HOUR_S
+
+
+class RollingWindow:
+    """
+    Time-bucketed running totals (amounts in minor units) over the last `span_s` seconds.
+    Buckets are appended in time order and expired from the left, so add/totals are O(1) amortized.
+    """
+
+    def __init__(self, span_s: int, bucket_s: int) -> None:
+        self.span_s = span_s
+        self.bucket_s = bucket_s
+        self._buckets: deque[list] = deque()  # [bucket_start, amount, count]
+        self.amount = 0
+        self.count = 0
+
+    def _expire(self, now: float) -> None:
+        horizon = now - self.span_s
+        while self._buckets and self._buckets[0][0] + self.bucket_s <= horizon:
+            _, amount, count = self._buckets.popleft()
+            self.amount -= amount
+            self.count -= count
+
+    def add(self, ts: float, amount: int, count: int = 1) -> list:
+        """Add to the bucket of `ts`; returns that bucket (see remove)."""
+        start = ts - (ts % self.bucket_s)
+        if not self._buckets or self._buckets[-1][0] < start:
+            self._buckets.append([start, amount, count])
+        else:
+            # same bucket, or a slightly late commit from another thread: fold into the newest bucket
+            self._buckets[-1][1] += amount
+            self._buckets[-1][2] += count
+        bucket = self._buckets[-1]
+        self.amount += amount
+        self.count += count
+        self._expire(ts)
+        return bucket
+
+    def remove(self, bucket: list, amount: int, count: int = 1) -> None:
+        """Undo an add() into `bucket`; a no-op once that bucket has expired."""
+        if self._buckets and bucket[0] >= self._buckets[0][0]:
+            bucket[1] -= amount
+            bucket[2] -= count
+            self.amount -= amount
+            self.count -= count
+
+    def totals(self, now: float) -> tuple[int, int]:
+        self._expire(now)
+        return self.amount, self.count
+
+    def is_empty(self) -> bool:
+        return not self._buckets
+
+
+@dataclass(frozen=True)
+class VelocityDecision:
+    allowed: bool
+    reason: str | None
+    currency: str  # of the amounts below; the spend caps are converted to it
+    amount_minor: int
+    hourly_spend_minor: int
+    daily_spend_minor: int
+    hourly_purchases: int
+    daily_purchases: int
+
+    def as_dict(self) -> dict:
+        return {
+            "allowed": self.allowed,
+            "reason": self.reason,
+            "currency": self.currency,
+            "amount_minor": self.amount_minor,
+            "hourly_spend_minor": self.hourly_spend_minor,
+            "daily_spend_minor": self.daily_spend_minor,
+            "hourly_purchases": self.hourly_purchases,
+            "daily_purchases": self.daily_purchases,
+            "limits": {
+                "max_hourly_spend_minor": to_minor(settings.max_hourly_spend, self.currency),
+                "max_daily_spend_minor": to_minor(settings.max_daily_spend, self.currency),
+                "max_hourly_purchases": settings.max_hourly_purchases,
+                "max_daily_purchases": settings.max_daily_purchases,
+            },
+        }
+
+
+@dataclass(eq=False)
+class Reservation:
+    """A purchase counted against its user's limits before it commits (see VelocityTracker.reserve)."""
+
+    windows: tuple[RollingWindow, RollingWindow]
+    buckets: tuple[list, list]
+    amount_minor: int
+    tx: Transaction | None = None  # the purchase it covers, once created
+    released: bool = False
+
+
+class VelocityTracker:
+    """
+    Per-user rolling hourly (1-minute buckets) and daily (1-hour buckets) spend and purchase counts.
+    Fed from committed transactions; rebuilt from the transactions table on startup.
+
+    Spend is kept per currency, in that currency's minor units, and checked against the caps
+    converted to it; purchase counts are summed over all of a user's currencies.
+
+    Purchases go through reserve(), which checks the limits and counts the amount in one step
+    under the lock, so concurrent purchases by one user cannot all pass the same check.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # user_id -> currency -> (hourly, daily)
+        self._users: dict[str, dict[str, tuple[RollingWindow, RollingWindow]]] = {}
+
+    def _windows(self, user_id: str, currency: str) -> tuple[RollingWindow, RollingWindow]:
+        by_currency = self._users.setdefault(user_id, {})
+        w = by_currency.get(currency)
+        if w is None:
+            w = by_currency[currency] = (RollingWindow(HOUR_S, 60), RollingWindow(DAY_S, HOUR_S))
+        return w
+
+    def record(self, user_id: str, amount_minor: int, currency: str = "USD", *, ts: float | None = None) -> None:
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            hourly, daily = self._windows(user_id, currency)
+            hourly.add(ts, amount_minor)
+            daily.add(ts, amount_minor)
+
+    def usage(self, user_id: str, currency: str = "USD", *, now: float | None = None) -> tuple[int, int, int, int]:
+        """(hourly spend, daily spend) in `currency` and (hourly, daily) purchases in any currency."""
+        now = time.time() if now is None else now
+        with self._lock:
+            return self._usage(user_id, currency, now)
+
+    def _usage(self, user_id: str, currency: str, now: float) -> tuple[int, int, int, int]:
+        # caller holds self._lock
+        by_currency = self._users.get(user_id)
+        if by_currency is None:
+            return 0, 0, 0, 0
+        h_amount = d_amount = h_count = d_count = 0
+        for cur, (hourly, daily) in list(by_currency.items()):
+            h = hourly.totals(now)
+            d = daily.totals(now)
+            h_count += h[1]
+            d_count += d[1]
+            if cur == currency:
+                h_amount, d_amount = h[0], d[0]
+            if daily.is_empty():
+                del by_currency[cur]
+        if not by_currency:
+            del self._users[user_id]
+        return h_amount, d_amount, h_count, d_count
+
+    def check(
+        self, user_id: str, amount_minor: int, currency: str = "USD", *, now: float | None = None
+    ) -> VelocityDecision:
+        """Whether a purchase of `amount_minor` would be within limits now; counts nothing."""
+        now = time.time() if now is None else now
+        with self._lock:
+            return self._decide(user_id, amount_minor, currency, now)
+
+    def reserve(
+        self, user_id: str, amount_minor: int, currency: str = "USD", *, now: float | None = None
+    ) -> tuple[VelocityDecision, Reservation | None]:
+        """check() and, if allowed, count the purchase at once; release() undoes the reservation."""
+        now = time.time() if now is None else now
+        with self._lock:
+            decision = self._decide(user_id, amount_minor, currency, now)
+            if not decision.allowed:
+                return decision, None
+            hourly, daily = self._windows(user_id, currency)
+            buckets = (hourly.add(now, amount_minor), daily.add(now, amount_minor))
+            return decision, Reservation((hourly, daily), buckets, amount_minor)
+
+    def release(self, reservation: Reservation) -> None:
+        with self._lock:
+            if reservation.released:
+                return
+            reservation.released = True
+            for window, bucket in zip(reservation.windows, reservation.buckets):
+                window.remove(bucket, reservation.amount_minor)
+
+    def _decide(self, user_id: str, amount_minor: int, currency: str, now: float) -> VelocityDecision:
+        # caller holds self._lock
+        h_amount, d_amount, h_count, d_count = self._usage(user_id, currency, now)
+
+        reason = None
+        if h_count + 1 > settings.max_hourly_purchases:
+            reason = "hourly_purchase_count_exceeded"
+        elif d_count + 1 > settings.max_daily_purchases:
+            reason = "daily_purchase_count_exceeded"
+        elif h_amount + amount_minor > to_minor(settings.max_hourly_spend, currency):
+            reason = "hourly_spend_limit_exceeded"
+        elif d_amount + amount_minor > to_minor(settings.max_daily_spend, currency):
+            reason = "daily_spend_limit_exceeded"
+
+        return VelocityDecision(
+            allowed=reason is None,
+            reason=reason,
+            currency=currency,
+            amount_minor=amount_minor,
+            hourly_spend_minor=h_amount,
+            daily_spend_minor=d_amount,
+            hourly_purchases=h_count,
+            daily_purchases=d_count,
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._users.clear()
+
+    def rebuild(self, db: Session, *, now: float | None = None) -> int:
+        """Reload the last 24h of committed transactions. Returns the number of rows replayed."""
+        now = time.time() if now is None else now
+        since = datetime.fromtimestamp(now, tz=timezone.utc) - timedelta(seconds=DAY_S)
+        rows = (
+            db.query(Transaction.user_id, Transaction.total_amount_minor, Transaction.currency, Transaction.created_at)
+            .filter(Transaction.created_at >= since, Transaction.status.in_(_COUNTED_STATUSES))
+            .order_by(Transaction.created_at.asc())
+            .yield_per(1000)
+        )
+        fresh: dict[str, dict[str, tuple[RollingWindow, RollingWindow]]] = {}
+        n = 0
+        for user_id, total, currency, created_at in rows:
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)  # SQLite returns naive UTC
+            ts = created_at.timestamp()
+            by_currency = fresh.setdefault(user_id, {})
+            w = by_currency.get(currency)
+            if w is None:
+                w = by_currency[currency] = (RollingWindow(HOUR_S, 60), RollingWindow(DAY_S, HOUR_S))
+            w[0].add(ts, total)
+            w[1].add(ts, total)
+            n += 1
+        with self._lock:
+            self._users = fresh
+        return n
+
+
+velocity = VelocityTracker()
+
+
+def hold(db: Session, reservation: Reservation) -> None:
+    """Tie `reservation` to `db`: kept if the session commits, released if it rolls back."""
+    db.info.setdefault(_HELD_KEY, []).append(reservation)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_new_transactions(session: Session, flush_context) -> None:
+    reserved = {id(r.tx) for r in session.info.get(_HELD_KEY, ())}
+    for obj in session.new:
+        if isinstance(obj, Transaction) and obj.status in _COUNTED_STATUSES and id(obj) not in reserved:
+            session.info.setdefault(_PENDING_KEY, []).append((obj.user_id, obj.total_amount_minor, obj.currency))
+
+
+@event.listens_for(Session, "after_commit")
+def _record_committed(session: Session) -> None:
+    if session.in_nested_transaction():
+        return  # a savepoint released; nothing is committed yet
+    session.info.pop(_HELD_KEY, None)  # already counted
+    for user_id, amount, currency in session.info.pop(_PENDING_KEY, ()):
+        velocity.record(user_id, amount, currency)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending(session: Session) -> None:
+    if session.in_nested_transaction():
+        return  # a savepoint rolled back; its purchase released its own reservation
+    session.info.pop(_PENDING_KEY, None)
+    for reservation in session.info.pop(_HELD_KEY, ()):
+        velocity.release(reservation)
@@ -0,0 +1,119 @@
+"""
+Startup warmup: pay the first-request costs before traffic does, then report ready.
+
+Runs on a background thread from the app lifespan, so /health answers at once while /ready
+stays 503 until every required step has succeeded (failed runs are retried). Optional steps
+(the LLM client, the OpenAPI schema) only log on failure.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.db import payloads
+from app.db.models import Product, Trace
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Readiness:
+    state: str = "starting"  # starting | warming | ready | failed
+    steps: dict[str, dict[str, Any]] = field(default_factory=dict)
+    duration_ms: float | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def as_dict(self) -> dict:
+        return {"state": self.state, "duration_ms": self.duration_ms, "steps": self.steps}
+
+
+readiness = Readiness()
+
+
+def _planner(factory: sessionmaker) -> None:
+    from app.agent.llm_planner import _openai_client, _plan_schema
+    from app.agent.orchestrator import _init_registry
+
+    _init_registry()
+    _plan_schema()
+    if settings.planner_mode.lower() == "llm" and settings.openai_api_key:
+        _openai_client(settings.openai_api_key)  # imports openai and builds its HTTP client
+
+
+def _db_connections(factory: sessionmaker) -> None:
+    # hold several at once, so the pool really opens (and PRAGMA-configures) that many
+    engine = factory.kw["bind"]
+    conns = [engine.connect() for _ in range(max(1, settings.warmup_db_connections))]
+    for conn in conns:
+        conn.close()
+
+
+def _catalog(factory: sessionmaker) -> None:
+    # product search scans the active catalog; pull its pages into the DB cache
+    with factory() as db:
+        db.execute(
+            select(Product.id, Product.name, Product.description, Product.inventory_qty).where(Product.is_active)
+        ).all()
+
+
+def _recent_traces(factory: sessionmaker) -> None:
+    # the sessions sidebar and timelines read recent traces and their plans
+    with factory() as db:
+        refs = db.execute(select(Trace.plan_ref).order_by(Trace.created_at.desc()).limit(500)).scalars().all()
+        payloads.prefetch(db, refs)
+
+
+# (name, step, required for readiness)
+STEPS: list[tuple[str, Callable[[sessionmaker], None], bool]] = [
+    ("planner", _planner, False),
+    ("db_connections", _db_connections, True),
+    ("catalog", _catalog, True),
+    ("recent_traces", _recent_traces, True),
+]
+
+
+def run(factory: sessionmaker, extra: list[tuple[str, Callable[[], Any]]] = ()) -> Readiness:
+    """Run every step (plus `extra` optional ones) and publish the outcome in `readiness`."""
+    readiness.state = "warming"
+    t0 = time.perf_counter()
+    failed = False
+    steps = [*STEPS, *((name, lambda _f, fn=fn: fn(), False) for name, fn in extra)]
+    for name, step, required in steps:
+        s0 = time.perf_counter()
+        try:
+            step(factory)
+            readiness.steps[name] = {"ok": True, "ms": round((time.perf_counter() - s0) * 1000, 3)}
+        except Exception as e:
+            logger.exception("Warmup step %s failed", name)
+            readiness.steps[name] = {"ok": False, "error": str(e), "required": required}
+            failed = failed or required
+    readiness.duration_ms = round((time.perf_counter() - t0) * 1000, 3)
+    readiness.state = "failed" if failed else "ready"
+    logger.info("Warmup %s in %.1f ms", readiness.state, readiness.duration_ms)
+    return readiness
+
+
+def _run_until_ready(factory: sessionmaker, extra: list[tuple[str, Callable[[], Any]]]) -> None:
+    # e.g. the database was still starting: keep trying rather than stay unready for good
+    while run(factory, extra).state == "failed":
+        time.sleep(settings.warmup_retry_s)
+
+
+def start(factory: sessionmaker, extra: list[tuple[str, Callable[[], Any]]] = ()) -> threading.Thread:
+    thread = threading.Thread(target=_run_until_ready, args=(factory, extra), name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def ping(db: Session) -> None:
+    db.execute(select(1))
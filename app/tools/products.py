@@ -1,6 +1,7 @@
 # app/tools/products.py
 from __future__ import annotations
 
+import logging
 import re
 from sqlalchemy import or_
 from sqlalchemy.orm import Session
@@ -8,6 +9,9 @@ from sqlalchemy.orm import Session
 from app.db.models import Product
 from app.schemas.tool_io import SearchProductsIn, SearchProductsOut
 from app.tools.registry import ToolResult
+from app.utils.money import format_minor
+
+logger = logging.getLogger(__name__)
 
 
 _STOPWORDS = {
@@ -29,7 +33,7 @@ def search_products_tool(db: Session, args: dict) -> ToolResult:
     inp = SearchProductsIn.model_validate(args)
 
     tokens = _normalize_query(inp.query)
-    print(tokens)
+    logger.debug("Product search tokens: %s", tokens)
 
     query = db.query(Product).filter(Product.is_active == True)  # noqa: E712
 
@@ -47,7 +51,7 @@ def search_products_tool(db: Session, args: dict) -> ToolResult:
     )
 
     results = [
-        {"id": p.id, "name": p.name, "price": str(p.price), "currency": p.currency, "inventory_qty": p.inventory_qty}
+        {"id": p.id, "name": p.name, "price": format_minor(p.price_minor, p.currency), "currency": p.currency, "inventory_qty": p.inventory_qty}
         for p in items
     ]
 
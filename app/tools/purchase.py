@@ -1,12 +1,12 @@
 from __future__ import annotations
 
-from decimal import Decimal
 from sqlalchemy.orm import Session
 
 from app.schemas.tool_io import ExecutePurchaseIn, ExecutePurchaseOut
 from app.services.accounts import get_balance
 from app.services.payments import execute_purchase
 from app.tools.registry import ToolResult
+from app.utils.money import to_decimal
 
 
 def execute_purchase_tool(db: Session, args: dict) -> ToolResult:
@@ -23,14 +23,14 @@ def execute_purchase_tool(db: Session, args: dict) -> ToolResult:
         qty=inp.qty,
         idempotency_key=inp.idempotency_key,
     )
-    bal, cur = get_balance(db, inp.user_id)
+    bal_minor, cur = get_balance(db, inp.user_id, consistent=True)
 
     out = ExecutePurchaseOut(
         transaction_id=tx.id,
         status=tx.status.value,
-        total_amount=Decimal(tx.total_amount),
+        total_amount=to_decimal(tx.total_amount_minor, tx.currency),
         currency=tx.currency,
-        remaining_balance=Decimal(bal),
+        remaining_balance=to_decimal(bal_minor, cur),
     )
     db.commit()
     return ToolResult(ok=True, output=out.model_dump(mode="json"))
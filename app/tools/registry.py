@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-import json
+import time
 from dataclasses import dataclass
 from typing import Callable, Any
 
 from sqlalchemy.orm import Session
 
+from app.core import metrics
 from app.db.models import AuditLog, ToolCallStatus
 
 
@@ -33,9 +34,11 @@ class ToolRegistry:
 
     def run_with_audit(self, *, db: Session, trace_id: str, tool_name: str, args: dict) -> ToolResult:
         fn = self.get(tool_name)
-        input_json = json.dumps(args, ensure_ascii=False)
+        input_json = dict(args)
+        t0 = time.perf_counter()
         try:
             result = fn(db, args)
+            duration_ms = (time.perf_counter() - t0) * 1000
             status = ToolCallStatus.ok if result.ok else ToolCallStatus.error
             db.add(
                 AuditLog(
@@ -43,13 +46,17 @@ class ToolRegistry:
                     tool_name=tool_name,
                     status=status,
                     input_json=input_json,
-                    output_json=json.dumps(result.output, ensure_ascii=False) if result.output else None,
+                    output_json=result.output or None,
                     error_message=result.error,
+                    duration_ms=duration_ms,
                 )
             )
             db.commit()
+            metrics.tool_seconds.observe(time.perf_counter() - t0, tool_name, status.value)
             return result
         except Exception as e:  # safety net: audit unexpected exceptions
+            duration_ms = (time.perf_counter() - t0) * 1000
+            db.rollback()  # never commit a tool's partial writes along with the audit row
             db.add(
                 AuditLog(
                     trace_id=trace_id,
@@ -58,7 +65,9 @@ class ToolRegistry:
                     input_json=input_json,
                     output_json=None,
                     error_message=str(e),
+                    duration_ms=duration_ms,
                 )
             )
             db.commit()
+            metrics.tool_seconds.observe(time.perf_counter() - t0, tool_name, "exception")
             return ToolResult(ok=False, output=None, error=str(e))
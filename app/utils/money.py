@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from decimal import ROUND_HALF_UP, Decimal
+
+# ISO 4217 minor-unit exponents. Amounts are stored and computed as integers in minor units
+# (cents for USD); Decimal only appears when crossing the API boundary.
+CURRENCY_EXPONENTS: dict[str, int] = {
+    "USD": 2,
+    "EUR": 2,
+    "GBP": 2,
+    "CAD": 2,
+    "AUD": 2,
+    "CHF": 2,
+    "JPY": 0,
+    "KRW": 0,
+    "KWD": 3,
+}
+DEFAULT_EXPONENT = 2
+
+
+def exponent(currency: str) -> int:
+    return CURRENCY_EXPONENTS.get(currency.upper(), DEFAULT_EXPONENT)
+
+
+def to_minor(amount: Decimal | str | int, currency: str = "USD") -> int:
+    """Major-unit amount (e.g. Decimal('12.34')) -> integer minor units (1234)."""
+    d = Decimal(str(amount)) if not isinstance(amount, Decimal) else amount
+    return int(d.scaleb(exponent(currency)).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def to_decimal(minor: int, currency: str = "USD") -> Decimal:
+    """Integer minor units -> Decimal with the currency's number of places (1234 -> Decimal('12.34'))."""
+    exp = exponent(currency)
+    return Decimal(int(minor)).scaleb(-exp).quantize(Decimal(1).scaleb(-exp))
+
+
+def format_minor(minor: int, currency: str = "USD") -> str:
+    return str(to_decimal(minor, currency))
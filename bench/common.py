@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import statistics
+
+
+def chat_client(SessionLocal):
+    """In-process TestClient for the app whose get_db hands out sessions from `SessionLocal`."""
+    from fastapi.testclient import TestClient
+
+    from app.db.deps import get_db
+    from app.main import app
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    return TestClient(app)
+
+
+def latency_summary(latencies_s: list[float]) -> dict:
+    if not latencies_s:
+        return {"latency_p50_ms": 0.0, "latency_p99_ms": 0.0}
+    q = statistics.quantiles(latencies_s, n=100) if len(latencies_s) >= 2 else latencies_s * 99
+    return {"latency_p50_ms": round(q[49] * 1000, 2), "latency_p99_ms": round(q[98] * 1000, 2)}
@@ -0,0 +1,313 @@
+"""
+Concurrent-buyer purchase benchmark and oversell checker.
+
+Seeds one product with limited stock and many funded users, then fires concurrent
+confirmed purchases either straight through services.payments.execute_purchase
+("service" path) or as `confirm <token>` turns against /chat ("chat" path), using
+threads or processes. Reports purchases/s and latency percentiles, then checks:
+  - no oversell (stock never negative, stock + units sold == initial stock)
+  - no negative balance, and every balance == initial - spent
+  - exactly one transaction per (user_id, idempotency_key)
+
+Usage:
+  poetry run python -m bench.purchase_contention --buyers 200 --stock 50 --workers 16
+  poetry run python -m bench.purchase_contention --path chat --mode processes
+"""
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.models import Account, Base, Product, Transaction, TransactionStatus, User
+from app.db.profiles import build_engine
+from bench.common import chat_client, latency_summary
+
+PRICE_MINOR = 1_999
+FUNDS_MINOR = 100_000
+
+
+@dataclass
+class Job:
+    user_id: str
+    idempotency_key: str
+    confirmation: str | None = None  # chat path: "confirm <token>"
+    session_id: str | None = None
+
+
+@dataclass
+class Outcome:
+    ok: bool
+    latency_s: float
+    error: str | None = None
+
+
+def make_engine(db_url: str, profile: str = "auto"):
+    return build_engine(db_url, profile, pool_size=32, max_overflow=32)
+
+
+def seed(db: Session, *, buyers: int, stock: int, replays: int) -> tuple[str, list[Job]]:
+    product = Product(name="Contended Widget", price_minor=PRICE_MINOR, currency="USD", inventory_qty=stock)
+    db.add(product)
+    jobs: list[Job] = []
+    for i in range(buyers):
+        u = User(full_name=f"Buyer {i}", email=f"buyer{i}@example.com")
+        db.add(u)
+        db.flush()
+        db.add(Account(user_id=u.id, balance_minor=FUNDS_MINOR, currency="USD"))
+        key = f"bench_{i:06d}_{os.urandom(4).hex()}"
+        # the same key is fired `replays` extra times to exercise the idempotency guard
+        jobs.extend(Job(user_id=u.id, idempotency_key=key) for _ in range(1 + replays))
+    db.commit()
+    return product.id, jobs
+
+
+def prepare_chat_confirmations(client, product_id: str, jobs: list[Job]) -> None:
+    """Plan one purchase per buyer so the timed phase only sends `confirm <token>` turns."""
+    tokens: dict[str, tuple[str, str]] = {}
+    for job in jobs:
+        if job.user_id not in tokens:
+            session_id = f"bench-{job.user_id[:8]}"
+            r = client.post(
+                "/chat",
+                json={"session_id": session_id, "user_id": job.user_id, "message": f"buy product_id={product_id} qty=1"},
+            )
+            r.raise_for_status()
+            tokens[job.user_id] = (session_id, r.json()["confirmation_token"])
+        job.session_id, token = tokens[job.user_id]
+        job.confirmation = f"confirm {token}"
+
+
+def _run_service_job(SessionLocal, product_id: str, job: Job) -> Outcome:
+    from app.services.payments import execute_purchase
+
+    t0 = time.perf_counter()
+    db = SessionLocal()
+    try:
+        execute_purchase(db, user_id=job.user_id, product_id=product_id, qty=1, idempotency_key=job.idempotency_key)
+        db.commit()
+        return Outcome(ok=True, latency_s=time.perf_counter() - t0)
+    except Exception as e:
+        db.rollback()
+        return Outcome(ok=False, latency_s=time.perf_counter() - t0, error=str(e).split("\n")[0][:80])
+    finally:
+        db.close()
+
+
+def _run_chat_job(client, job: Job) -> Outcome:
+    t0 = time.perf_counter()
+    r = client.post("/chat", json={"session_id": job.session_id, "user_id": job.user_id, "message": job.confirmation})
+    dt = time.perf_counter() - t0
+    if r.status_code != 200:
+        return Outcome(ok=False, latency_s=dt, error=f"http_{r.status_code}")
+    msg = r.json()["message"]
+    if msg.startswith("Purchase confirmed"):
+        return Outcome(ok=True, latency_s=dt)
+    return Outcome(ok=False, latency_s=dt, error=msg.split("\n")[0][:80])
+
+
+def _run_jobs_threaded(
+    db_url: str, profile: str, path: str, product_id: str, jobs: list[Job], workers: int
+) -> list[Outcome]:
+    engine = make_engine(db_url, profile)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    if path == "chat":
+        client = chat_client(SessionLocal)
+        fn = lambda job: _run_chat_job(client, job)  # noqa: E731
+    else:
+        fn = lambda job: _run_service_job(SessionLocal, product_id, job)  # noqa: E731
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        out = list(pool.map(fn, jobs))
+    engine.dispose()
+    return out
+
+
+def _process_init() -> None:
+    # pay app/sqlalchemy import cost before the clock starts
+    import app.main  # noqa: F401
+    import app.services.payments  # noqa: F401
+
+
+def _process_ready(_: int) -> int:
+    return os.getpid()
+
+
+def _process_worker(args: tuple) -> list[Outcome]:
+    db_url, profile, path, product_id, jobs, threads = args
+    return _run_jobs_threaded(db_url, profile, path, product_id, jobs, threads)
+
+
+def fire(
+    db_url: str, *, profile: str, path: str, mode: str, product_id: str, jobs: list[Job], workers: int
+) -> tuple[list[Outcome], float]:
+    if mode == "processes":
+        chunks = [jobs[i::workers] for i in range(workers)]
+        ctx = mp.get_context("spawn")
+        with ctx.Pool(processes=workers, initializer=_process_init) as pool:
+            pool.map(_process_ready, range(workers))
+            t0 = time.perf_counter()
+            parts = pool.map(_process_worker, [(db_url, profile, path, product_id, c, 2) for c in chunks if c], chunksize=1)
+            elapsed = time.perf_counter() - t0
+        return [o for part in parts for o in part], elapsed
+
+    t0 = time.perf_counter()
+    outcomes = _run_jobs_threaded(db_url, profile, path, product_id, jobs, workers)
+    return outcomes, time.perf_counter() - t0
+
+
+def committed_purchases(db: Session, product_id: str) -> int:
+    return (
+        db.query(func.count())
+        .select_from(Transaction)
+        .filter(Transaction.product_id == product_id, Transaction.status == TransactionStatus.confirmed)
+        .scalar()
+    )
+
+
+def check_invariants(db: Session, *, product_id: str, initial_stock: int) -> list[str]:
+    """Returns a list of violations (empty means the run was correct)."""
+    problems: list[str] = []
+
+    stock = db.query(Product.inventory_qty).filter(Product.id == product_id).scalar()
+    sold = (
+        db.query(func.coalesce(func.sum(Transaction.qty), 0))
+        .filter(Transaction.product_id == product_id, Transaction.status == TransactionStatus.confirmed)
+        .scalar()
+    )
+    if stock < 0:
+        problems.append(f"oversell: inventory_qty={stock}")
+    if stock + sold != initial_stock:
+        problems.append(f"inventory mismatch: stock={stock} sold={sold} initial={initial_stock}")
+
+    negative = db.query(func.count()).select_from(Account).filter(Account.balance_minor < 0).scalar()
+    if negative:
+        problems.append(f"{negative} account(s) with negative balance")
+
+    spent = dict(
+        db.query(Transaction.user_id, func.sum(Transaction.total_amount_minor))
+        .filter(Transaction.status == TransactionStatus.confirmed)
+        .group_by(Transaction.user_id)
+        .all()
+    )
+    for user_id, balance in db.query(Account.user_id, Account.balance_minor):
+        if balance != FUNDS_MINOR - (spent.get(user_id) or 0):
+            problems.append(f"balance mismatch for user {user_id}: {balance}")
+            break
+
+    dupes = (
+        db.query(Transaction.user_id, Transaction.idempotency_key)
+        .group_by(Transaction.user_id, Transaction.idempotency_key)
+        .having(func.count() > 1)
+        .count()
+    )
+    if dupes:
+        problems.append(f"{dupes} idempotency key(s) with more than one transaction")
+
+    return problems
+
+
+def report(outcomes: list[Outcome], elapsed_s: float, *, purchases: int) -> dict:
+    ok = [o for o in outcomes if o.ok]
+    errors: dict[str, int] = {}
+    for o in outcomes:
+        if not o.ok:
+            errors[o.error or "unknown"] = errors.get(o.error or "unknown", 0) + 1
+    return {
+        "requests": len(outcomes),
+        "succeeded": len(ok),  # includes idempotent replays answered with the original transaction
+        "purchases": purchases,
+        "elapsed_s": round(elapsed_s, 3),
+        "purchases_per_s": round(purchases / elapsed_s, 1) if elapsed_s else 0.0,
+        **latency_summary([o.latency_s for o in outcomes]),
+        "errors": errors,
+    }
+
+
+def run(
+    *,
+    db_url: str | None = None,
+    profile: str = "auto",
+    path: str = "service",
+    mode: str = "threads",
+    buyers: int = 100,
+    stock: int = 25,
+    replays: int = 1,
+    workers: int = 8,
+) -> dict:
+    tmpdir = None
+    if db_url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        db_url = f"sqlite:///{os.path.join(tmpdir.name, 'bench_purchase.db')}"
+
+    engine = make_engine(db_url, profile)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+    with SessionLocal() as db:
+        product_id, jobs = seed(db, buyers=buyers, stock=stock, replays=replays)
+
+    if path == "chat":
+        prepare_chat_confirmations(chat_client(SessionLocal), product_id, jobs)
+
+    outcomes, elapsed = fire(db_url, profile=profile, path=path, mode=mode, product_id=product_id, jobs=jobs, workers=workers)
+
+    with SessionLocal() as db:
+        problems = check_invariants(db, product_id=product_id, initial_stock=stock)
+        purchases = committed_purchases(db, product_id)
+
+    engine.dispose()
+    if tmpdir is not None:
+        tmpdir.cleanup()
+
+    out = report(outcomes, elapsed, purchases=purchases)
+    out.update({"path": path, "mode": mode, "buyers": buyers, "stock": stock, "violations": problems})
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--db-url", default=None, help="defaults to a throwaway SQLite file")
+    ap.add_argument("--profile", default="auto", help="storage profile (see app/db/profiles.py)")
+    ap.add_argument("--path", choices=["service", "chat"], default="service")
+    ap.add_argument("--mode", choices=["threads", "processes"], default="threads")
+    ap.add_argument("--buyers", type=int, default=100)
+    ap.add_argument("--stock", type=int, default=25)
+    ap.add_argument("--replays", type=int, default=1, help="extra concurrent requests per idempotency key")
+    ap.add_argument("--workers", type=int, default=8)
+    args = ap.parse_args()
+
+    res = run(
+        db_url=args.db_url,
+        profile=args.profile,
+        path=args.path,
+        mode=args.mode,
+        buyers=args.buyers,
+        stock=args.stock,
+        replays=args.replays,
+        workers=args.workers,
+    )
+
+    print("\n=== Purchase contention ===")
+    print(f"{res['path']}/{res['mode']}: {res['succeeded']}/{res['requests']} requests ok, {res['purchases']} purchases in {res['elapsed_s']}s")
+    print(f"Throughput: {res['purchases_per_s']} purchases/s")
+    print(f"Latency p50: {res['latency_p50_ms']}ms | p99: {res['latency_p99_ms']}ms")
+    for err, n in sorted(res["errors"].items(), key=lambda kv: -kv[1]):
+        print(f"- {n} x {err}")
+
+    if res["violations"]:
+        print("\n=== Invariant violations ===")
+        for v in res["violations"]:
+            print(f"- {v}")
+        raise SystemExit(1)
+    print("\nInvariants hold: no oversell, no negative balance, one transaction per idempotency key.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Timeline serialization: decoded payloads vs raw JSON passthrough.
+
+Builds one session with --traces traces (each with a plan and a few audit rows carrying
+realistic tool payloads) and times the 200-trace timeline two ways:
+
+  decoded      the previous path: ORM decodes every payload, FastAPI jsonable_encoder + json.dumps
+  passthrough  the current route: stored payload text is spliced into the response bytes
+
+Usage:
+  poetry run python -m bench.raw_json --traces 200 --iterations 50
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import sessionmaker
+
+from app.api.routes_ui_timeline import ui_session_timeline
+from app.db.models import AuditLog, Base, ToolCallStatus, Trace
+from app.db.profiles import build_engine
+from bench.common import latency_summary
+
+SESSION_ID = "bench-raw-json"
+
+
+def _seed(SessionLocal, traces: int) -> None:
+    results = [
+        {"id": f"p{i}", "name": f"Widget {i}", "price": f"{10 + i}.99", "currency": "USD", "inventory_qty": 100}
+        for i in range(10)
+    ]
+    search = {"tool_name": "search_products", "arguments": {"query": "widget", "limit": 10}}
+    balance = {"user_id": "u1", "balance": "1345.00", "currency": "USD"}
+    with SessionLocal() as db:
+        for i in range(traces):
+            plan = {
+                "intent": "purchase",
+                "steps": [{"step_type": "tool_call", "tool_call": search}],
+                "requires_confirmation": False,
+                "risk_level": "low",
+                "pending_confirmation": {"confirmation_token": f"tok{i}", "product_id": "p1", "qty": 1},
+            }
+            tr = Trace(session_id=SESSION_ID, user_message=f"buy widget {i}", assistant_message="Here are ...",
+                       plan_json=plan)
+            db.add(tr)
+            db.flush()
+            db.add(AuditLog(trace_id=tr.id, tool_name="search_products", status=ToolCallStatus.ok,
+                            input_json=search["arguments"], output_json={"results": results}))
+            db.add(AuditLog(trace_id=tr.id, tool_name="check_balance", status=ToolCallStatus.ok,
+                            input_json={"user_id": "u1"}, output_json=balance))
+        db.commit()
+
+
+def _decoded(db, limit: int) -> bytes:
+    # the timeline as it was built before passthrough
+    traces = (
+        db.query(Trace).filter(Trace.session_id == SESSION_ID).order_by(Trace.created_at, Trace.id).limit(limit).all()
+    )
+    logs = (
+        db.query(AuditLog)
+        .filter(AuditLog.trace_id.in_([t.id for t in traces]))
+        .order_by(AuditLog.trace_id, AuditLog.created_at)
+        .all()
+    )
+    by_trace: dict[str, list] = {}
+    for log in logs:
+        by_trace.setdefault(log.trace_id, []).append(
+            {"id": log.id, "trace_id": log.trace_id, "tool_name": log.tool_name, "status": str(log.status),
+             "input": log.input_json, "output": log.output_json, "error_message": log.error_message,
+             "created_at": log.created_at}
+        )
+    content = {
+        "session_id": SESSION_ID,
+        "traces": [
+            {"id": t.id, "session_id": t.session_id, "user_message": t.user_message,
+             "assistant_message": t.assistant_message, "plan": t.plan_json, "created_at": t.created_at,
+             "audit_logs": by_trace.get(t.id, [])}
+            for t in traces
+        ],
+    }
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def _passthrough(db, limit: int) -> bytes:
+    return ui_session_timeline(SESSION_ID, cursor=None, since=None, limit_traces=limit, if_none_match=None, db=db).body
+
+
+def _time(fn, SessionLocal, limit: int, iterations: int) -> tuple[dict, int]:
+    latencies = []
+    size = 0
+    for _ in range(iterations):
+        with SessionLocal() as db:
+            t0 = time.perf_counter()
+            size = len(fn(db, limit))
+            latencies.append(time.perf_counter() - t0)
+    return latency_summary(latencies), size
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--traces", type=int, default=200)
+    ap.add_argument("--iterations", type=int, default=50)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_engine(f"sqlite:///{os.path.join(tmp, 'raw.db')}", "sqlite")
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+        _seed(SessionLocal, args.traces)
+        limit = min(args.traces, 200)
+
+        rows = []
+        for label, fn in (("decoded", _decoded), ("passthrough", _passthrough)):
+            _time(fn, SessionLocal, limit, 3)  # warm up
+            summary, size = _time(fn, SessionLocal, limit, args.iterations)
+            rows.append((label, summary, size))
+        engine.dispose()
+
+    print(f"\n=== Timeline serialization ({limit} traces) ===")
+    print(f"{'path':<12} {'p50 ms':>8} {'p99 ms':>8} {'bytes':>9}")
+    for label, s, size in rows:
+        print(f"{label:<12} {s['latency_p50_ms']:>8} {s['latency_p99_ms']:>8} {size:>9}")
+
+
+if __name__ == "__main__":
+    main()
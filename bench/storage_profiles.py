@@ -0,0 +1,127 @@
+"""
+Compare storage profiles on the chat workload.
+
+Each simulated session runs: balance check -> product search -> pick option 1 ->
+confirm -> timeline poll, with many sessions in flight at once. The same workload
+runs against every target so the numbers are comparable.
+
+Usage:
+  poetry run python -m bench.storage_profiles                      # plain vs sqlite on SQLite files
+  poetry run python -m bench.storage_profiles --postgres-url postgresql+psycopg://user:pw@localhost/sf_bench
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import Account, Base, Product, User
+from app.db.profiles import build_engine
+from bench.common import chat_client, latency_summary
+
+
+def _seed(SessionLocal, sessions: int) -> list[str]:
+    with SessionLocal() as db:
+        for i in range(20):
+            db.add(Product(name=f"Widget {i}", description="bench widget", price_minor=999 + i, inventory_qty=100_000))
+        user_ids = []
+        for i in range(sessions):
+            u = User(full_name=f"Bench {i}", email=f"bench{i}@example.com")
+            db.add(u)
+            db.flush()
+            db.add(Account(user_id=u.id, balance_minor=10_000_000))
+            user_ids.append(u.id)
+        db.commit()
+        return user_ids
+
+
+def _conversation(client, session_id: str, user_id: str) -> tuple[list[float], int]:
+    latencies: list[float] = []
+    errors = 0
+
+    def turn(message: str) -> dict:
+        nonlocal errors
+        t0 = time.perf_counter()
+        r = client.post("/chat", json={"session_id": session_id, "user_id": user_id, "message": message})
+        latencies.append(time.perf_counter() - t0)
+        if r.status_code != 200:
+            errors += 1
+            return {}
+        body = r.json()
+        if "error" in body.get("message", "").lower() or "failed" in body.get("message", "").lower():
+            errors += 1
+        return body
+
+    turn("what is my balance")
+    turn("buy widget")
+    token = turn("1").get("confirmation_token")
+    if token:
+        turn(f"confirm {token}")
+    else:
+        errors += 1
+
+    t0 = time.perf_counter()
+    r = client.get(f"/ui/sessions/{session_id}/timeline")
+    latencies.append(time.perf_counter() - t0)
+    errors += r.status_code != 200
+    return latencies, errors
+
+
+def run_target(label: str, db_url: str, profile: str, *, sessions: int, workers: int) -> dict:
+    engine = build_engine(db_url, profile)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    user_ids = _seed(SessionLocal, sessions)
+    client = chat_client(SessionLocal)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda i: _conversation(client, f"bench-{label}-{i}", user_ids[i]), range(sessions)))
+    elapsed = time.perf_counter() - t0
+    engine.dispose()
+
+    latencies = [x for lat, _ in results for x in lat]
+    return {
+        "target": label,
+        "profile": profile,
+        "requests": len(latencies),
+        "errors": sum(err for _, err in results),
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        **latency_summary(latencies),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sessions", type=int, default=100)
+    ap.add_argument("--workers", type=int, default=16)
+    ap.add_argument("--postgres-url", default=None, help="optional: also benchmark the postgres profile")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        targets = [
+            ("sqlite-plain", f"sqlite:///{os.path.join(tmp, 'plain.db')}", "plain"),
+            ("sqlite-tuned", f"sqlite:///{os.path.join(tmp, 'tuned.db')}", "sqlite"),
+        ]
+        if args.postgres_url:
+            targets += [("postgres-plain", args.postgres_url, "plain"), ("postgres-tuned", args.postgres_url, "postgres")]
+
+        rows = [run_target(label, url, prof, sessions=args.sessions, workers=args.workers) for label, url, prof in targets]
+
+    print("\n=== Storage profiles: chat workload ===")
+    print(f"{'target':<16} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for r in rows:
+        print(
+            f"{r['target']:<16} {r['requests_per_s']:>8} {r['latency_p50_ms']:>8} "
+            f"{r['latency_p99_ms']:>8} {r['errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
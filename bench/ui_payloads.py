@@ -0,0 +1,80 @@
+"""
+UI timeline payload size: sparse fieldsets x response compression.
+
+Seeds one session like bench.raw_json and fetches its 200-trace timeline through the app
+(middleware included) with several `fields=` selections and Accept-Encodings, reporting
+latency and the bytes on the wire:
+
+  full        every trace field with nested audit logs (the default)
+  list        fields=user_message,created_at (a session's message list)
+  tools       fields=created_at,audit_logs.tool_name,audit_logs.status
+
+Usage:
+  poetry run python -m bench.ui_payloads --traces 200 --iterations 30
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy.orm import sessionmaker
+
+from app.api import compression
+from app.db.models import Base
+from app.db.profiles import build_engine
+from bench.common import chat_client, latency_summary
+from bench.raw_json import SESSION_ID, _seed
+
+VIEWS = {
+    "full": None,
+    "list": "user_message,created_at",
+    "tools": "created_at,audit_logs.tool_name,audit_logs.status",
+}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--traces", type=int, default=200)
+    ap.add_argument("--iterations", type=int, default=30)
+    args = ap.parse_args()
+    encodings = ["identity", "gzip"] + (["br"] if compression.brotli is not None else [])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_engine(f"sqlite:///{os.path.join(tmp, 'ui.db')}", "sqlite")
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+        _seed(SessionLocal, args.traces)
+        client = chat_client(SessionLocal)
+        url = f"/ui/sessions/{SESSION_ID}/timeline"
+        limit = min(args.traces, 200)
+
+        rows = []
+        for view, fields in VIEWS.items():
+            params = {"limit_traces": limit, **({"fields": fields} if fields else {})}
+            for enc in encodings:
+                headers = {"Accept-Encoding": enc}
+                for _ in range(3):  # warm up
+                    client.get(url, params=params, headers=headers)
+                latencies = []
+                for _ in range(args.iterations):
+                    t0 = time.perf_counter()
+                    resp = client.get(url, params=params, headers=headers)
+                    latencies.append(time.perf_counter() - t0)
+                resp.raise_for_status()
+                rows.append((view, enc, latency_summary(latencies), int(resp.headers["content-length"])))
+        engine.dispose()
+
+    baseline = rows[0][3]
+    print(f"\n=== UI timeline payloads ({limit} traces) ===")
+    print(f"{'view':<7} {'encoding':<9} {'p50 ms':>8} {'p99 ms':>8} {'bytes':>9} {'vs full':>8}")
+    for view, enc, s, size in rows:
+        print(
+            f"{view:<7} {enc:<9} {s['latency_p50_ms']:>8} {s['latency_p99_ms']:>8} {size:>9} "
+            f"{size / baseline:>7.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
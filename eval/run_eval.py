@@ -1,10 +1,10 @@
 from __future__ import annotations
 
+import itertools
 import json
 import os
 import re
 import statistics
-import time
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
@@ -81,41 +81,40 @@ def run():
 
     results: list[CaseResult] = []
 
-    with httpx.Client(timeout=30.0) as client:
+    with httpx.Client(timeout=300.0) as client:
         real_user_id = _seed_and_get_user_id(client)
-        for c in cases:
-            mode = c.get("mode", "llm")
+        # planner mode is process-wide, so each run of same-mode cases goes out as one /chat/batch
+        for mode, group in itertools.groupby(cases, key=lambda c: c.get("mode", "llm")):
+            group = list(group)
             _set_planner_mode(client, mode)
-            uid = c.get("user_id")
-            if uid == "<REAL_USER_ID>":
-                uid = real_user_id
-            payload = {
-                "session_id": c["session_id"],
-                "user_id": uid,
-                "message": c["message"],
-            }
-
-            t0 = time.time()
-            r = client.post(f"{BASE_URL}/chat", json=payload)
-            dt = time.time() - t0
-
-            ok_http = r.status_code == 200
-            resp_json = r.json() if ok_http else {"message": r.text}
-
-            passed, reason = _expectation_passed(c["expect"], resp_json)
-
-            results.append(
-                CaseResult(
-                    case_id=c["case_id"],
-                    mode=mode,
-                    ok_http=ok_http,
-                    latency_s=dt,
-                    passed=passed and ok_http,
-                    reason=reason if ok_http else "http_error",
-                    response_message=resp_json.get("message", ""),
-                    needs_confirmation=bool(resp_json.get("needs_confirmation")),
+            items = []
+            for c in group:
+                uid = c.get("user_id")
+                if uid == "<REAL_USER_ID>":
+                    uid = real_user_id
+                items.append({"session_id": c["session_id"], "user_id": uid, "message": c["message"]})
+
+            r = client.post(f"{BASE_URL}/chat/batch", json={"items": items})
+            r.raise_for_status()
+
+            for c, item in zip(group, r.json()["items"]):
+                ok_http = item["ok"]
+                resp_json = item["response"] if ok_http else {"message": item["error"]}
+
+                passed, reason = _expectation_passed(c["expect"], resp_json)
+
+                results.append(
+                    CaseResult(
+                        case_id=c["case_id"],
+                        mode=mode,
+                        ok_http=ok_http,
+                        latency_s=item["duration_ms"] / 1000,
+                        passed=passed and ok_http,
+                        reason=reason if ok_http else "http_error",
+                        response_message=resp_json.get("message", ""),
+                        needs_confirmation=bool(resp_json.get("needs_confirmation")),
+                    )
                 )
-            )
 
     # Summary
     total = len(results)
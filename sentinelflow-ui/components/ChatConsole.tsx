@@ -1,16 +1,23 @@
 "use client";
 
 import { useEffect, useMemo, useRef, useState } from "react";
-import { api } from "@/lib/api";
+import { api, type ChatProgress } from "@/lib/api";
 
 type Msg = { role: "user" | "assistant"; text: string; meta?: any };
 
+function stageLabel(p: ChatProgress): string {
+  if (p.event === "planning") return "Planning…";
+  if (p.event === "plan") return "Plan ready, checking policy…";
+  return `${p.data.tool_name} ${p.data.ok ? "done" : "failed"}…`;
+}
+
 function uid(prefix = "demo") {
   return `${prefix}-${Math.random().toString(16).slice(2)}-${Date.now()}`;
 }
 
 export default function ChatConsole() {
   const [busy, setBusy] = useState(false);
+  const [stage, setStage] = useState<string | null>(null);
   const [users, setUsers] = useState<
     Array<{ id: string; full_name: string; email: string }>
   >([]);
@@ -30,7 +37,7 @@ export default function ChatConsole() {
   useEffect(() => {
     api
       .users()
-      .then(setUsers)
+      .then((page) => setUsers(page.items))
       .catch(() => {});
   }, []);
 
@@ -50,7 +57,7 @@ export default function ChatConsole() {
     setBusy(true);
     try {
       await api.seed();
-      const u = await api.users();
+      const u = (await api.users()).items;
       setUsers(u);
       if (u[0]?.id) setUserId(u[0].id);
       setMessages([
@@ -78,11 +85,14 @@ export default function ChatConsole() {
     setBusy(true);
 
     try {
-      const resp = await api.chat({
-        session_id: sessionId,
-        user_id: userId || null,
-        message: trimmed,
-      });
+      const resp = await api.chatStream(
+        {
+          session_id: sessionId,
+          user_id: userId || null,
+          message: trimmed,
+        },
+        (p) => setStage(stageLabel(p))
+      );
       setLastTraceId(resp.trace_id);
       setMessages((m) => [
         ...m,
@@ -106,6 +116,7 @@ export default function ChatConsole() {
       ]);
     } finally {
       setBusy(false);
+      setStage(null);
     }
   }
 
@@ -264,7 +275,7 @@ export default function ChatConsole() {
               flexWrap: "wrap",
             }}
           >
-            <div className="small muted">Cmd/Ctrl + Enter to send.</div>
+            <div className="small muted">{stage ?? "Cmd/Ctrl + Enter to send."}</div>
             <div style={{ display: "flex", gap: 10 }}>
               <button className="btn" onClick={seed} disabled={busy}>
                 Seed
@@ -3,13 +3,13 @@
 import { useEffect, useMemo, useState } from "react";
 import { api } from "@/lib/api";
 
-type SessionRow = { session_id: string; last_active_at: string; turns: number };
+type SessionRow = { session_id: string; last_message_at: string | null; turns: number };
 type TraceRow = {
   id: string;
   session_id: string;
   user_message: string;
   assistant_message?: string | null;
-  plan_json?: string | null;
+  plan_json?: unknown;
   created_at: string;
 };
 type AuditRow = {
@@ -17,12 +17,18 @@ type AuditRow = {
   trace_id: string;
   tool_name: string;
   status: string;
-  input_json?: string | null;
-  output_json?: string | null;
+  input_json?: unknown;
+  output_json?: unknown;
   error_message?: string | null;
   created_at: string;
 };
 
+// plan/input/output payloads arrive as JSON values, not strings
+function fmtJson(v: unknown) {
+  if (v === null || v === undefined) return "";
+  return typeof v === "string" ? v : JSON.stringify(v, null, 2);
+}
+
 function fmtDate(iso: string) {
   try {
     return new Date(iso).toLocaleString();
@@ -42,7 +48,7 @@ export default function ObservabilityConsole() {
   async function refreshSessions() {
     setErr(null);
     try {
-      const s = await api.sessions();
+      const s = (await api.sessions()).items;
       setSessions(s);
       if (!selectedSession && s[0]?.session_id)
         setSelectedSession(s[0].session_id);
@@ -60,7 +66,7 @@ export default function ObservabilityConsole() {
     setErr(null);
     api
       .tracesBySession(selectedSession)
-      .then((t) => {
+      .then(({ items: t }) => {
         setTraces(t);
         if (t[0]?.id) setSelectedTrace(t[0].id);
       })
@@ -72,7 +78,7 @@ export default function ObservabilityConsole() {
     setErr(null);
     api
       .auditByTrace(selectedTrace)
-      .then(setAudit)
+      .then((page) => setAudit(page.items))
       .catch((e) => setErr(e.message));
   }, [selectedTrace]);
 
@@ -158,7 +164,7 @@ export default function ObservabilityConsole() {
           <>
             <div className="h2">Plan</div>
             <div className="bubble assistant">
-              <div className="code">{selectedTraceObj.plan_json}</div>
+              <div className="code">{fmtJson(selectedTraceObj.plan_json)}</div>
             </div>
             <div className="hr" />
           </>
@@ -185,11 +191,11 @@ export default function ObservabilityConsole() {
                   </td>
                   <td>{a.status}</td>
                   <td>
-                    <div className="code">{a.input_json || ""}</div>
+                    <div className="code">{fmtJson(a.input_json)}</div>
                   </td>
                   <td>
                     <div className="code">
-                      {a.output_json || a.error_message || ""}
+                      {fmtJson(a.output_json) || a.error_message || ""}
                     </div>
                   </td>
                 </tr>
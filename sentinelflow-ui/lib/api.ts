@@ -11,6 +11,18 @@ export type ChatResponse = {
   confirmation_token?: string | null;
 };
 
+/** Progress events of POST /chat/stream, sent before the final ChatResponse. */
+export type ChatProgress =
+  | { event: "planning"; data: { trace_id: string; session_id: string } }
+  | { event: "plan"; data: { trace_id: string; plan: unknown } }
+  | {
+      event: "tool_result";
+      data: { trace_id: string; tool_name: string; ok: boolean; output: unknown; error: string | null };
+    };
+
+/** Keyset page: pass next_cursor back as `cursor` to fetch the following page. */
+export type Page<T> = { items: T[]; next_cursor: string | null };
+
 const API_BASE =
   process.env.NEXT_PUBLIC_API_BASE_URL || "http://127.0.0.1:8000";
 
@@ -27,41 +39,86 @@ async function http<T>(path: string, init?: RequestInit): Promise<T> {
   return res.json() as Promise<T>;
 }
 
+/**
+ * POST /chat/stream: Server-Sent Events over fetch (EventSource cannot POST). Calls
+ * onProgress per stage and resolves with the final ChatResponse.
+ */
+async function chatStream(
+  payload: ChatRequest,
+  onProgress: (p: ChatProgress) => void
+): Promise<ChatResponse> {
+  const res = await fetch(`${API_BASE}/chat/stream`, {
+    method: "POST",
+    body: JSON.stringify(payload),
+    headers: { "Content-Type": "application/json", Accept: "text/event-stream" },
+    cache: "no-store",
+  });
+  if (!res.ok || !res.body) {
+    const text = await res.text();
+    throw new Error(`${res.status} ${res.statusText}: ${text}`);
+  }
+  const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buf = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buf += value;
+    let end: number;
+    while ((end = buf.indexOf("\n\n")) >= 0) {
+      const block = buf.slice(0, end);
+      buf = buf.slice(end + 2);
+      const event = /^event: (.*)$/m.exec(block)?.[1];
+      const data = JSON.parse(/^data: (.*)$/m.exec(block)?.[1] ?? "null");
+      if (event === "message") return data as ChatResponse;
+      if (event === "error") throw new Error(data?.detail ?? "Chat failed");
+      onProgress({ event, data } as ChatProgress);
+    }
+  }
+  throw new Error("Chat stream ended without a message");
+}
+
+function paged(path: string, cursor?: string | null): string {
+  return cursor ? `${path}?cursor=${encodeURIComponent(cursor)}` : path;
+}
+
 export const api = {
   chat: (payload: ChatRequest) =>
     http<ChatResponse>("/chat", {
       method: "POST",
       body: JSON.stringify(payload),
     }),
+  chatStream,
   seed: () => http<any>("/admin/seed", { method: "POST" }),
-  users: () =>
-    http<Array<{ id: string; full_name: string; email: string }>>("/users"),
-  sessions: () =>
-    http<Array<{ session_id: string; last_active_at: string; turns: number }>>(
-      "/sessions"
+  users: (cursor?: string | null) =>
+    http<Page<{ id: string; full_name: string; email: string }>>(
+      paged("/users", cursor)
+    ),
+  sessions: (cursor?: string | null) =>
+    http<Page<{ session_id: string; last_message_at: string | null; turns: number }>>(
+      paged("/sessions", cursor)
     ),
-  tracesBySession: (sessionId: string) =>
+  tracesBySession: (sessionId: string, cursor?: string | null) =>
     http<
-      Array<{
+      Page<{
         id: string;
         session_id: string;
         user_message: string;
         assistant_message?: string | null;
-        plan_json?: string | null;
+        plan_json?: unknown;
         created_at: string;
       }>
-    >(`/sessions/${encodeURIComponent(sessionId)}/traces`),
-  auditByTrace: (traceId: string) =>
+    >(paged(`/sessions/${encodeURIComponent(sessionId)}/traces`, cursor)),
+  auditByTrace: (traceId: string, cursor?: string | null) =>
     http<
-      Array<{
+      Page<{
         id: string;
         trace_id: string;
         tool_name: string;
         status: string;
-        input_json?: string | null;
-        output_json?: string | null;
+        input_json?: unknown;
+        output_json?: unknown;
         error_message?: string | null;
         created_at: string;
       }>
-    >(`/traces/${encodeURIComponent(traceId)}/audit`),
+    >(paged(`/traces/${encodeURIComponent(traceId)}/audit_logs`, cursor)),
 };
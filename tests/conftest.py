@@ -3,12 +3,12 @@ from __future__ import annotations
 import os
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.main import app
 from app.db.deps import get_db
 from app.db.models import Base
+from app.db.profiles import build_engine
 
 TEST_DB_URL = "sqlite:///./test_sentinelflow.db"
 
@@ -16,7 +16,7 @@ TEST_DB_URL = "sqlite:///./test_sentinelflow.db"
 def engine():
     if os.path.exists("test_sentinelflow.db"):
         os.remove("test_sentinelflow.db")
-    eng = create_engine(TEST_DB_URL, connect_args={"check_same_thread": False})
+    eng = build_engine(TEST_DB_URL, "plain")
     Base.metadata.create_all(bind=eng)
     return eng
 
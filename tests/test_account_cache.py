@@ -0,0 +1,37 @@
+from app.db.models import Account, User
+from app.db.seed import seed_synthetic_data
+from app.services.account_cache import account_cache
+from app.services.accounts import debit, get_balance
+
+
+def test_balance_reads_are_cached_and_invalidated_by_debit(db_session):
+    seed_synthetic_data(db_session, num_users=1, num_products=1)
+    user = db_session.query(User).first()
+
+    acct = db_session.query(Account).filter(Account.user_id == user.id).one()
+    acct.balance_minor = 10_000
+    db_session.commit()
+
+    hits_before = account_cache.hits
+    assert get_balance(db_session, user.id)[0] == 10_000
+    assert get_balance(db_session, user.id)[0] == 10_000
+    assert account_cache.hits == hits_before + 1
+
+    debit(db_session, user.id, 3_000)
+    # uncommitted change: the cache is bypassed, not refilled
+    assert get_balance(db_session, user.id)[0] == 7_000
+    db_session.commit()
+
+    assert get_balance(db_session, user.id)[0] == 7_000
+
+
+def test_direct_orm_update_invalidates_snapshot(db_session):
+    seed_synthetic_data(db_session, num_users=1, num_products=1)
+    user = db_session.query(User).first()
+    get_balance(db_session, user.id)
+
+    acct = db_session.query(Account).filter(Account.user_id == user.id).one()
+    acct.balance_minor = 4_200
+    db_session.commit()
+
+    assert get_balance(db_session, user.id)[0] == 4_200
@@ -0,0 +1,121 @@
+import threading
+import time
+
+import pytest
+
+import app.api.routes_chat as routes_chat
+from app.agent.llm_planner import heuristic_only
+from app.agent.types import TurnClass
+from app.schemas.chat import ChatRequest
+from app.services.admission import AdmissionController, AdmissionRejected
+from app.services.scheduler import turn_weights
+from app.services.session_lanes import session_lanes
+
+
+def _controller(**kw):
+    opts = dict(enabled=True, max_concurrent=1, max_queue=4, max_wait_s=2.0, degrade_depth=1, rate=1.0, burst=100)
+    opts.update(weights=turn_weights(), starvation_s=60.0)
+    opts.update(kw)
+    return AdmissionController(**opts)
+
+
+def test_queued_turns_get_the_slot_in_order_and_degrade_when_deep():
+    ctl = _controller()
+    first = ctl.admit("u1")
+    first.__enter__()
+    seen = []
+
+    def turn(name):
+        with ctl.admit(name) as slot:
+            seen.append((name, slot.degraded, heuristic_only.get()))
+
+    threads = [threading.Thread(target=turn, args=(n,)) for n in ("u2", "u3")]
+    for t in threads:
+        t.start()
+        while ctl.stats()["queued_now"] < threads.index(t) + 1:
+            time.sleep(0.001)
+    first.__exit__(None, None, None)
+    for t in threads:
+        t.join(5)
+
+    # u2 left u3 queued behind it (depth 1 >= degrade_depth): it plans heuristically
+    assert seen == [("u2", True, True), ("u3", False, False)]
+    stats = ctl.stats()
+    assert (stats["running"], stats["queued"], stats["degraded"]) == (0, 2, 1)
+
+
+def test_rejections():
+    ctl = _controller(burst=2, rate=0.5)
+    with ctl.admit("u"):
+        pass
+    ctl.admit("u").__exit__(None, None, None)
+    with pytest.raises(AdmissionRejected) as e:
+        ctl.admit("u")
+    assert e.value.status_code == 429 and e.value.headers == {"Retry-After": "2"}
+
+    # a wait longer than the budget is refused up front, not after timing out
+    ctl = _controller(max_wait_s=0.5)
+    ctl._turn_s = 1.0
+    held = ctl.admit(None)
+    t0 = time.monotonic()
+    with pytest.raises(AdmissionRejected) as e:
+        ctl.admit(None)
+    assert e.value.status_code == 503 and time.monotonic() - t0 < 0.1
+    held.__exit__(None, None, None)
+
+    ctl = _controller(max_queue=0)
+    held = ctl.admit(None)
+    with pytest.raises(AdmissionRejected):
+        ctl.admit(None)
+    assert ctl.stats()["rejected_full"] == 1
+
+
+def test_chat_answers_429_when_a_caller_exceeds_its_rate(client, monkeypatch):
+    monkeypatch.setattr(routes_chat, "admission", _controller(max_concurrent=8, burst=1, rate=0.01))
+    body = {"session_id": "adm-1", "message": "hello"}
+    assert client.post("/chat", json=body).status_code == 200
+    resp = client.post("/chat", json=body)
+    assert resp.status_code == 429 and int(resp.headers["Retry-After"]) >= 1
+    assert client.post("/chat/stream", json=body).status_code == 429
+
+
+def test_batch_items_are_charged_to_their_callers_rate(client, monkeypatch):
+    monkeypatch.setattr(routes_chat, "admission", _controller(max_concurrent=8, burst=2, rate=0.01))
+    items = [{"session_id": "adm-batch", "message": "hello"}] * 3 + [{"session_id": "adm-batch-2", "message": "hello"}]
+    data = client.post("/chat/batch", json={"items": items}).json()
+    assert [(it["ok"], it["status_code"]) for it in data["items"]] == [(True, 200), (True, 200), (False, 429), (True, 200)]
+    assert data["items"][2]["error"] == "Too many requests."
+
+
+def test_turns_waiting_in_their_session_lane_hold_no_slot(monkeypatch):
+    ctl = _controller(max_concurrent=2, max_wait_s=5.0, degrade_depth=100)
+    monkeypatch.setattr(routes_chat, "admission", ctl)
+    release = threading.Event()
+    done = []
+
+    def fake_turn(db, req, progress):
+        if req.session_id == "burst":
+            release.wait(5)
+        done.append(req.session_id)
+        return None
+
+    monkeypatch.setattr(routes_chat, "_respond_in_lane", fake_turn)
+    turn = lambda sid: routes_chat._respond(None, ChatRequest(session_id=sid, message="hi"), TurnClass.planned)  # noqa: E731
+
+    burst = [threading.Thread(target=turn, args=("burst",)) for _ in range(5)]
+    for t in burst:
+        t.start()
+    while session_lanes.depth("burst") < 5:
+        time.sleep(0.001)
+    # one burst turn runs; the other four wait in the lane without a slot
+    assert ctl.stats()["running"] == 1
+
+    other = threading.Thread(target=turn, args=("other",))
+    other.start()
+    other.join(2)
+    assert done == ["other"] and ctl.stats()["queued"] == 0
+
+    release.set()
+    for t in burst:
+        t.join(5)
+    assert done.count("burst") == 5 and ctl.stats()["running"] == 0
@@ -1,5 +1,3 @@
-from decimal import Decimal
-
 from app.db.seed import seed_synthetic_data
 from app.db.models import User, Product, Account
 
@@ -20,7 +18,7 @@ def test_chat_purchase_requires_confirmation(client, db_session):
     product = db_session.query(Product).first()
 
     acct = db_session.query(Account).filter(Account.user_id == user.id).one()
-    acct.balance = Decimal("5000.00")
+    acct.balance_minor = 500_000
     db_session.commit()
 
     resp = client.post("/chat", json={"session_id": "s2", "user_id": user.id, "message": f"buy product_id={product.id} qty=1"})
@@ -29,3 +27,20 @@ def test_chat_purchase_requires_confirmation(client, db_session):
     assert data["needs_confirmation"] is True
     assert data["confirmation_token"] is not None
     assert "confirm" in data["message"].lower()
+
+
+def test_chat_confirm_executes_planned_purchase(client, db_session):
+    seed_synthetic_data(db_session, num_users=1, num_products=1)
+    user = db_session.query(User).first()
+    product = db_session.query(Product).first()
+
+    acct = db_session.query(Account).filter(Account.user_id == user.id).one()
+    acct.balance_minor = 500_000
+    db_session.commit()
+
+    resp = client.post("/chat", json={"session_id": "s3", "user_id": user.id, "message": f"buy product_id={product.id} qty=1"})
+    token = resp.json()["confirmation_token"]
+
+    resp = client.post("/chat", json={"session_id": "s3", "user_id": user.id, "message": f"confirm {token}"})
+    assert resp.status_code == 200
+    assert resp.json()["message"].startswith("Purchase confirmed")
@@ -0,0 +1,43 @@
+import app.api.routes_chat as routes_chat
+from app.db.models import Trace, User
+from app.db.seed import seed_synthetic_data
+
+
+def test_batch_keeps_session_order_and_reports_each_item(client, db_session):
+    seed_synthetic_data(db_session, num_users=1, num_products=3)
+    user = db_session.query(User).first()
+
+    items = []
+    for sid in ("batch-a", "batch-b", "batch-c"):
+        items.append({"session_id": sid, "user_id": user.id, "message": "Buy me a keyboard"})
+        items.append({"session_id": sid, "user_id": user.id, "message": "what is my balance"})
+        items.append({"session_id": sid, "user_id": user.id, "message": "1"})
+    resp = client.post("/chat/batch", json={"items": items})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["sessions"] == 3 and data["workers"] == 3
+    assert [it["index"] for it in data["items"]] == list(range(9))
+    assert all(it["ok"] and it["duration_ms"] >= 0 for it in data["items"])
+
+    for sid in ("batch-a", "batch-b", "batch-c"):
+        search, balance, pick = (it["response"] for it in data["items"] if it["session_id"] == sid)
+        assert "Reply with the option number" in search["message"]
+        assert "Your balance is" in balance["message"]
+        # the pick only resolves if it ran after the search of the same session
+        assert pick["needs_confirmation"] is True
+        assert db_session.query(Trace).filter(Trace.session_id == sid).count() == 3
+
+
+def test_batch_isolates_a_failed_turn(client, db_session, monkeypatch):
+    real = routes_chat.handle_message
+
+    def flaky(db, *, message, **kwargs):
+        if message == "boom":
+            raise RuntimeError("planner down")
+        return real(db, message=message, **kwargs)
+
+    monkeypatch.setattr(routes_chat, "handle_message", flaky)
+    items = [{"session_id": "batch-err", "message": m} for m in ("boom", "hello")]
+    data = client.post("/chat/batch", json={"items": items}).json()
+    assert [(it["ok"], it["error"]) for it in data["items"]] == [(False, "Internal Server Error"), (True, None)]
+    assert data["items"][1]["response"]["session_id"] == "batch-err"
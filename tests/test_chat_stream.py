@@ -0,0 +1,55 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import app.api.routes_chat as routes_chat
+from app.db.models import User
+from app.db.seed import seed_synthetic_data
+
+
+def _events(body: str) -> list[tuple[str, str]]:
+    out = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        out.append((fields["event"], fields["data"]))
+    return out
+
+
+def test_stream_reports_stages_then_the_chat_response(client, db_session):
+    seed_synthetic_data(db_session, num_users=1, num_products=1)
+    user = db_session.query(User).first()
+
+    resp = client.post("/chat/stream", json={"session_id": "sse-1", "user_id": user.id, "message": "what is my balance"})
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = _events(resp.text)
+    assert [e for e, _ in events] == ["planning", "plan", "tool_result", "message"]
+
+    trace_id = json.loads(events[0][1])["trace_id"]
+    assert json.loads(events[1][1])["plan"]["intent"] == "check_balance"
+    tool = json.loads(events[2][1])
+    assert (tool["tool_name"], tool["ok"], tool["trace_id"]) == ("check_balance", True, trace_id)
+
+    # the final event carries exactly the bytes POST /chat returns for the same turn
+    plain = client.post("/chat", json={"session_id": "sse-2", "user_id": user.id, "message": "what is my balance"})
+    expected = plain.text.replace(plain.json()["trace_id"], trace_id).replace('"sse-2"', '"sse-1"')
+    assert events[3][1] == expected
+
+
+def test_stream_reports_failures_as_an_error_event(client, monkeypatch):
+    def boom(*args, **kwargs):
+        raise RuntimeError("planner down")
+
+    monkeypatch.setattr(routes_chat, "handle_message", boom)
+    resp = client.post("/chat/stream", json={"session_id": "sse-err", "message": "hello"})
+    assert _events(resp.text) == [("error", '{"detail":"Internal Server Error"}')]
+
+
+def test_streamed_turns_share_a_bounded_pool(client, monkeypatch):
+    pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="test-stream")
+    monkeypatch.setattr(routes_chat, "_stream_pool", pool)
+    for n in range(6):
+        resp = client.post("/chat/stream", json={"session_id": f"sse-pool-{n}", "message": "hello"})
+        assert _events(resp.text)[-1][0] == "message"
+    assert len([t for t in threading.enumerate() if t.name.startswith("test-stream")]) <= 2
+    pool.shutdown()
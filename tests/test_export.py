@@ -0,0 +1,29 @@
+import gzip
+
+from app.db.models import User
+from app.db.seed import seed_synthetic_data
+from app.utils import jsoncodec
+
+
+def test_export_streams_filtered_ndjson(client, db_session):
+    seed_synthetic_data(db_session, num_users=1, num_products=2)
+    user = db_session.query(User).first()
+    for message in ["what is my balance", "buy keyboard"]:
+        client.post("/chat", json={"session_id": "exp-1", "user_id": user.id, "message": message})
+    client.post("/chat", json={"session_id": "exp-2", "user_id": user.id, "message": "what is my balance"})
+
+    resp = client.get("/export/traces", params={"session_id": "exp-1"})
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    traces = [jsoncodec.loads(line) for line in resp.text.splitlines()]
+    # both turns can share a created_at second on SQLite
+    assert sorted(t["user_message"] for t in traces) == ["buy keyboard", "what is my balance"]
+
+    resp = client.get("/export/audit_logs", params={"session_id": "exp-1", "tool_name": "check_balance", "gzip": "true"})
+    assert resp.headers["content-type"] == "application/gzip"
+    logs = [jsoncodec.loads(line) for line in gzip.decompress(resp.content).splitlines()]
+    assert logs and {log["tool_name"] for log in logs} == {"check_balance"}
+    assert {log["trace_id"] for log in logs} <= {t["id"] for t in traces}
+
+    assert client.get("/export/traces", params={"since": "2999-01-01T00:00:00Z"}).content == b""
+    assert client.get("/export/transactions", params={"session_id": "exp-1"}).status_code == 400
+    assert client.get("/export/users").status_code == 400
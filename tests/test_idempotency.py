@@ -1,7 +1,6 @@
-from decimal import Decimal
-
+import app.services.payments as payments
 from app.db.seed import seed_synthetic_data
-from app.db.models import User, Product, Account
+from app.db.models import User, Product, Account, Trace
 from app.services.payments import execute_purchase
 
 
@@ -11,7 +10,7 @@ def test_idempotent_purchase(db_session):
     product = db_session.query(Product).first()
 
     acct = db_session.query(Account).filter(Account.user_id == user.id).one()
-    acct.balance = Decimal("5000.00")
+    acct.balance_minor = 500_000
     db_session.commit()
 
     idem = "idem_test_12345678"
@@ -21,3 +20,33 @@ def test_idempotent_purchase(db_session):
     db_session.commit()
 
     assert tx1.id == tx2.id
+
+
+def test_a_lost_idempotency_race_undoes_only_the_purchase(db_session, monkeypatch):
+    seed_synthetic_data(db_session, num_users=1, num_products=1)
+    user = db_session.query(User).first()
+    product = db_session.query(Product).first()
+    acct = db_session.query(Account).filter(Account.user_id == user.id).one()
+    acct.balance_minor = 500_000
+    product.inventory_qty = 10
+    db_session.commit()
+
+    idem = "idem_race_12345678"
+    winner = execute_purchase(db_session, user_id=user.id, product_id=product.id, qty=1, idempotency_key=idem)
+    db_session.commit()
+
+    # the caller's own pending work, then a duplicate whose up-front check misses the winner
+    trace = Trace(session_id="race-1", user_message="confirm")
+    db_session.add(trace)
+    db_session.flush()
+    real = payments._existing_tx
+    misses = [None]
+    monkeypatch.setattr(payments, "_existing_tx", lambda *a: misses.pop() if misses else real(*a))
+    tx = execute_purchase(db_session, user_id=user.id, product_id=product.id, qty=1, idempotency_key=idem)
+    db_session.commit()
+
+    assert tx.id == winner.id
+    assert db_session.get(Trace, trace.id) is not None
+    db_session.refresh(acct)
+    db_session.refresh(product)
+    assert acct.balance_minor == 500_000 - winner.total_amount_minor and product.inventory_qty == 9
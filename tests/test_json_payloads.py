@@ -0,0 +1,66 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy import select, text
+
+from app.db.models import Account, AuditLog, Product, Trace, User
+from app.db.seed import seed_synthetic_data
+from app.db.types import json_text
+from app.utils import jsoncodec
+
+
+def test_codecs_round_trip_app_types():
+    payload = {"amount": Decimal("12.34"), "at": datetime(2026, 1, 2, tzinfo=timezone.utc), "name": "café"}
+    for name in jsoncodec.CODECS:
+        codec = jsoncodec.resolve_codec(name)
+        assert codec.loads(codec.dumps(payload)) == {
+            "amount": "12.34",
+            "at": "2026-01-02T00:00:00+00:00",
+            "name": "café",
+        }
+
+
+def test_payloads_are_stored_as_native_json(client, db_session):
+    seed_synthetic_data(db_session, num_users=1, num_products=1)
+    user = db_session.query(User).first()
+    product = db_session.query(Product).first()
+    acct = db_session.query(Account).filter(Account.user_id == user.id).one()
+    acct.balance_minor = 500_000
+    db_session.commit()
+
+    resp = client.post("/chat", json={"session_id": "js1", "user_id": user.id, "message": f"buy product_id={product.id} qty=1"})
+    trace = db_session.get(Trace, resp.json()["trace_id"])
+    assert trace.plan_json["pending_confirmation"]["confirmation_token"] == resp.json()["confirmation_token"]
+
+    timeline = client.get("/ui/sessions/js1/timeline").json()
+    assert isinstance(timeline["traces"][0]["plan"], dict)
+
+    logs = client.get("/ui/audit_logs", params={"user_id": user.id}).json()["items"]
+    assert logs and all(log["input"]["user_id"] == user.id for log in logs)
+    assert client.get("/ui/audit_logs", params={"user_id": "nobody"}).json()["items"] == []
+
+
+def test_user_id_filter_uses_expression_index(db_session):
+    stmt = select(AuditLog.id).where(json_text(AuditLog.input_json, "user_id") == "u1")
+    sql = str(stmt.compile(db_session.get_bind(), compile_kwargs={"literal_binds": True}))
+    plan = db_session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    assert any("ix_audit_logs_input_user_id" in row[-1] for row in plan)
+
+
+def test_stored_payloads_are_passed_through_verbatim(client, db_session):
+    # text that looks like a splice placeholder must come back as an ordinary string
+    plan = {"intent": "x", "note": "__raw_json_0000000000000000_0", "nested": [1, {"é": None}]}
+    tr = Trace(session_id="raw-1", user_message="hi", plan_json=plan)
+    db_session.add(tr)
+    db_session.flush()
+    db_session.add(AuditLog(trace_id=tr.id, tool_name="t", input_json={"user_id": "u"}, output_json=None))
+    db_session.commit()
+
+    assert client.get(f"/traces/{tr.id}").json()["plan_json"] == plan
+    timeline = client.get("/ui/sessions/raw-1/timeline").json()["traces"][0]
+    assert timeline["plan"] == plan
+    assert (timeline["audit_logs"][0]["input"], timeline["audit_logs"][0]["output"]) == ({"user_id": "u"}, None)
+
+    assert jsoncodec.dumps_with_raw({"a": jsoncodec.RawJSON('{"b":[1,2]}'), "c": [jsoncodec.RawJSON(None)]}) == (
+        '{"a":{"b":[1,2]},"c":[null]}'
+    )
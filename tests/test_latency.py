@@ -0,0 +1,46 @@
+from app.db.models import AuditLog, Trace, User
+from app.db.seed import seed_synthetic_data
+
+
+def test_turns_record_stage_timings(client, db_session):
+    seed_synthetic_data(db_session, num_users=1, num_products=1)
+    user = db_session.query(User).first()
+
+    trace_id = client.post(
+        "/chat", json={"session_id": "lat-1", "user_id": user.id, "message": "what is my balance"}
+    ).json()["trace_id"]
+    db_session.expire_all()
+    tr = db_session.get(Trace, trace_id)
+    assert (tr.intent, tr.planner) == ("check_balance", "heuristic")
+    assert all(v is not None and v >= 0 for v in (tr.memory_ms, tr.plan_ms, tr.policy_ms, tr.tools_ms))
+    assert tr.duration_ms >= tr.memory_ms + tr.plan_ms + tr.policy_ms + tr.tools_ms
+    audit = db_session.query(AuditLog).filter(AuditLog.trace_id == trace_id, AuditLog.tool_name == "check_balance").one()
+    assert 0 <= audit.duration_ms <= tr.tools_ms
+
+
+def test_latency_percentiles_are_nearest_rank(client, db_session):
+    # 1..100 ms totals: nearest-rank p50/p90/p95/p99 are the 50th/90th/95th/99th values
+    for n in range(1, 101):
+        db_session.add(
+            Trace(
+                session_id="lat-pct",
+                user_message="x",
+                intent="purchase" if n % 2 else "check_balance",
+                planner="llm",
+                duration_ms=float(n),
+                plan_ms=float(n) / 10,
+            )
+        )
+    db_session.commit()
+
+    data = client.get("/ui/latency").json()
+    # other tests' turns fall in the window too; select this test's synthetic rows by intent/planner
+    rows = {(r["stage"], r["planner"]): r for r in data["by_planner"]}
+    total = rows[("total", "llm")]
+    assert (total["count"], total["p50"], total["p90"], total["p95"], total["p99"], total["max"]) == (
+        100, 50.0, 90.0, 95.0, 99.0, 100.0
+    )
+    assert rows[("plan", "llm")]["p50"] == 5.0
+    by_intent = {(r["stage"], r["intent"]) for r in data["by_intent"]}
+    assert {("total", "purchase"), ("total", "check_balance")} <= by_intent
+    assert {"total", "plan"} <= {r["stage"] for r in data["stages"]}
@@ -0,0 +1,87 @@
+import json
+import logging
+import queue
+
+from app.core import logging as app_logging
+from app.core.logging import ContextFilter, DebugSampler, JsonFormatter, log_context
+from app.db.models import User
+from app.db.seed import seed_synthetic_data
+
+
+def _handler(maxsize=100, every=1):
+    handler = app_logging._NonBlockingQueueHandler(queue.Queue(maxsize=maxsize))
+    handler.addFilter(DebugSampler(every))
+    handler.addFilter(ContextFilter())
+    return handler
+
+
+def _logger(name, handler):
+    log = logging.getLogger(name)
+    log.handlers[:] = [handler]
+    log.setLevel(logging.DEBUG)
+    log.propagate = False
+    return log
+
+
+def _drain(handler):
+    out = []
+    while not handler.queue.empty():
+        out.append(json.loads(JsonFormatter().format(handler.queue.get_nowait())))
+    return out
+
+
+def test_records_are_json_with_context_extras_and_traceback():
+    handler = _handler()
+    log = _logger("test.logging.json", handler)
+    with log_context(session_id="s-1"):
+        app_logging.trace_id_var.set("t-1")
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            log.exception("failed %d", 7, extra={"tool": "search_products"})
+    log.info("outside")
+
+    inside, outside = _drain(handler)
+    assert inside["msg"] == "failed 7" and inside["level"] == "ERROR"
+    assert inside["session_id"] == "s-1" and inside["trace_id"] == "t-1"
+    assert inside["tool"] == "search_products"
+    assert "ValueError: boom" in inside["exc"] and "Traceback" not in inside["msg"]
+    # the context is reset when the block exits
+    assert "session_id" not in outside and "trace_id" not in outside
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = _handler(maxsize=2)
+    log = _logger("test.logging.full", handler)
+    before = app_logging.logs_dropped_total._merged().get((), [0])[0]
+    for i in range(5):
+        log.warning("record %d", i)
+    assert handler.queue.qsize() == 2
+    assert app_logging.logs_dropped_total._merged()[()][0] - before == 3
+
+
+def test_debug_records_are_sampled_per_call_site():
+    handler = _handler(every=10)
+    log = _logger("test.logging.sampled", handler)
+    for _ in range(25):
+        log.debug("hot loop")
+        log.info("always kept")
+    records = _drain(handler)
+    debug = [r for r in records if r["level"] == "DEBUG"]
+    assert len(debug) == 3 and all(r["sample_every"] == 10 for r in debug)
+    assert sum(r["level"] == "INFO" for r in records) == 25
+
+
+def test_chat_turn_logs_carry_trace_and_session(client, db_session):
+    seed_synthetic_data(db_session, num_users=1, num_products=3)
+    user = db_session.query(User).first()
+    handler = _handler()
+    log = _logger("app.tools.products", handler)
+    try:
+        resp = client.post("/chat", json={"session_id": "log-1", "user_id": user.id, "message": "buy a laptop"})
+    finally:
+        log.handlers[:], log.propagate = [], True
+        log.setLevel(logging.NOTSET)
+    assert resp.status_code == 200
+    (record,) = [r for r in _drain(handler) if r["msg"].startswith("Product search tokens")]
+    assert record["session_id"] == "log-1" and record["trace_id"] == resp.json()["trace_id"]
@@ -0,0 +1,49 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+import app.agent.memory_store as memory_store
+from app.agent.memory_store import get_memory, patch_memory
+from app.db.models import SessionMemory, Trace
+
+
+def test_a_lost_create_race_patches_the_winner_and_keeps_pending_work(db_session, engine, monkeypatch):
+    real = memory_store.savepoint
+    raced = []
+
+    def racing_savepoint(db):
+        # another request creates the row after this one found none
+        if not raced:
+            raced.append(True)
+            with Session(engine) as other:
+                other.add(SessionMemory(session_id="mem-race", memory_json={"pending_qty": 2}))
+                other.commit()
+        return real(db)
+
+    monkeypatch.setattr(memory_store, "savepoint", racing_savepoint)
+    trace = Trace(session_id="mem-race", user_message="hi")
+    db_session.add(trace)  # unflushed: SQLite would block the other writer
+
+    assert patch_memory(db_session, "mem-race", {"selected_product_id": "p1"}) == {
+        "pending_qty": 2,
+        "selected_product_id": "p1",
+    }
+    assert get_memory(db_session, "mem-race") == {"pending_qty": 2, "selected_product_id": "p1"}
+    assert db_session.get(Trace, trace.id) is not None
+
+
+def test_a_persistent_integrity_error_is_raised_not_retried_forever(db_session, monkeypatch):
+    attempts = []
+
+    @contextmanager
+    def failing_savepoint(db):
+        attempts.append(True)
+        raise IntegrityError("INSERT", {}, Exception("constraint"))
+        yield
+
+    monkeypatch.setattr(memory_store, "savepoint", failing_savepoint)
+    with pytest.raises(IntegrityError):
+        patch_memory(db_session, "mem-broken", {"pending_qty": 1})
+    assert len(attempts) == 2
@@ -0,0 +1,64 @@
+import gc
+import re
+import threading
+
+from app.core.metrics import Histogram
+from app.db.models import User
+from app.db.seed import seed_synthetic_data
+
+
+def _value(text, prefix):
+    m = re.search(r"^" + re.escape(prefix) + r" (\S+)$", text, re.M)
+    return float(m.group(1)) if m else 0.0
+
+
+def test_histogram_shards_add_up_across_threads():
+    h = Histogram("test_shard_seconds", "test", ("stage",), buckets=(0.01, 0.1))
+
+    def work():
+        for _ in range(1000):
+            h.observe(0.05, "x")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    lines = h.render()
+    assert 'test_shard_seconds_bucket{stage="x",le="0.01"} 0' in lines
+    assert 'test_shard_seconds_bucket{stage="x",le="0.1"} 4000' in lines
+    assert 'test_shard_seconds_count{stage="x"} 4000' in lines
+
+
+def test_shards_of_exited_threads_are_retired():
+    h = Histogram("test_retired_seconds", "test", ("stage",), buckets=(0.01,))
+    for _ in range(20):
+        t = threading.Thread(target=h.observe, args=(0.001, "x"))
+        t.start()
+        t.join()
+    del t
+    gc.collect()
+    assert 'test_retired_seconds_count{stage="x"} 20' in h.render()
+    assert len(h._shards) <= 1
+
+
+def test_metrics_endpoint_reports_stages_tools_and_resources(client, db_session):
+    seed_synthetic_data(db_session, num_users=1, num_products=1)
+    user = db_session.query(User).first()
+    before = client.get("/metrics").text
+
+    client.post("/chat", json={"session_id": "met-1", "user_id": user.id, "message": "what is my balance"})
+    resp = client.get("/metrics")
+    assert resp.status_code == 200 and resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = resp.text
+
+    for prefix in (
+        'sentinelflow_http_request_seconds_count{method="POST",route="/chat",status="200"}',
+        'sentinelflow_stage_seconds_count{stage="plan"}',
+        'sentinelflow_stage_seconds_count{stage="policy"}',
+        'sentinelflow_tool_seconds_count{tool="check_balance",status="ok"}',
+    ):
+        assert _value(text, prefix) == _value(before, prefix) + 1, prefix
+    assert _value(text, "sentinelflow_db_commit_seconds_count") > _value(before, "sentinelflow_db_commit_seconds_count")
+    assert "# TYPE sentinelflow_cache_hit_ratio gauge" in text
+    assert 'sentinelflow_admission_queued{class="confirmation"} 0' in text
@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+from sqlalchemy import create_engine, text
+
+from app.db.models import Base
+
+
+def _alembic(db_path, *args):
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{db_path}"}
+    subprocess.run([sys.executable, "-m", "alembic", *args], env=env, check=True, capture_output=True)
+
+
+def _indexes(engine) -> dict[str, str]:
+    # from sqlite_master: the inspector skips expression indexes
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"))
+        return dict(rows.all())
+
+
+def test_migrated_schema_has_every_model_index(tmp_path):
+    db_path = tmp_path / "migrated.db"
+    _alembic(db_path, "upgrade", "head")
+
+    engine = create_engine(f"sqlite:///{db_path}")
+    expected = {ix.name for table in Base.metadata.sorted_tables for ix in table.indexes}
+    indexes = _indexes(engine)
+    assert expected <= indexes.keys(), sorted(expected - indexes.keys())
+    sql = indexes["ix_audit_logs_input_user_id"]
+    assert "json_extract(input_json, '$.user_id')" in sql and "created_at" in sql
+    engine.dispose()
+
+    _alembic(db_path, "downgrade", "base")
@@ -0,0 +1,38 @@
+from decimal import Decimal
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.tool_io import CheckBalanceOut, ExecutePurchaseOut
+from app.utils.money import format_minor, to_decimal, to_minor
+
+
+def test_minor_unit_round_trip():
+    assert to_minor(Decimal("19.99")) == 1999
+    assert to_minor("0.005") == 1  # half-up
+    assert to_decimal(1999) == Decimal("19.99")
+    assert format_minor(150_000) == "1500.00"
+
+
+def test_currency_exponent():
+    assert to_minor("1234", "JPY") == 1234
+    assert format_minor(1234, "JPY") == "1234"
+    assert to_minor("1.234", "KWD") == 1234
+
+
+def test_tool_outputs_take_the_currency_decimal_places():
+    out = CheckBalanceOut(user_id="u1", balance=to_decimal(12_345, "KWD"), currency="KWD")
+    dumped = out.model_dump(mode="json")
+    assert dumped["balance"] == "12.345"
+    assert to_minor(dumped["balance"], "KWD") == 12_345
+
+    purchase = ExecutePurchaseOut(
+        transaction_id="t1", status="confirmed", total_amount=to_decimal(500, "JPY"), currency="JPY",
+        remaining_balance=to_decimal(1_000, "JPY"),
+    )
+    assert purchase.model_dump(mode="json")["total_amount"] == "500"
+
+    with pytest.raises(ValidationError):
+        CheckBalanceOut(user_id="u1", balance=Decimal("1.234"), currency="USD")
+    with pytest.raises(ValidationError):
+        CheckBalanceOut(user_id="u1", balance=Decimal("1.5"), currency="JPY")
@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta, timezone
+
+from app.db.models import Trace
+
+
+def _walk(client, path, params, key="items"):
+    seen, cursor = [], None
+    while True:
+        body = client.get(path, params={**params, **({"cursor": cursor} if cursor else {})}).json()
+        seen.extend(body[key])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return seen
+
+
+def test_keyset_pages_cover_ties_exactly_once(client, db_session):
+    # same timestamp for most rows: the id tie-breaker must keep pages disjoint
+    # recent, so the retention test sharing this database leaves them alone
+    tied = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(minutes=1)
+    ids = []
+    for i in range(7):
+        at = tied if i < 5 else tied + timedelta(seconds=i)
+        tr = Trace(session_id="page-1", user_message=f"m{i}", created_at=at)
+        db_session.add(tr)
+        db_session.flush()
+        ids.append(tr.id)
+    db_session.commit()
+    expected = sorted(ids[:5]) + ids[5:]
+
+    oldest_first = _walk(client, "/sessions/page-1/traces", {"limit": 3})
+    assert [t["id"] for t in oldest_first] == expected
+
+    timeline = _walk(client, "/ui/sessions/page-1/timeline", {"limit_traces": 2}, key="traces")
+    assert [t["id"] for t in timeline] == expected
+
+    # /traces serves newest pages first, each page in chronological order
+    pages = []
+    cursor = None
+    while True:
+        body = client.get("/traces", params={"session_id": "page-1", "limit": 3, **({"cursor": cursor} if cursor else {})}).json()
+        pages.append([t["id"] for t in body["items"]])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert [i for page in reversed(pages) for i in page] == expected
+
+
+def test_bad_cursor_is_rejected(client):
+    assert client.get("/users", params={"cursor": "not-a-cursor"}).status_code == 400
@@ -0,0 +1,59 @@
+from sqlalchemy import func, select
+
+from app.db import payloads
+from app.db.models import AuditLog, Payload, ToolCallStatus, Trace, User
+from app.db.seed import seed_synthetic_data
+
+
+def test_identical_payloads_are_stored_once(client, db_session):
+    seed_synthetic_data(db_session, num_users=1, num_products=3)
+    user = db_session.query(User).first()
+
+    for sid in ("dd-1", "dd-2"):
+        client.post("/chat", json={"session_id": sid, "user_id": user.id, "message": "what is my balance"})
+    traces = db_session.query(Trace).filter(Trace.session_id.in_(["dd-1", "dd-2"])).all()
+    assert len({t.plan_ref for t in traces}) == 1
+    outputs = (
+        db_session.query(AuditLog)
+        .filter(AuditLog.trace_id.in_([t.id for t in traces]), AuditLog.tool_name == "check_balance")
+        .all()
+    )
+    assert len(outputs) == 2 and outputs[0].output_ref == outputs[1].output_ref
+    assert db_session.get(Payload, outputs[0].output_ref).size == len(payloads.encode(outputs[0].output_json)[1].encode())
+
+    # reads resolve from the database as well as from the cache
+    expected = {t.id: t.plan_json for t in traces}
+    payloads.payload_cache.clear()
+    db_session.expire_all()
+    assert {t.id: t.plan_json for t in db_session.query(Trace).filter(Trace.id.in_(expected))} == expected
+
+    items = client.get("/traces", params={"session_id": "dd-1"}).json()["items"]
+    assert items[0]["plan_json"] == expected[items[0]["id"]]
+    stats = payloads.db_stats(db_session)
+    assert stats["references"] > stats["payloads"] and stats["dedup_ratio"] > 1
+
+
+def test_reassigning_a_payload_and_gc(db_session):
+    tr = Trace(session_id="dd-gc", user_message="hi", plan_json={"intent": "gc-a"})
+    db_session.add(tr)
+    db_session.flush()
+    db_session.add(AuditLog(trace_id=tr.id, tool_name="t", status=ToolCallStatus.ok, output_json={"gc": 1}))
+    db_session.commit()
+    first = tr.plan_ref
+
+    # not mutation-tracked: assigning a new value stores a new payload
+    tr.plan_json = {**tr.plan_json, "pending_confirmation": {"confirmation_token": "x"}}
+    db_session.commit()
+    db_session.expire_all()
+    assert tr.plan_ref != first and tr.plan_json["pending_confirmation"] == {"confirmation_token": "x"}
+
+    assert payloads.gc(db_session) >= 1
+    remaining = set(db_session.execute(select(Payload.hash)).scalars())
+    assert first not in remaining
+    assert tr.plan_ref in remaining and db_session.query(AuditLog).filter(AuditLog.trace_id == tr.id).one().output_ref in remaining
+
+    # a payload dropped by gc is inserted again, not assumed to exist
+    again = Trace(session_id="dd-gc", user_message="again", plan_json={"intent": "gc-a"})
+    db_session.add(again)
+    db_session.commit()
+    assert db_session.scalar(select(func.count()).select_from(Payload).where(Payload.hash == again.plan_ref)) == 1
@@ -1,5 +1,3 @@
-from decimal import Decimal
-
 from app.agent.planner import simple_planner
 from app.agent.policy import evaluate_plan
 from app.db.seed import seed_synthetic_data
@@ -13,7 +11,7 @@ def test_purchase_requires_confirmation(db_session):
 
     # Make sure user has money
     acct = db_session.query(Account).filter(Account.user_id == user.id).one()
-    acct.balance = Decimal("5000.00")
+    acct.balance_minor = 500_000
     db_session.commit()
 
     plan = simple_planner(f"buy product_id={product.id} qty=1", user_id=user.id)
@@ -0,0 +1,7 @@
+from bench.purchase_contention import run
+
+
+def test_concurrent_buyers_never_oversell():
+    res = run(buyers=24, stock=6, replays=1, workers=8)
+    assert res["violations"] == []
+    assert res["purchases"] == 6
@@ -0,0 +1,119 @@
+"""
+Query-plan regression suite.
+
+Drives the chat flow and every read route against SQLite while recording the SQL they
+issue, then runs EXPLAIN QUERY PLAN on each statement. A full table scan or a temporary
+sort (USE TEMP B-TREE) on a table that grows with traffic fails the test.
+"""
+from __future__ import annotations
+
+import re
+
+import pytest
+from sqlalchemy import event
+
+from app.db.models import Account, User
+from app.db.retention import purge_expired
+from app.db.seed import seed_synthetic_data
+from app.services.velocity import velocity
+
+# tables that grow with traffic; products are searched with LIKE '%q%' and stay small
+WATCHED = {"traces", "audit_logs", "session_memory", "sessions", "transactions", "users", "accounts"}
+
+# Sorts over a set that is bounded by one session's rows, not by table size.
+BOUNDED_SORTS = [
+    # /ui/audit_logs?session_id=...: audit rows of one session's traces, newest first
+    "WHERE audit_logs.trace_id IN (SELECT traces.id FROM traces WHERE traces.session_id = ?)",
+]
+
+
+@pytest.fixture()
+def captured(engine):
+    statements: list[tuple[str, tuple | dict]] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", _record)
+
+
+def _bad_steps(engine, statement: str, parameters) -> list[str]:
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    flat = " ".join(statement.split())
+    bounded = any(b in flat for b in BOUNDED_SORTS)
+    bad = []
+    for row in rows:
+        detail = row[-1]
+        full_scan = re.match(r"SCAN (\w+)$", detail)  # "SCAN t USING [COVERING] INDEX ..." is fine
+        if full_scan and full_scan.group(1) in WATCHED:
+            bad.append(detail)
+        if "USE TEMP B-TREE" in detail and not bounded and any(t in statement for t in WATCHED):
+            bad.append(detail)
+    return bad
+
+
+def test_hot_queries_use_indexes(client, db_session, engine, captured, tmp_path):
+    seed_synthetic_data(db_session, num_users=2, num_products=3)
+    user = db_session.query(User).first()
+    acct = db_session.query(Account).filter(Account.user_id == user.id).one()
+    acct.balance_minor = 5_000_000
+    db_session.commit()
+    captured.clear()
+
+    sid = "qp-session"
+    chat = lambda m: client.post("/chat", json={"session_id": sid, "user_id": user.id, "message": m}).json()  # noqa: E731
+    chat("what is my balance")
+    chat("buy keyboard")
+    token = chat("1")["confirmation_token"]
+    trace_id = chat(f"confirm {token}")["trace_id"]
+
+    for path, params in [
+        ("/sessions", {}),
+        (f"/sessions/{sid}/traces", {}),
+        (f"/sessions/{sid}/memory", {}),
+        ("/traces", {"session_id": sid}),
+        (f"/traces/{trace_id}", {}),
+        (f"/traces/{trace_id}/audit_logs", {}),
+        (f"/traces/{trace_id}/audit-logs", {}),
+        (f"/logs/{trace_id}", {}),
+        ("/ui/sessions", {}),
+        (f"/ui/sessions/{sid}/timeline", {}),
+        ("/ui/audit_logs", {}),
+        ("/ui/audit_logs", {"trace_id": trace_id}),
+        ("/ui/audit_logs", {"session_id": sid}),
+        ("/ui/audit_logs", {"tool_name": "execute_purchase"}),
+        ("/ui/audit_logs", {"user_id": user.id}),
+        ("/ui/users", {}),
+        (f"/ui/users/{user.id}", {}),
+        ("/users", {}),
+        (f"/users/{user.id}/account", {}),
+        ("/audit_logs", {"trace_id": trace_id}),
+        ("/export/traces", {"session_id": sid}),
+        ("/export/audit_logs", {"session_id": sid}),
+        ("/export/audit_logs", {"tool_name": "execute_purchase", "since": "2020-01-01T00:00:00Z"}),
+        ("/export/transactions", {"since": "2020-01-01T00:00:00Z"}),
+    ]:
+        resp = client.get(path, params=params)
+        assert resp.status_code == 200, path
+        body = resp.json() if resp.headers["content-type"] == "application/json" else None
+        if isinstance(body, dict) and "next_cursor" in body:
+            # the seek of a later page must be indexed too
+            first = client.get(path, params={**params, "limit": 1, "limit_traces": 1}).json()
+            if first["next_cursor"]:
+                page = client.get(path, params={**params, "limit": 1, "limit_traces": 1, "cursor": first["next_cursor"]})
+                assert page.status_code == 200, path
+
+    velocity.rebuild(db_session)
+    purge_expired(db_session, archive_dir=str(tmp_path), dry_run=True)
+
+    assert captured
+    failures = {}
+    for statement, parameters in captured:
+        bad = _bad_steps(engine, statement, parameters)
+        if bad:
+            failures[" ".join(statement.split())] = bad
+    assert not failures, "\n\n".join(f"{sql}\n  -> {steps}" for sql, steps in failures.items())
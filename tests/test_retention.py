@@ -0,0 +1,54 @@
+import gzip
+from datetime import datetime, timezone
+
+from app.db.models import AuditLog, SessionMemory, ToolCallStatus, Trace
+from app.db.retention import RetentionPolicy, import_archive, purge_expired
+from app.utils import jsoncodec
+
+
+def _old_turn(db, session_id: str, at: datetime) -> str:
+    tr = Trace(session_id=session_id, user_message="hi", plan_json={"intent": "x"}, created_at=at)
+    db.add(tr)
+    db.flush()
+    db.add(AuditLog(trace_id=tr.id, tool_name="check_balance", status=ToolCallStatus.ok, input_json={"user_id": "u1"}, created_at=at))
+    db.commit()
+    return tr.id
+
+
+def test_expired_days_are_archived_dropped_and_reimportable(db_session, tmp_path):
+    day1 = datetime(2020, 1, 1, 10, tzinfo=timezone.utc)
+    day2 = datetime(2020, 1, 2, 23, 59, tzinfo=timezone.utc)
+    t1 = _old_turn(db_session, "ret-1", day1)
+    t2 = _old_turn(db_session, "ret-2", day2)
+    recent = _old_turn(db_session, "ret-3", datetime.now(timezone.utc))
+
+    # traces expire, audit rows are kept longer: they must be archived with their trace
+    policies = [
+        RetentionPolicy(AuditLog.__table__, "created_at", 0),
+        RetentionPolicy(Trace.__table__, "created_at", 30),
+        RetentionPolicy(SessionMemory.__table__, "updated_at", 30),
+    ]
+    dry = purge_expired(db_session, policies=policies, archive_dir=str(tmp_path), dry_run=True)
+    assert [(r.table, r.day.isoformat(), r.rows) for r in dry] == [
+        ("traces", "2020-01-01", 1),
+        ("traces", "2020-01-02", 1),
+    ]
+    assert db_session.get(Trace, t1) is not None
+
+    results = purge_expired(db_session, policies=policies, archive_dir=str(tmp_path))
+    assert [r.rows for r in results] == [1, 1]
+    db_session.expire_all()
+    assert db_session.get(Trace, t1) is None
+    assert db_session.query(AuditLog).filter(AuditLog.trace_id.in_([t1, t2])).count() == 0
+    assert db_session.get(Trace, recent) is not None
+
+    path = tmp_path / "traces" / "2020-01-02.jsonl.gz"
+    with gzip.open(path, "rt") as fh:
+        record = jsoncodec.loads(fh.readline())
+    assert record["id"] == t2 and record["audit_logs"][0]["input_json"] == {"user_id": "u1"}
+
+    assert import_archive(db_session, str(path)) == 2
+    assert import_archive(db_session, str(path)) == 0  # idempotent
+    restored = db_session.get(Trace, t2)
+    assert restored.plan_json == {"intent": "x"}
+    assert db_session.query(AuditLog).filter(AuditLog.trace_id == t2).count() == 1
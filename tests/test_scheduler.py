@@ -0,0 +1,82 @@
+import threading
+import time
+
+from app.agent.memory_store import patch_memory
+from app.agent.orchestrator import classify_turn
+from app.agent.types import TurnClass
+from app.services.admission import AdmissionController
+from app.services.scheduler import WeightedFairQueue, turn_weights
+
+
+def test_cheap_turns_overtake_a_planned_backlog_by_weight():
+    q = WeightedFairQueue(turn_weights(), starvation_s=60)
+    for n in range(4):
+        q.push(TurnClass.planned, f"p{n}")
+    q.push(TurnClass.confirmation, "c0")
+    q.push(TurnClass.selection, "s0")
+    q.push(TurnClass.confirmation, "c1")
+    assert [q.pop() for _ in range(len(q))] == ["p0", "c0", "s0", "c1", "p1", "p2", "p3"]
+    stats = q.stats()
+    assert stats["planned"]["served"] == 4 and stats["confirmation"]["served"] == 2
+    assert q.ahead_of(TurnClass.confirmation) == 0
+
+
+def test_a_long_waiting_class_is_not_starved():
+    q = WeightedFairQueue(turn_weights(), starvation_s=0.01)
+    q.push(TurnClass.planned, "p0")
+    q.push(TurnClass.planned, "p1")
+    time.sleep(0.02)
+    for n in range(3):
+        q.push(TurnClass.confirmation, f"c{n}")
+    # one promoted slot for the starved class, then the weights decide again
+    assert [q.pop() for _ in range(len(q))] == ["p0", "c0", "c1", "c2", "p1"]
+    assert q.stats()["planned"]["promoted"] == 1
+
+
+def test_an_old_backlog_does_not_turn_into_fifo():
+    q = WeightedFairQueue(turn_weights(), starvation_s=0.01)
+    for n in range(20):
+        q.push(TurnClass.planned, f"p{n}")
+    time.sleep(0.02)
+    assert q.pop() == "p0"  # planned has gone a window without a slot
+    # every planned head is now older than starvation_s, yet a confirmation still jumps ahead
+    q.push(TurnClass.confirmation, "c0")
+    assert q.pop() == "c0"
+    assert q.stats()["planned"]["promoted"] == 1
+
+
+def test_classify_turn(db_session):
+    assert classify_turn(db_session, session_id="cls-1", message="confirm abc123") == TurnClass.confirmation
+    assert classify_turn(db_session, session_id="cls-1", message="what is my balance") == TurnClass.read_only
+    assert classify_turn(db_session, session_id="cls-1", message="buy me a keyboard") == TurnClass.planned
+    # a number is only a pick when there are candidates to pick from
+    assert classify_turn(db_session, session_id="cls-1", message="2") == TurnClass.planned
+    patch_memory(db_session, "cls-1", {"last_product_candidates": [{"product_id": "x"}]})
+    assert classify_turn(db_session, session_id="cls-1", message="2") == TurnClass.selection
+
+
+def test_admission_hands_a_freed_slot_to_a_confirmation_first():
+    ctl = AdmissionController(
+        enabled=True, max_concurrent=1, max_queue=8, max_wait_s=5.0, degrade_depth=8,
+        rate=1.0, burst=100, weights=turn_weights(), starvation_s=60.0,
+    )
+    held = ctl.admit(None)
+    held.__enter__()
+    order = []
+
+    def turn(name, cls):
+        with ctl.admit(None, cls):
+            order.append(name)
+
+    threads = []
+    for name, cls in [("plan-1", TurnClass.planned), ("plan-2", TurnClass.planned), ("confirm", TurnClass.confirmation)]:
+        t = threading.Thread(target=turn, args=(name, cls))
+        t.start()
+        threads.append(t)
+        while ctl.stats()["queued_now"] < len(threads):
+            time.sleep(0.001)
+    held.__exit__(None, None, None)
+    for t in threads:
+        t.join(5)
+    assert order == ["plan-1", "confirm", "plan-2"]
+    assert ctl.stats()["classes"]["confirmation"]["served"] == 1
@@ -0,0 +1,60 @@
+import threading
+import time
+
+from app.services.session_lanes import SessionLanes
+
+
+def test_turns_of_a_session_run_one_at_a_time_in_arrival_order():
+    lanes = SessionLanes(idle_s=60)
+    order, running = [], {"a": 0, "max_a": 0}
+    first_in = threading.Event()
+    release = threading.Event()
+
+    def turn(session_id, n, hold=None):
+        with lanes.lane(session_id):
+            if session_id == "a":
+                running["a"] += 1
+                running["max_a"] = max(running["max_a"], running["a"])
+            order.append((session_id, n))
+            if hold:
+                first_in.set()
+                release.wait(5)
+            if session_id == "a":
+                running["a"] -= 1
+
+    t0 = threading.Thread(target=turn, args=("a", 0, True))
+    t0.start()
+    first_in.wait(5)
+    waiters = []
+    for n in (1, 2, 3):
+        t = threading.Thread(target=turn, args=("a", n))
+        t.start()
+        waiters.append(t)
+        while lanes.depth("a") < n + 1:  # queued before the next one arrives
+            time.sleep(0.001)
+
+    # another session is not held up by the busy one
+    other = threading.Thread(target=turn, args=("b", 0))
+    other.start()
+    other.join(5)
+    assert ("b", 0) in order and lanes.depth("a") == 4
+
+    stats = lanes.stats()
+    assert stats["deepest"][0] == {"session_id": "a", "depth": 4} and stats["queued_now"] == 3
+
+    release.set()
+    for t in (t0, *waiters):
+        t.join(5)
+    assert [n for sid, n in order if sid == "a"] == [0, 1, 2, 3]
+    assert running["max_a"] == 1
+    assert lanes.stats()["queued"] == 3
+
+
+def test_idle_lanes_are_evicted():
+    lanes = SessionLanes(idle_s=0.01)
+    with lanes.lane("x"):
+        pass
+    time.sleep(0.02)
+    with lanes.lane("y"):
+        assert lanes.stats()["lanes"] == 1
+    assert lanes.stats()["evictions"] == 1
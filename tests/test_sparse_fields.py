@@ -0,0 +1,100 @@
+import gzip
+
+from sqlalchemy import event
+
+from app.api import compression
+from app.db.models import User
+from app.db.seed import seed_synthetic_data
+
+
+def _statements(engine, fn):
+    statements = []
+    record = lambda conn, cur, stmt, *a: statements.append(stmt)  # noqa: E731
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        resp = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return resp, statements
+
+
+def _chat(client, db_session, session_id):
+    seed_synthetic_data(db_session, num_users=1, num_products=3)
+    user = db_session.query(User).first()
+    for m in ("what is my balance", "buy a laptop"):
+        client.post("/chat", json={"session_id": session_id, "user_id": user.id, "message": m})
+
+
+def test_timeline_fields_load_only_selected_columns(client, db_session, engine):
+    _chat(client, db_session, "fields-1")
+    url = "/ui/sessions/fields-1/timeline"
+    full = client.get(url).json()["traces"]
+    assert set(full[0]) == {"id", "session_id", "user_message", "assistant_message", "plan", "created_at", "audit_logs"}
+
+    resp, statements = _statements(engine, lambda: client.get(url, params={"fields": "user_message,created_at"}))
+    traces = resp.json()["traces"]
+    assert [set(t) for t in traces] == [{"id", "user_message", "created_at"}] * len(full)
+    assert [t["user_message"] for t in traces] == [t["user_message"] for t in full]
+    # no plan text, no audit logs, no payload lookups
+    assert not any("assistant_message" in s or "plan_ref" in s or "audit_logs" in s or "payloads" in s for s in statements)
+
+    resp, statements = _statements(engine, lambda: client.get(url, params={"fields": "audit_logs.tool_name"}))
+    logs = [log for t in resp.json()["traces"] for log in t["audit_logs"]]
+    assert logs and all(set(log) == {"id", "tool_name"} for log in logs)
+    assert not any("input_json" in s or "error_message" in s or "payloads" in s for s in statements)
+
+    assert client.get(url, params={"fields": "user_message,secret"}).status_code == 400
+
+
+def test_audit_log_feed_fields(client, db_session, engine):
+    _chat(client, db_session, "fields-2")
+    resp, statements = _statements(
+        engine, lambda: client.get("/ui/audit_logs", params={"session_id": "fields-2", "fields": "tool_name,status"})
+    )
+    items = resp.json()["items"]
+    assert items and all(set(i) == {"id", "tool_name", "status"} for i in items)
+    assert not any("input_json" in s or "payloads" in s for s in statements)
+    full = client.get("/ui/audit_logs", params={"session_id": "fields-2"}).json()["items"]
+    assert [i["tool_name"] for i in full] == [i["tool_name"] for i in items]
+    assert "input" in full[0] and "output" in full[0]
+
+
+def test_large_responses_are_compressed(client, db_session, monkeypatch):
+    _chat(client, db_session, "gzip-1")
+    monkeypatch.setattr(compression, "brotli", None)
+    url = "/ui/sessions/gzip-1/timeline"
+
+    identity = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+    assert "accept-encoding" in identity.headers["vary"].lower()
+    resp = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip" and "accept-encoding" in resp.headers["vary"].lower()
+    assert int(resp.headers["content-length"]) < len(identity.content)
+    assert resp.content == identity.content  # decoded by the client
+    assert resp.headers["etag"] == "W/" + identity.headers["etag"]
+
+    small = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers and "accept-encoding" in small.headers["vary"].lower()
+    assert gzip.decompress(compression.compress("gzip", b"x" * 10)) == b"x" * 10
+
+
+def test_negotiate(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert compression.negotiate("gzip, deflate, br") == "gzip"
+    assert compression.negotiate("gzip;q=0, deflate") is None
+    assert compression.negotiate("*") == "gzip"
+    assert compression.negotiate("") is None
+    monkeypatch.setattr(compression, "brotli", object())
+    assert compression.negotiate("gzip, br") == "br"
+    assert compression.negotiate("gzip;q=1, br;q=0.5") == "gzip"
+
+
+def test_timeline_etag_depends_on_fields(client, db_session):
+    _chat(client, db_session, "fields-3")
+    url = "/ui/sessions/fields-3/timeline"
+    trimmed = client.get(url, params={"fields": "user_message,created_at"})
+    etag = trimmed.headers["etag"]
+    same = client.get(url, params={"fields": "created_at,user_message"}, headers={"If-None-Match": etag})
+    assert same.status_code == 304  # same selection, other order
+    full = client.get(url, headers={"If-None-Match": etag})
+    assert full.status_code == 200 and "plan" in full.json()["traces"][0]
@@ -0,0 +1,43 @@
+import subprocess
+import sys
+import time
+
+from sqlalchemy.orm import sessionmaker
+
+from app.db.seed import seed_synthetic_data
+from app.services import warmup
+
+# generous for CI; a local import takes well under a second
+IMPORT_BUDGET_S = 3.0
+
+
+def test_import_app_main_stays_within_budget():
+    code = (
+        "import sys, time\n"
+        "t0 = time.perf_counter()\n"
+        "import app.main\n"
+        "print(time.perf_counter() - t0)\n"
+        "print('openai' in sys.modules)\n"
+    )
+    t0 = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.split()
+    assert float(out[0]) < IMPORT_BUDGET_S, f"import app.main took {out[0]}s (wall {time.perf_counter() - t0:.2f}s)"
+    # the LLM client is built by the warmup, not at import
+    assert out[1] == "False"
+
+
+def test_ready_is_503_until_warmup_has_run(client, db_session, engine, monkeypatch):
+    seed_synthetic_data(db_session, num_users=1, num_products=3)
+    monkeypatch.setattr(warmup, "readiness", warmup.Readiness())
+
+    assert client.get("/health").status_code == 200
+    resp = client.get("/ready")
+    assert resp.status_code == 503 and resp.json()["state"] == "starting"
+
+    state = warmup.run(sessionmaker(bind=engine))
+    assert state.ready, state.steps
+    resp = client.get("/ready")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["state"] == "ready"
+    assert {"planner", "db_connections", "catalog", "recent_traces"} <= body["steps"].keys()
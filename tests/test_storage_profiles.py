@@ -0,0 +1,23 @@
+import pytest
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.profiles import build_engine, resolve_profile
+
+
+def test_resolve_profile_by_url():
+    assert resolve_profile("sqlite:///./x.db").name == "sqlite"
+    assert resolve_profile("postgresql+psycopg://u:p@localhost/db").name == "postgres"
+    assert resolve_profile("sqlite:///./x.db", "plain").name == "plain"
+    assert "journal_mode" not in resolve_profile("sqlite://").sqlite_pragmas
+    with pytest.raises(ValueError):
+        resolve_profile("sqlite:///./x.db", "nope")
+
+
+def test_sqlite_profile_applies_pragmas(tmp_path):
+    engine = build_engine(f"sqlite:///{tmp_path / 'p.db'}", "sqlite")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == settings.sqlite_busy_timeout_ms
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+    engine.dispose()
@@ -0,0 +1,63 @@
+from sqlalchemy import event
+
+from app.db.models import AuditLog, ToolCallStatus, Trace, User
+from app.db.seed import seed_synthetic_data
+
+
+def test_timeline_etag_and_since(client, db_session, engine):
+    seed_synthetic_data(db_session, num_users=1, num_products=1)
+    user = db_session.query(User).first()
+    chat = lambda m: client.post("/chat", json={"session_id": "sync-1", "user_id": user.id, "message": m})  # noqa: E731
+    url = "/ui/sessions/sync-1/timeline"
+
+    chat("what is my balance")
+    first = client.get(url)
+    etag, body = first.headers["etag"], first.json()
+    assert [t["user_message"] for t in body["traces"]] == ["what is my balance"]
+
+    # unchanged: 304 from the summary row, no trace or audit reads
+    statements = []
+    record = lambda conn, cur, stmt, *a: statements.append(stmt)  # noqa: E731
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        again = client.get(url, headers={"If-None-Match": etag})
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert again.status_code == 304 and again.headers["etag"] == etag
+    assert statements and not any("traces" in s or "audit_logs" in s for s in statements)
+
+    chat("what is my balance again")
+    changed = client.get(url, params={"since": body["sync_cursor"]}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    delta = changed.json()
+    # the delta may repeat traces of the last-seen second, never older ones
+    new = [t for t in delta["traces"] if t["id"] not in {o["id"] for o in body["traces"]}]
+    assert [t["user_message"] for t in new] == ["what is my balance again"]
+    assert new[0]["audit_logs"]
+
+    # a late audit row on an existing trace still invalidates the ETag
+    etag = changed.headers["etag"]
+    trace = db_session.get(Trace, new[0]["id"])
+    db_session.add(AuditLog(trace_id=trace.id, tool_name="note", status=ToolCallStatus.ok))
+    db_session.commit()
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+    assert new[0]["id"] in {t["id"] for t in client.get(url, params={"since": delta["sync_cursor"]}).json()["traces"]}
+
+
+def test_timeline_etag_is_per_page(client, db_session):
+    seed_synthetic_data(db_session, num_users=1, num_products=1)
+    user = db_session.query(User).first()
+    for m in ("what is my balance", "what is my balance again"):
+        client.post("/chat", json={"session_id": "sync-2", "user_id": user.id, "message": m})
+    url = "/ui/sessions/sync-2/timeline"
+
+    first = client.get(url, params={"limit_traces": 1})
+    etag = first.headers["etag"]
+    assert client.get(url, params={"limit_traces": 1}, headers={"If-None-Match": etag}).status_code == 304
+
+    # the next page, a delta, or another page size is a different body: never 304 on page 1's ETag
+    cursor = first.json()["next_cursor"]
+    page2 = client.get(url, params={"limit_traces": 1, "cursor": cursor}, headers={"If-None-Match": etag})
+    assert page2.status_code == 200 and page2.json()["traces"][0]["id"] != first.json()["traces"][0]["id"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
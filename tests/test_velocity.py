@@ -0,0 +1,116 @@
+import threading
+from decimal import Decimal
+
+import pytest
+
+from app.agent.planner import simple_planner
+from app.agent.policy import evaluate_plan
+from app.core.config import settings
+from app.db.models import Account, Product, User
+from app.db.seed import seed_synthetic_data
+from app.services.payments import execute_purchase
+from app.services.velocity import RollingWindow, VelocityTracker, velocity
+
+
+def test_rolling_window_expires_old_buckets():
+    w = RollingWindow(span_s=3600, bucket_s=60)
+    w.add(1_000.0, 1000)
+    w.add(1_030.0, 500)
+    w.add(2_000.0, 100)
+    assert w.totals(2_000.0) == (1600, 3)
+    assert w.totals(1_100.0 + 3600) == (100, 1)
+
+
+def test_policy_blocks_after_hourly_count_limit(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "max_hourly_purchases", 1)
+    seed_synthetic_data(db_session, num_users=1, num_products=1)
+    user = db_session.query(User).first()
+    product = db_session.query(Product).first()
+    acct = db_session.query(Account).filter(Account.user_id == user.id).one()
+    acct.balance_minor = 500_000
+    product.inventory_qty = 10
+    db_session.commit()
+
+    plan = simple_planner(f"buy product_id={product.id} qty=1", user_id=user.id)
+    assert evaluate_plan(db_session, plan, user_id=user.id).allowed is True
+
+    execute_purchase(db_session, user_id=user.id, product_id=product.id, qty=1, idempotency_key="idem_velocity_1")
+    db_session.commit()
+
+    decision = evaluate_plan(db_session, plan, user_id=user.id)
+    assert decision.allowed is False
+    assert decision.reason == "hourly_purchase_count_exceeded"
+    assert decision.limits["hourly_purchases"] == 1
+
+    # the tracker can be rebuilt from the transactions table
+    velocity.clear()
+    assert velocity.rebuild(db_session) >= 1
+    assert evaluate_plan(db_session, plan, user_id=user.id).allowed is False
+
+
+def test_concurrent_reservations_cannot_exceed_the_limit(monkeypatch):
+    monkeypatch.setattr(settings, "max_daily_purchases", 3)
+    monkeypatch.setattr(settings, "max_hourly_purchases", 100)
+    tracker = VelocityTracker()
+    barrier = threading.Barrier(10)
+    granted = []
+
+    def buy():
+        barrier.wait()
+        decision, reservation = tracker.reserve("u1", 100)
+        if reservation is not None:
+            granted.append(reservation)
+
+    threads = [threading.Thread(target=buy) for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    assert len(granted) == 3 and tracker.usage("u1")[3] == 3
+
+    tracker.release(granted[0])
+    tracker.release(granted[0])  # idempotent
+    assert tracker.usage("u1")[2:] == (2, 2)
+    assert tracker.check("u1", 100).allowed
+
+
+def test_spend_caps_are_in_the_purchase_currency(monkeypatch):
+    monkeypatch.setattr(settings, "max_hourly_spend", Decimal("2000.00"))
+    tracker = VelocityTracker()
+    # 2000 in yen is 2000 minor units, not 200000
+    assert tracker.check("u1", 2_001, "JPY").reason == "hourly_spend_limit_exceeded"
+    assert tracker.check("u1", 2_001, "USD").allowed
+    # spend in one currency does not count against another; purchase counts do
+    tracker.record("u1", 199_000, "USD")
+    decision = tracker.check("u1", 1_500, "JPY")
+    assert decision.allowed and decision.hourly_spend_minor == 0 and decision.hourly_purchases == 1
+    assert decision.as_dict()["limits"]["max_hourly_spend_minor"] == 2_000
+
+
+def test_purchase_reservation_is_released_on_rollback_and_counted_once(db_session, monkeypatch):
+    seed_synthetic_data(db_session, num_users=1, num_products=1)
+    user = db_session.query(User).first()
+    product = db_session.query(Product).first()
+    acct = db_session.query(Account).filter(Account.user_id == user.id).one()
+    acct.balance_minor = 500_000
+    product.inventory_qty = 10
+    db_session.commit()
+    velocity.clear()
+
+    execute_purchase(db_session, user_id=user.id, product_id=product.id, qty=1, idempotency_key="idem_res_1")
+    assert velocity.usage(user.id)[2] == 1  # counted while still uncommitted
+    db_session.rollback()
+    assert velocity.usage(user.id)[2] == 0
+
+    execute_purchase(db_session, user_id=user.id, product_id=product.id, qty=1, idempotency_key="idem_res_2")
+    db_session.commit()
+    assert velocity.usage(user.id)[2] == 1
+
+    # a purchase rejected after reserving (insufficient funds) gives its reservation back
+    acct.balance_minor = 0
+    db_session.commit()
+    with pytest.raises(ValueError, match="insufficient_funds"):
+        execute_purchase(db_session, user_id=user.id, product_id=product.id, qty=1, idempotency_key="idem_res_3")
+    assert velocity.usage(user.id)[2] == 1
+    db_session.rollback()
+    assert velocity.usage(user.id)[2] == 1